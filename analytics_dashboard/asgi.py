@@ -0,0 +1,25 @@
+"""
+ASGI config for analytics_dashboard project.
+
+This module contains the ASGI application used by ASGI servers (e.g. uvicorn or daphne). It exposes a module-level
+variable named ``application``, and is configured as ``wsgi.py`` is.
+
+Served under ASGI, requests are resolved with analytics_dashboard.asgi_urls (see AsyncViewURLConfMiddleware), whose
+course pages (see AsyncViewMixin) await their upstream data rather than holding the request's thread while waiting for
+it.  The upstream clients are blocking, so their calls still run in the upstream thread pool, which is capped at
+UPSTREAM_FAN_OUT_MAX_WORKERS threads per process.
+
+"""
+
+
+import os
+from os.path import abspath, dirname
+from sys import path
+
+SITE_ROOT = dirname(abspath(__file__))
+path.append(SITE_ROOT)
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "analytics_dashboard.settings.production")
+
+from django.core.asgi import get_asgi_application  # pylint: disable=wrong-import-position
+application = get_asgi_application()
@@ -0,0 +1,30 @@
+"""
+URLs of the site served under ASGI (see analytics_dashboard.asgi and AsyncViewURLConfMiddleware).
+
+The URLs are those of analytics_dashboard.urls, but serve the views of AsyncViewMixin asynchronously (see
+AsyncViewMixin.as_async_view()).
+"""
+from django.urls import URLPattern, URLResolver
+
+from analytics_dashboard import urls
+from analytics_dashboard.courses.views import AsyncViewMixin
+
+
+def _async_view_patterns(patterns):
+    async_patterns = []
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            pattern = URLResolver(pattern.pattern, _async_view_patterns(pattern.url_patterns),
+                                  pattern.default_kwargs, pattern.app_name, pattern.namespace)
+        else:
+            view_class = getattr(pattern.callback, 'view_class', None)
+            # Decorated views (e.g. with login_required) are left as they are, rather than lose their decorators.
+            if (view_class is not None and issubclass(view_class, AsyncViewMixin) and
+                    not hasattr(pattern.callback, '__wrapped__')):
+                pattern = URLPattern(pattern.pattern, view_class.as_async_view(**pattern.callback.view_initkwargs),
+                                     pattern.default_args, pattern.name)
+        async_patterns.append(pattern)
+    return async_patterns
+
+
+urlpatterns = _async_view_patterns(urls.urlpatterns)
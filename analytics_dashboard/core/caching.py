@@ -0,0 +1,503 @@
+import logging
+import pickle
+import random
+import sys
+import threading
+import time
+import uuid
+import zlib
+from collections import OrderedDict, namedtuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+from edx_django_utils.cache import RequestCache
+from edx_django_utils.monitoring import accumulate, set_custom_metric
+
+from analytics_dashboard.core.utils import sanitize_cache_key
+
+logger = logging.getLogger(__name__)
+
+# Cache entry of get_or_set_single_flight().  `refresh_at` is the time after which the value is stale, or None if
+# the value does not go stale before it expires.
+CachedValue = namedtuple('CachedValue', ['value', 'refresh_at'])
+
+# Manifest of a value stored by set_large().  `data` holds the (optionally compressed) pickled value when it fits
+# in a single cache entry, otherwise it is split across `chunks` entries keyed by the key, `token` and their index.
+ChunkedValue = namedtuple('ChunkedValue', ['compressed', 'data', 'chunks', 'token'])
+
+# Namespace of the request cache used to memoize course cache versions for the duration of a request
+COURSE_CACHE_VERSION_NAMESPACE = 'course_cache_version'
+
+
+def course_cache_key(course_id, name, pipeline_data=False):
+    """
+    Returns the sanitized cache key of data derived for a course.
+
+    Keys include the course's cache version, so invalidate_course_cache() invalidates all of them at once.  Keys of
+    data derived from the output of the data pipeline (e.g. enrollment, engagement, problem and video data) also
+    include the course's pipeline data version, so that invalidate_course_cache(pipeline_data=True) invalidates
+    them without invalidating the data derived from the course itself (e.g. its structure or details).
+    """
+    version = get_course_cache_version(course_id)
+    if pipeline_data:
+        version = f'{version}_{get_course_cache_version(course_id, pipeline_data=True)}'
+    return sanitize_cache_key(f'{course_id}_{version}_{name}')
+
+
+def get_course_cache_version(course_id, pipeline_data=False):
+    """
+    Returns the version token of the cached data, or pipeline data, of the course, memoized for the duration of the
+    request.
+
+    Tokens are random rather than counters, so that a token evicted from the cache is never reissued
+    for data cached under an earlier token.
+    """
+    key = _course_cache_version_key(course_id, pipeline_data)
+    request_cache = RequestCache(COURSE_CACHE_VERSION_NAMESPACE)
+    cached_response = request_cache.get_cached_response(key)
+    if cached_response.is_found:
+        return cached_response.value
+
+    version = cache.get(key)
+    if version is None:
+        version = uuid.uuid4().hex
+        if not cache.add(key, version, None):
+            # Another process has just versioned the course.
+            version = cache.get(key, version)
+
+    request_cache.set(key, version)
+    return version
+
+
+def invalidate_course_cache(course_id, pipeline_data=False):
+    """
+    Invalidates the cached data of the course by replacing its cache version.
+
+    Arguments
+        course_id (str): ID of the course.
+        pipeline_data (bool): Only invalidate the data derived from the output of the data pipeline.
+    """
+    key = _course_cache_version_key(course_id, pipeline_data)
+    version = uuid.uuid4().hex
+    cache.set(key, version, None)
+    RequestCache(COURSE_CACHE_VERSION_NAMESPACE).set(key, version)
+    logger.info('Invalidated the cached %s of course %s.', 'pipeline data' if pipeline_data else 'data', course_id)
+
+
+def _course_cache_version_key(course_id, pipeline_data=False):
+    if pipeline_data:
+        return sanitize_cache_key(f'course_{course_id}_pipeline_cache_version')
+    return sanitize_cache_key(f'course_{course_id}_cache_version')
+
+
+class LocalCache:
+    """
+    Thread-safe, process-local LRU cache, bounded by both its number of entries and their (pickled) size.
+
+    This is a small tier in front of the shared cache for keys read on almost every request.  Entries expire
+    after short timeouts, so values removed or replaced in the shared cache by other processes are only
+    served for a few seconds longer.
+
+    Values are stored, and returned, as they are rather than copied: every caller reading a key within its
+    timeout gets the same object, so values must not be changed in place.
+    """
+
+    def __init__(self, max_entries, max_bytes):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self._lock = threading.Lock()
+        # Maps keys to (expiry time, size, value), least recently used first
+        self._entries = OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        """
+        Returns a (found, value) tuple for the key.  The value is shared with every other reader of the key, and
+        must be copied before being changed.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return False, None
+            expires_at, _size, value = entry
+            if time.monotonic() >= expires_at:
+                self._remove(key)
+                return False, None
+            self._entries.move_to_end(key)
+            return True, value
+
+    def set(self, key, value, timeout, size=None):
+        """
+        Caches the value for `timeout` seconds.
+
+        Arguments
+            key (str): Cache key of the value.
+            value: Value to cache.
+            timeout (float): Number of seconds the value is kept.
+            size (int): Size of the pickled value, if known, otherwise it is estimated with estimate_size().
+        """
+        if size is None:
+            size = estimate_size(value)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            if size > self.max_bytes:
+                return
+            self._entries[key] = (time.monotonic() + timeout, size, value)
+            self.bytes += size
+            while len(self._entries) > self.max_entries or self.bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+
+    def delete(self, key):
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+    def _remove(self, key):
+        _expires_at, size, _value = self._entries.pop(key)
+        self.bytes -= size
+
+
+local_cache = LocalCache(settings.CACHE_LOCAL_MAX_ENTRIES, settings.CACHE_LOCAL_MAX_BYTES)
+
+
+def estimate_size(value):
+    """
+    Returns a rough estimate of the size of the pickled value, in bytes, without pickling it.
+
+    Strings and bytes count for their length, numbers for a few bytes, and containers (and the attributes of other
+    objects) for the sum of their items, plus a couple of bytes of overhead for each value.
+    """
+    size = 0
+    pending = [value]
+    # Containers already counted, as pickle stores objects referenced more than once only once.
+    seen = set()
+    while pending:
+        value = pending.pop()
+        size += 2
+        if isinstance(value, (str, bytes, bytearray)):
+            size += len(value)
+        elif isinstance(value, (bool, int, float)) or value is None:
+            size += 4
+        elif id(value) not in seen:
+            seen.add(id(value))
+            if isinstance(value, dict):
+                pending.extend(value.keys())
+                pending.extend(value.values())
+            elif isinstance(value, (list, tuple, set, frozenset)):
+                pending.extend(value)
+            elif hasattr(value, '__dict__'):
+                pending.append(vars(value))
+            else:
+                size += sys.getsizeof(value)
+    return size
+
+
+class CacheStats:
+    """
+    Thread-safe counters of the cache reads and writes of each key family in this process, since the process
+    started or the counters were last reset.
+
+    Reads are counted as hits in the process-local cache (local_hits), hits in the shared cache and misses.  Writes
+    are counted along with the number of bytes stored (estimated, see estimate_size(), for families of values which
+    are not large), and both are timed (in seconds).
+    """
+
+    COUNTERS = ('hits', 'local_hits', 'misses', 'writes', 'bytes_written', 'seconds')
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._families = {}
+        self.since = time.time()
+
+    def record(self, family, **counts):
+        with self._lock:
+            stats = self._families.setdefault(family, dict.fromkeys(self.COUNTERS, 0))
+            for name, count in counts.items():
+                stats[name] += count
+
+    def snapshot(self):
+        """ Returns a dictionary mapping each key family to a copy of its counters. """
+        with self._lock:
+            return {family: dict(stats) for family, stats in self._families.items()}
+
+    def reset(self):
+        with self._lock:
+            self._families.clear()
+            self.since = time.time()
+
+
+cache_stats = CacheStats()
+
+
+def _record(family, **counts):
+    """ Adds the counts to the stats of the key family, and to the custom metrics of the current transaction. """
+    family = family or 'other'
+    cache_stats.record(family, **counts)
+    for name, count in counts.items():
+        accumulate(f'{family}_cache_{name}', count)
+
+
+def get_cached(key, family=None, default=None):
+    """
+    Returns the value cached under `key`, or `default` if it is not cached.
+
+    Values of the key families with a timeout in settings.CACHE_LOCAL_TIMEOUTS are also kept in the
+    process-local cache for that many seconds, and values of families listed in
+    settings.CACHE_LARGE_VALUE_FAMILIES are read with get_large().  Values served from the process-local cache are
+    shared between callers, and must be copied before being changed.
+
+    Arguments
+        key (str): Cache key of the value.
+        family (str): Name of the family of keys the key belongs to (e.g. 'structure').
+        default: Value returned if the key is not cached.
+    """
+    start = time.perf_counter()
+    local_timeout = settings.CACHE_LOCAL_TIMEOUTS.get(family)
+    if local_timeout:
+        found, value = local_cache.get(key)
+        if found:
+            _record(family, local_hits=1, seconds=time.perf_counter() - start)
+            return value
+
+    size = None
+    if family in settings.CACHE_LARGE_VALUE_FAMILIES:
+        value, size = _get_large(key)
+    else:
+        value = cache.get(key)
+    _record(family, hits=int(value is not None), misses=int(value is None), seconds=time.perf_counter() - start)
+    if value is None:
+        return default
+
+    if local_timeout:
+        if isinstance(value, CachedValue) and value.refresh_at is not None:
+            # Stale values are not kept, so that the value is refreshed once it goes stale.
+            local_timeout = min(local_timeout, value.refresh_at - time.time())
+        if local_timeout > 0:
+            local_cache.set(key, value, local_timeout, size)
+    return value
+
+
+def get_many_cached(keys, family=None):
+    """ Returns a dictionary of the values cached under the keys, leaving out keys that are not cached. """
+    if not settings.CACHE_LOCAL_TIMEOUTS.get(family) and family not in settings.CACHE_LARGE_VALUE_FAMILIES:
+        start = time.perf_counter()
+        values = cache.get_many(keys)
+        _record(family, hits=len(values), misses=len(keys) - len(values), seconds=time.perf_counter() - start)
+        return values
+
+    values = {key: get_cached(key, family) for key in keys}
+    return {key: value for key, value in values.items() if value is not None}
+
+
+def set_cached(key, value, timeout=DEFAULT_TIMEOUT, family=None):
+    """
+    Caches a value in the tiers for its family (see get_cached()).
+
+    Arguments
+        key (str): Cache key of the value.
+        value: Value to cache.
+        timeout (int): Cache timeout of the value in the shared cache, see cache_timeout().
+        family (str): Name of the family of keys the key belongs to (e.g. 'structure').
+    """
+    set_many_cached({key: value}, timeout, family)
+
+
+def set_many_cached(data, timeout=DEFAULT_TIMEOUT, family=None):
+    """ Caches each value of the dictionary under its key (see set_cached()). """
+    timeout = cache_timeout(family, timeout)
+    start = time.perf_counter()
+    if family in settings.CACHE_LARGE_VALUE_FAMILIES:
+        size = sum(set_large(key, value, timeout, family) for key, value in data.items())
+    else:
+        # The cache pickles these values itself, so their size is estimated rather than pickled a second time.
+        size = sum(estimate_size(value) for value in data.values())
+        cache.set_many(data, timeout)
+    _record(family, writes=len(data), bytes_written=size, seconds=time.perf_counter() - start)
+
+    # Values are cached locally when first read, which keeps values that are only written out of the local cache.
+    for key in data:
+        local_cache.delete(key)
+
+
+def cache_timeout(family, timeout=DEFAULT_TIMEOUT):
+    """
+    Returns the timeout of values of the key family written to the shared cache.
+
+    Without an explicit timeout, the family's timeout in settings.CACHE_TIMEOUTS is used, falling back to the
+    default timeout of the cache.  Timeouts are shortened by a random fraction of up to
+    settings.CACHE_TIMEOUT_JITTER, so that values written together (e.g. by the same request, or right after an
+    invalidation) do not all expire, and get recomputed, together.  Timeouts of None (never expire) and 0 (do not
+    cache) are kept as they are.
+
+    Arguments
+        family (str): Name of the family of keys the value belongs to (e.g. 'structure').
+        timeout (int): Timeout requested by the caller, if any.
+    """
+    if timeout is DEFAULT_TIMEOUT:
+        timeout = settings.CACHE_TIMEOUTS.get(family, cache.default_timeout)
+    if not timeout:
+        return timeout
+    return max(1, round(timeout * (1 - random.uniform(0, settings.CACHE_TIMEOUT_JITTER))))
+
+
+def delete_cached(*keys):
+    """ Removes the keys from both the shared and the process-local cache. """
+    cache.delete_many(keys)
+    for key in keys:
+        local_cache.delete(key)
+
+
+def get_or_set_single_flight(key, compute, timeout=DEFAULT_TIMEOUT, soft_timeout=None, family=None):
+    """
+    Returns the value cached under `key`, computing and caching it on a miss.
+
+    Only one caller at a time (across processes sharing the cache) computes a missing value: the caller
+    that manages to `add` the lock key computes it while the others poll the cache for the result.  If the
+    value does not appear before settings.CACHE_SINGLE_FLIGHT_WAIT seconds have passed, or the lock is
+    released without a value having been cached (e.g. the computation failed), waiters compute the value
+    themselves rather than failing the request.
+
+    With a `soft_timeout`, values go stale after `soft_timeout` seconds but are kept until `timeout`.
+    Stale values are served immediately while the caller acquiring the lock refreshes the value in a
+    background thread.
+
+    Values are cached in the tiers for their key family (see get_cached()).
+
+    Arguments
+        key (str): Cache key of the value.
+        compute (callable): Called without arguments to compute the value.
+        timeout (int): Cache timeout of the value.
+        soft_timeout (int): Number of seconds after which the value is refreshed in the background.
+        family (str): Name of the family of keys the key belongs to (e.g. 'structure').
+    """
+    entry = get_cached(key, family)
+    if isinstance(entry, CachedValue):
+        if entry.refresh_at is not None and time.time() >= entry.refresh_at:
+            _refresh_in_background(key, compute, timeout, soft_timeout, family)
+        return entry.value
+
+    lock_key = f'{key}_lock'
+    if cache.add(lock_key, True, settings.CACHE_SINGLE_FLIGHT_LOCK_TIMEOUT):
+        try:
+            return _compute_and_set(key, compute, timeout, soft_timeout, family)
+        finally:
+            cache.delete(lock_key)
+
+    deadline = time.monotonic() + settings.CACHE_SINGLE_FLIGHT_WAIT
+    while time.monotonic() < deadline:
+        time.sleep(settings.CACHE_SINGLE_FLIGHT_POLL_INTERVAL)
+        # The lock is checked before the value as the value is cached before the lock is released.
+        locked = cache.get(lock_key) is not None
+        entry = get_cached(key, family)
+        if isinstance(entry, CachedValue):
+            return entry.value
+        if not locked:
+            break
+
+    logger.info('Computing %s without waiting any longer for a concurrent computation.', key)
+    return _compute_and_set(key, compute, timeout, soft_timeout, family)
+
+
+def _compute_and_set(key, compute, timeout, soft_timeout, family):
+    value = compute()
+    refresh_at = time.time() + soft_timeout if soft_timeout is not None else None
+    set_cached(key, CachedValue(value, refresh_at), timeout, family)
+    return value
+
+
+def _refresh_in_background(key, compute, timeout, soft_timeout, family):
+    """ Refreshes a stale value in a background thread, unless it is already being refreshed. """
+    lock_key = f'{key}_lock'
+    if not cache.add(lock_key, True, settings.CACHE_SINGLE_FLIGHT_LOCK_TIMEOUT):
+        return
+
+    def refresh():
+        try:
+            _compute_and_set(key, compute, timeout, soft_timeout, family)
+        except Exception:  # pylint: disable=broad-except
+            logger.exception('Failed to refresh stale cache entry %s.', key)
+        finally:
+            cache.delete(lock_key)
+
+    _start_background_refresh(refresh)
+
+
+def _start_background_refresh(refresh):
+    threading.Thread(target=refresh, daemon=True).start()
+
+
+def set_large(key, value, timeout=DEFAULT_TIMEOUT, family=None):
+    """
+    Caches a value which may exceed the item size limit of the cache (e.g. memcached's 1 MB).
+
+    Values are pickled and, if larger than settings.CACHE_COMPRESSION_THRESHOLD bytes, compressed.  Payloads
+    still larger than settings.CACHE_CHUNK_SIZE bytes are split across several cache entries, and the key holds
+    a manifest of them.  The payload size, and whether the value had to be split, are reported as custom
+    metrics named after the key family.  Use get_large() to retrieve the value.
+
+    Returns
+        int: Number of bytes stored, excluding the manifest.
+    """
+    family = family or 'cache'
+    data = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+    set_custom_metric(f'{family}_cache_payload_bytes', len(data))
+
+    compressed = len(data) > settings.CACHE_COMPRESSION_THRESHOLD
+    if compressed:
+        data = zlib.compress(data)
+        set_custom_metric(f'{family}_cache_compressed_bytes', len(data))
+
+    chunk_size = settings.CACHE_CHUNK_SIZE
+    if len(data) <= chunk_size:
+        cache.set(key, ChunkedValue(compressed, data, 0, None), timeout)
+        return len(data)
+
+    # Chunks of each write are keyed by a new token so that readers never combine chunks of different writes.
+    token = uuid.uuid4().hex
+    chunks = {
+        _chunk_key(key, token, index): data[offset:offset + chunk_size]
+        for index, offset in enumerate(range(0, len(data), chunk_size))
+    }
+    logger.info('Splitting the %d byte cache value of %s into %d chunks.', len(data), key, len(chunks))
+    set_custom_metric(f'{family}_cache_oversize', len(chunks))
+    cache.set_many(chunks, timeout)
+    cache.set(key, ChunkedValue(compressed, None, len(chunks), token), timeout)
+    return len(data)
+
+
+def get_large(key):
+    """ Returns a value cached with set_large(), or None if the value, or any of its chunks, is not cached. """
+    return _get_large(key)[0]
+
+
+def _get_large(key):
+    """ Returns a (value, size) tuple of a value cached with set_large() and the size of its pickled data. """
+    manifest = cache.get(key)
+    if not isinstance(manifest, ChunkedValue):
+        return None, None
+
+    data = manifest.data
+    if manifest.chunks:
+        chunk_keys = [_chunk_key(key, manifest.token, index) for index in range(manifest.chunks)]
+        chunks = cache.get_many(chunk_keys)
+        if len(chunks) < manifest.chunks:
+            return None, None
+        data = b''.join(chunks[chunk_key] for chunk_key in chunk_keys)
+
+    if manifest.compressed:
+        data = zlib.decompress(data)
+    return pickle.loads(data), len(data)
+
+
+def _chunk_key(key, token, index):
+    return f'{key}_{token}_{index}'
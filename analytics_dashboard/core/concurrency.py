@@ -0,0 +1,201 @@
+"""
+Runs independent upstream calls (data API, course API, LMS) concurrently, so that a page waits for the slowest of
+its calls rather than for all of them in turn.
+"""
+import asyncio
+import contextvars
+import functools
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ALL_COMPLETED, FIRST_EXCEPTION, Future, ThreadPoolExecutor
+from concurrent.futures import wait as futures_wait
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+from edx_django_utils.cache import RequestCache
+
+from analytics_dashboard.core.exceptions import ServiceUnavailableError
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+# Marks the threads of the pool, whose calls make the calls they fan out if the pool has not picked them up yet.
+_worker = threading.local()
+
+# Deadline (in time.monotonic() seconds) shared by all the upstream calls of the current request
+_deadline = contextvars.ContextVar('upstream_deadline', default=None)
+
+
+def _reset_executor():
+    global _executor  # pylint: disable=global-statement
+    _executor = None
+
+
+# Forked processes do not inherit the threads of their parent's pool.
+os.register_at_fork(after_in_child=_reset_executor)
+
+
+def _get_executor():
+    global _executor  # pylint: disable=global-statement
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=settings.UPSTREAM_FAN_OUT_MAX_WORKERS,
+                                           thread_name_prefix='upstream-fan-out')
+    return _executor
+
+
+def set_upstream_deadline(timeout):
+    """
+    Sets the deadline shared by all upstream calls fanned out from the current context (e.g. the request, see
+    UpstreamDeadlineMiddleware) to timeout seconds from now, or removes it if timeout is None.
+    """
+    _deadline.set(None if timeout is None else time.monotonic() + timeout)
+
+
+def _get_timeout(timeout):
+    """ Returns the timeout of fanned out calls, shortened to the time left before the deadline, if any. """
+    timeout = settings.UPSTREAM_FAN_OUT_TIMEOUT if timeout is None else timeout
+    deadline = _deadline.get()
+    if deadline is not None:
+        timeout = max(min(timeout, deadline - time.monotonic()), 0)
+    return timeout
+
+
+def fan_out(*calls, timeout=None, return_exceptions=False):
+    """
+    Calls each callable concurrently, in the thread pool of the process, and returns their results in order.
+
+    Calls run in a copy of the caller's context, so they see its active language and materialization mode, but
+    not its request cache, which is thread-local: values memoized by a call are dropped when it returns.  Database
+    connections opened by calls (e.g. to read waffle switches) are closed when they return.
+
+    The pool has settings.UPSTREAM_FAN_OUT_MAX_WORKERS threads, which bounds the number of upstream calls in
+    flight across the process.  Calls are made inline, one after another, if the pool is disabled (0 workers).
+    When fanning out from a call already running in the pool, the calls no thread of the pool has picked up are
+    made by the calling thread, which would otherwise wait on calls queued behind it.
+
+    Arguments
+        calls (callables): Calls to make, without arguments.
+        timeout (float): Deadline, in seconds, for all calls to return, defaults to
+            settings.UPSTREAM_FAN_OUT_TIMEOUT, and shortened to the deadline of the request (see
+            set_upstream_deadline()), so that the calls of a request, however many fan_out() calls make them, share
+            one deadline.  Calls still running at the deadline are abandoned, and fail with
+            ServiceUnavailableError.  The deadline does not apply to inline calls.
+        return_exceptions (bool): Return the exceptions raised by calls in place of their results, rather than
+            raise the first of them.
+
+    Returns
+        list of the results of the calls.
+    """
+    if not settings.UPSTREAM_FAN_OUT_MAX_WORKERS or len(calls) < 2:
+        return [_call_inline(call, return_exceptions) for call in calls]
+
+    timeout = _get_timeout(timeout)
+    executor = _get_executor()
+    futures = [executor.submit(contextvars.copy_context().run, _run_in_worker, call) for call in calls]
+    if getattr(_worker, 'active', False):
+        futures = [_call_if_pending(future, call) for future, call in zip(futures, calls)]
+    done, not_done = futures_wait(futures, timeout, return_when=ALL_COMPLETED if return_exceptions else FIRST_EXCEPTION)
+    return _get_results(futures, done, not_done, timeout, return_exceptions)
+
+
+async def fan_out_async(*calls, timeout=None, return_exceptions=False):
+    """
+    Awaits the calls made concurrently, in the thread pool of the process, and returns their results in order.
+
+    The asynchronous counterpart of fan_out(), for async views: the event loop is not blocked while the calls are
+    made, and many requests can await their calls at once.  The upstream clients are blocking, so calls are still
+    made in the pool's threads, and at most settings.UPSTREAM_FAN_OUT_MAX_WORKERS calls are in flight across the
+    process, however many requests await them.  Calls are made in the pool even if a single call is given, and one
+    after another in a thread of the event loop if the pool is disabled.
+
+    Arguments
+        calls (callables): Calls to make, without arguments.
+        timeout (float): Deadline, in seconds, for all calls to return, see fan_out().
+        return_exceptions (bool): Return the exceptions raised by calls in place of their results, rather than
+            raise the first of them.
+
+    Returns
+        list of the results of the calls.
+    """
+    if not settings.UPSTREAM_FAN_OUT_MAX_WORKERS:
+        return await sync_to_async(_call_all_in_worker, thread_sensitive=False)(calls, return_exceptions)
+    if not calls:
+        return []
+
+    timeout = _get_timeout(timeout)
+    loop = asyncio.get_running_loop()
+    executor = _get_executor()
+    futures = [loop.run_in_executor(executor, contextvars.copy_context().run, _run_in_worker, call)
+               for call in calls]
+    done, not_done = await asyncio.wait(
+        futures, timeout=timeout,
+        return_when=asyncio.ALL_COMPLETED if return_exceptions else asyncio.FIRST_EXCEPTION,
+    )
+    return _get_results(futures, done, not_done, timeout, return_exceptions)
+
+
+def _get_results(futures, done, not_done, timeout, return_exceptions):
+    """ Returns the results of the futures of fanned out calls, or raises the first exception if not returned. """
+    # Calls still queued are dropped, those running cannot be interrupted and are left to finish on their own.
+    for future in not_done:
+        future.cancel()
+
+    if not return_exceptions:
+        for future in futures:
+            if future in done and future.exception() is not None:
+                raise future.exception()
+
+    deadline_error = None
+    if not_done:
+        logger.error('%d of %d upstream calls did not return within %ss.', len(not_done), len(futures), timeout)
+        deadline_error = ServiceUnavailableError(f'Upstream calls did not return within {timeout}s.')
+        if not return_exceptions:
+            raise deadline_error
+
+    return [future.exception() or future.result() if future in done else deadline_error for future in futures]
+
+
+def _call_if_pending(future, call):
+    """ Makes the call in the current thread, unless its future has already been picked up by the pool. """
+    if not future.cancel():
+        return future
+
+    future = Future()
+    try:
+        future.set_result(call())
+    except Exception as e:  # pylint: disable=broad-except
+        future.set_exception(e)
+    return future
+
+
+def _call_inline(call, return_exceptions):
+    try:
+        return call()
+    except Exception as e:  # pylint: disable=broad-except
+        if return_exceptions:
+            return e
+        raise
+
+
+def _call_all_in_worker(calls, return_exceptions):
+    """
+    Makes the calls one after another in the current thread, which is shared by other requests, as the pool's
+    threads are.
+    """
+    return [_call_inline(functools.partial(_run_in_worker, call), return_exceptions) for call in calls]
+
+
+def _run_in_worker(call):
+    _worker.active = True
+    try:
+        return call()
+    finally:
+        _worker.active = False
+        RequestCache.clear_all_namespaces()
+        close_old_connections()
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from analytics_dashboard.core.caching import invalidate_course_cache
+
+
+class Command(BaseCommand):
+    """A command to invalidate all cached data (structure, sections, data API responses, etc.) of courses."""
+
+    help = 'Invalidate the cached data of the given courses.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('course_ids', nargs='+', metavar='course_id')
+
+    def handle(self, *args, **options):
+        for course_id in options['course_ids']:
+            invalidate_course_cache(course_id)
@@ -4,10 +4,13 @@ Middleware for Language Preferences
 
 import logging
 
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
 from django.template.response import TemplateResponse
 from django.utils.deprecation import MiddlewareMixin
 from lang_pref_middleware import middleware
 
+from analytics_dashboard.core.concurrency import set_upstream_deadline
 from analytics_dashboard.core.exceptions import ServiceUnavailableError
 
 logger = logging.getLogger(__name__)
@@ -34,3 +37,28 @@ class ServiceUnavailableExceptionMiddleware(MiddlewareMixin):
             return TemplateResponse(request, '503.html', status=503)
 
         return None
+
+
+class UpstreamDeadlineMiddleware(MiddlewareMixin):
+    """
+    Gives the upstream calls of each request (see fan_out()) one deadline, settings.UPSTREAM_FAN_OUT_TIMEOUT
+    seconds after the request starts.
+    """
+
+    def process_request(self, request):
+        set_upstream_deadline(settings.UPSTREAM_FAN_OUT_TIMEOUT)
+
+    def process_response(self, request, response):
+        set_upstream_deadline(None)
+        return response
+
+
+class AsyncViewURLConfMiddleware(MiddlewareMixin):
+    """
+    Resolves the requests served under ASGI with settings.ASGI_URLCONF, whose views await their upstream data
+    asynchronously.  Requests served under WSGI keep the URLs of settings.ROOT_URLCONF.
+    """
+
+    def process_request(self, request):
+        if isinstance(request, ASGIRequest):
+            request.urlconf = settings.ASGI_URLCONF
@@ -0,0 +1,373 @@
+import pickle
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from edx_django_utils.cache import RequestCache
+
+from analytics_dashboard.core.caching import (
+    CachedValue,
+    ChunkedValue,
+    LocalCache,
+    cache_stats,
+    cache_timeout,
+    course_cache_key,
+    delete_cached,
+    estimate_size,
+    get_cached,
+    get_large,
+    get_many_cached,
+    get_or_set_single_flight,
+    invalidate_course_cache,
+    local_cache,
+    set_cached,
+    set_large,
+    set_many_cached,
+)
+
+
+@override_settings(CACHE_SINGLE_FLIGHT_WAIT=1, CACHE_SINGLE_FLIGHT_POLL_INTERVAL=0)
+class SingleFlightTests(TestCase):
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.compute = mock.Mock(return_value='computed')
+
+    def test_hit(self):
+        cache.set('key', CachedValue('cached', None))
+        self.assertEqual(get_or_set_single_flight('key', self.compute), 'cached')
+        self.compute.assert_not_called()
+
+    def test_miss(self):
+        self.assertEqual(get_or_set_single_flight('key', self.compute), 'computed')
+        self.assertEqual(cache.get('key'), CachedValue('computed', None))
+        self.assertIsNone(cache.get('key_lock'))
+        self.compute.assert_called_once_with()
+
+    def test_lock_released_on_error(self):
+        self.compute.side_effect = ValueError
+        with self.assertRaises(ValueError):
+            get_or_set_single_flight('key', self.compute)
+        self.assertIsNone(cache.get('key_lock'))
+
+    def test_waits_for_concurrent_computation(self):
+        """ Callers that fail to acquire the lock are served the value cached by the lock holder. """
+        cache.add('key_lock', True)
+
+        def compute_concurrently(_seconds):
+            cache.set('key', CachedValue('concurrent', None))
+
+        with mock.patch('analytics_dashboard.core.caching.time.sleep', side_effect=compute_concurrently):
+            self.assertEqual(get_or_set_single_flight('key', self.compute), 'concurrent')
+        self.compute.assert_not_called()
+
+    def test_computes_when_lock_released_without_value(self):
+        cache.add('key_lock', True)
+        with mock.patch('analytics_dashboard.core.caching.time.sleep', side_effect=lambda _: cache.delete('key_lock')):
+            self.assertEqual(get_or_set_single_flight('key', self.compute), 'computed')
+        self.compute.assert_called_once_with()
+
+    @override_settings(CACHE_SINGLE_FLIGHT_WAIT=0)
+    def test_computes_after_waiting(self):
+        cache.add('key_lock', True)
+        self.assertEqual(get_or_set_single_flight('key', self.compute), 'computed')
+        self.assertEqual(cache.get('key').value, 'computed')
+
+
+@mock.patch('analytics_dashboard.core.caching._start_background_refresh', side_effect=lambda refresh: refresh())
+class StaleWhileRevalidateTests(TestCase):
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.compute = mock.Mock(return_value='computed')
+
+    def test_fresh(self, start_mock):
+        with mock.patch('analytics_dashboard.core.caching.time.time', return_value=1000):
+            self.assertEqual(get_or_set_single_flight('key', self.compute, soft_timeout=60), 'computed')
+            self.assertEqual(cache.get('key'), CachedValue('computed', 1060))
+            self.assertEqual(get_or_set_single_flight('key', self.compute, soft_timeout=60), 'computed')
+        self.compute.assert_called_once_with()
+        start_mock.assert_not_called()
+
+    def test_stale_value_served_while_refreshing(self, start_mock):
+        cache.set('key', CachedValue('stale', 1000))
+        with mock.patch('analytics_dashboard.core.caching.time.time', return_value=1000):
+            self.assertEqual(get_or_set_single_flight('key', self.compute, soft_timeout=60), 'stale')
+            start_mock.assert_called_once()
+            self.assertEqual(cache.get('key'), CachedValue('computed', 1060))
+        self.assertIsNone(cache.get('key_lock'))
+
+    def test_single_refresh(self, start_mock):
+        """ Stale values are not refreshed again while a refresh is in progress. """
+        cache.set('key', CachedValue('stale', 1000))
+        cache.add('key_lock', True)
+        with mock.patch('analytics_dashboard.core.caching.time.time', return_value=1000):
+            self.assertEqual(get_or_set_single_flight('key', self.compute, soft_timeout=60), 'stale')
+        start_mock.assert_not_called()
+        self.compute.assert_not_called()
+
+    def test_failed_refresh(self, _start_mock):
+        """ A failed refresh keeps serving the stale value and releases the lock so the refresh is retried. """
+        self.compute.side_effect = ValueError
+        cache.set('key', CachedValue('stale', 1000))
+        with mock.patch('analytics_dashboard.core.caching.time.time', return_value=1000):
+            self.assertEqual(get_or_set_single_flight('key', self.compute, soft_timeout=60), 'stale')
+        self.assertEqual(cache.get('key'), CachedValue('stale', 1000))
+        self.assertIsNone(cache.get('key_lock'))
+
+
+@override_settings(CACHE_COMPRESSION_THRESHOLD=100, CACHE_CHUNK_SIZE=50)
+class LargeValueTests(TestCase):
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+
+    def test_small(self):
+        set_large('key', 'value')
+        self.assertFalse(cache.get('key').compressed)
+        self.assertEqual(get_large('key'), 'value')
+
+    @mock.patch('analytics_dashboard.core.caching.set_custom_metric')
+    def test_chunked(self, metric_mock):
+        value = [str(index) for index in range(1000)]
+        set_large('key', value, family='structure')
+
+        manifest = cache.get('key')
+        self.assertTrue(manifest.compressed)
+        self.assertIsNone(manifest.data)
+        self.assertGreater(manifest.chunks, 1)
+        self.assertEqual(get_large('key'), value)
+        metric_mock.assert_any_call('structure_cache_oversize', manifest.chunks)
+
+    def test_missing_chunk(self):
+        set_large('key', [str(index) for index in range(1000)])
+        manifest = cache.get('key')
+        cache.delete(f'key_{manifest.token}_0')
+        self.assertIsNone(get_large('key'))
+
+    def test_missing(self):
+        self.assertIsNone(get_large('key'))
+        cache.set('key', 'not a manifest')
+        self.assertIsNone(get_large('key'))
+
+    @override_settings(CACHE_LARGE_VALUE_FAMILIES=('structure',))
+    def test_single_flight(self):
+        compute = mock.Mock(return_value=[str(index) for index in range(1000)])
+        self.assertEqual(get_or_set_single_flight('key', compute, family='structure'), compute.return_value)
+        self.assertIsInstance(cache.get('key'), ChunkedValue)
+        self.assertEqual(get_or_set_single_flight('key', compute, family='structure'), compute.return_value)
+        compute.assert_called_once_with()
+
+
+class LocalCacheTests(TestCase):
+    def test_get(self):
+        local = LocalCache(10, 1000)
+        self.assertEqual(local.get('key'), (False, None))
+        local.set('key', None, 60)
+        self.assertEqual(local.get('key'), (True, None))
+
+    def test_expiry(self):
+        local = LocalCache(10, 1000)
+        with mock.patch('analytics_dashboard.core.caching.time.monotonic', return_value=100):
+            local.set('key', 'value', 10)
+        with mock.patch('analytics_dashboard.core.caching.time.monotonic', return_value=110):
+            self.assertEqual(local.get('key'), (False, None))
+        self.assertEqual(len(local), 0)
+
+    def test_max_entries(self):
+        local = LocalCache(2, 1000)
+        local.set('a', 1, 60)
+        local.set('b', 2, 60)
+        local.get('a')
+        local.set('c', 3, 60)
+        self.assertEqual(local.get('b'), (False, None))
+        self.assertEqual(local.get('a'), (True, 1))
+        self.assertEqual(local.get('c'), (True, 3))
+
+    def test_max_bytes(self):
+        local = LocalCache(10, 200)
+        local.set('a', 'a' * 80, 60)
+        local.set('b', 'b' * 80, 60)
+        self.assertEqual(len(local), 2)
+        local.set('c', 'c' * 80, 60)
+        self.assertEqual(local.get('a'), (False, None))
+        self.assertLessEqual(local.bytes, 200)
+
+        local.set('d', 'd' * 500, 60)
+        self.assertEqual(local.get('d'), (False, None))
+        self.assertEqual(len(local), 2)
+
+    def test_size(self):
+        local = LocalCache(10, 1000)
+        with mock.patch('analytics_dashboard.core.caching.pickle.dumps') as dumps_mock:
+            local.set('a', {'values': ['a' * 100, 1, 2.0, None]}, 60)
+            local.set('b', 'b', 60, size=300)
+            dumps_mock.assert_not_called()
+        self.assertEqual(local.bytes, estimate_size({'values': ['a' * 100, 1, 2.0, None]}) + 300)
+
+    def test_estimate_size(self):
+        value = {
+            'course_id': 'course-v1:edX+DemoX+Demo',
+            'rows': [{'id': f'block-v1:edX+DemoX+Demo+type@problem+block@{index}', 'total_submissions': 1000 + index,
+                      'correct_percent': index / 100, 'tags': None} for index in range(100)],
+        }
+        value['self'] = value
+        pickled = len(pickle.dumps(value, pickle.HIGHEST_PROTOCOL))
+        self.assertGreater(estimate_size(value), pickled / 2)
+        self.assertLess(estimate_size(value), pickled * 2)
+
+
+@override_settings(CACHE_LOCAL_TIMEOUTS={'programs': 60})
+class TieredCacheTests(TestCase):
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        local_cache.clear()
+
+    def test_local_tier(self):
+        set_cached('key', 'value', family='programs')
+        self.assertEqual(get_cached('key', family='programs'), 'value')
+
+        # Reads of the family are now served from the local tier...
+        with mock.patch('analytics_dashboard.core.caching.cache.get') as get_mock:
+            self.assertEqual(get_cached('key', family='programs'), 'value')
+            get_mock.assert_not_called()
+
+        # ...while other families are always read from the shared cache.
+        set_cached('other', 'value', family='summaries')
+        get_cached('other', family='summaries')
+        self.assertEqual(local_cache.get('other'), (False, None))
+
+    def test_writes_and_deletes_invalidate(self):
+        set_cached('key', 'value', family='programs')
+        get_cached('key', family='programs')
+        set_cached('key', 'new value', family='programs')
+        self.assertEqual(get_cached('key', family='programs'), 'new value')
+
+        delete_cached('key')
+        self.assertIsNone(get_cached('key', family='programs'))
+        self.assertEqual(get_cached('key', family='programs', default=[]), [])
+
+    def test_stale_values_not_kept(self):
+        cache.set('key', CachedValue('stale', 0))
+        self.assertEqual(get_cached('key', family='programs'), CachedValue('stale', 0))
+        self.assertEqual(local_cache.get('key'), (False, None))
+
+
+@override_settings(CACHE_LOCAL_TIMEOUTS={'programs': 60}, CACHE_COMPRESSION_THRESHOLD=100)
+class CacheStatsTests(TestCase):
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        local_cache.clear()
+        cache_stats.reset()
+
+    def assertStats(self, family, **expected):
+        stats = cache_stats.snapshot()[family]
+        self.assertDictEqual({name: stats[name] for name in expected}, expected)
+        self.assertGreater(stats['seconds'], 0)
+
+    @mock.patch('analytics_dashboard.core.caching.accumulate')
+    def test_reads(self, accumulate_mock):
+        get_cached('key', family='problem')
+        cache.set('key', 'value')
+        get_cached('key', family='problem')
+        get_many_cached(['key', 'other'], family='problem')
+        self.assertStats('problem', hits=2, misses=2, local_hits=0, writes=0)
+        accumulate_mock.assert_any_call('problem_cache_misses', 1)
+
+        get_cached('key', family='programs')
+        get_cached('key', family='programs')
+        get_cached('key')
+        self.assertStats('programs', hits=1, local_hits=1, misses=0)
+        self.assertStats('other', hits=1)
+
+    def test_writes(self):
+        set_cached('key', 'value', family='problem')
+        set_many_cached({'key': 'x' * 1000, 'other': 'y' * 1000}, family='summaries')
+        self.assertStats('problem', writes=1, hits=0)
+        self.assertLess(cache_stats.snapshot()['problem']['bytes_written'], 100)
+
+        # The size of values which are not large is estimated rather than pickled.
+        with mock.patch('analytics_dashboard.core.caching.estimate_size', return_value=1000):
+            set_cached('key', 'value', family='problem')
+        self.assertGreater(cache_stats.snapshot()['problem']['bytes_written'], 1000)
+
+        # Large values are counted as stored, i.e. compressed.
+        stats = cache_stats.snapshot()['summaries']
+        self.assertEqual(stats['writes'], 2)
+        self.assertLess(stats['bytes_written'], 200)
+
+    def test_reset(self):
+        get_cached('key', family='problem')
+        cache_stats.reset()
+        self.assertDictEqual(cache_stats.snapshot(), {})
+
+
+@override_settings(CACHE_TIMEOUTS={'programs': 1000}, CACHE_TIMEOUT_JITTER=0.1)
+class CacheTimeoutTests(TestCase):
+    def test_family_timeout(self):
+        with mock.patch('analytics_dashboard.core.caching.random.uniform', return_value=0):
+            self.assertEqual(cache_timeout('programs'), 1000)
+            self.assertEqual(cache_timeout('programs', 60), 60)
+            self.assertEqual(cache_timeout('other'), cache.default_timeout)
+
+    def test_jitter(self):
+        timeouts = {cache_timeout('programs') for _ in range(100)}
+        self.assertGreater(len(timeouts), 1)
+        self.assertLessEqual(max(timeouts), 1000)
+        self.assertGreaterEqual(min(timeouts), 900)
+
+    def test_no_expiry(self):
+        self.assertIsNone(cache_timeout('programs', None))
+        self.assertEqual(cache_timeout('programs', 0), 0)
+
+    @mock.patch('analytics_dashboard.core.caching.cache.set_many')
+    def test_writes(self, set_many_mock):
+        with mock.patch('analytics_dashboard.core.caching.random.uniform', return_value=0.1):
+            set_cached('key', 'value', family='programs')
+        set_many_mock.assert_called_once_with({'key': 'value'}, 900)
+
+
+class CourseCacheVersionTests(TestCase):
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        RequestCache.clear_all_namespaces()
+
+    def test_course_cache_key(self):
+        key = course_cache_key('edX/DemoX/Demo_Course', 'structure')
+        self.assertEqual(course_cache_key('edX/DemoX/Demo_Course', 'structure'), key)
+        self.assertNotEqual(course_cache_key('edX/DemoX/Demo_Course', 'grading_policy'), key)
+        self.assertNotEqual(course_cache_key('edX/DemoX/Other_Course', 'structure'), key)
+
+        # The version is shared through the cache rather than the request.
+        RequestCache.clear_all_namespaces()
+        self.assertEqual(course_cache_key('edX/DemoX/Demo_Course', 'structure'), key)
+
+    def test_invalidate_course_cache(self):
+        key = course_cache_key('edX/DemoX/Demo_Course', 'structure')
+        other_key = course_cache_key('edX/DemoX/Other_Course', 'structure')
+
+        invalidate_course_cache('edX/DemoX/Demo_Course')
+        self.assertNotEqual(course_cache_key('edX/DemoX/Demo_Course', 'structure'), key)
+        self.assertEqual(course_cache_key('edX/DemoX/Other_Course', 'structure'), other_key)
+
+        # Other processes see the new version once their request ends.
+        new_key = course_cache_key('edX/DemoX/Demo_Course', 'structure')
+        RequestCache.clear_all_namespaces()
+        self.assertEqual(course_cache_key('edX/DemoX/Demo_Course', 'structure'), new_key)
+
+    def test_invalidate_course_pipeline_data(self):
+        key = course_cache_key('edX/DemoX/Demo_Course', 'structure')
+        data_key = course_cache_key('edX/DemoX/Demo_Course', 'problem', pipeline_data=True)
+        self.assertNotEqual(course_cache_key('edX/DemoX/Demo_Course', 'problem'), data_key)
+
+        invalidate_course_cache('edX/DemoX/Demo_Course', pipeline_data=True)
+        self.assertEqual(course_cache_key('edX/DemoX/Demo_Course', 'structure'), key)
+        new_data_key = course_cache_key('edX/DemoX/Demo_Course', 'problem', pipeline_data=True)
+        self.assertNotEqual(new_data_key, data_key)
+
+        # Invalidating all the data of the course also invalidates its pipeline data.
+        invalidate_course_cache('edX/DemoX/Demo_Course')
+        self.assertNotEqual(course_cache_key('edX/DemoX/Demo_Course', 'problem', pipeline_data=True), new_data_key)
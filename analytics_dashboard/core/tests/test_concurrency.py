@@ -0,0 +1,160 @@
+import threading
+import time
+from contextvars import ContextVar
+from unittest import mock
+
+from asgiref.sync import sync_to_async
+from django.test import TestCase
+from django.test.utils import override_settings
+from edx_django_utils.cache import RequestCache
+
+from analytics_dashboard.core.caching import get_course_cache_version, invalidate_course_cache
+from analytics_dashboard.core.concurrency import fan_out, fan_out_async, set_upstream_deadline
+from analytics_dashboard.core.exceptions import ServiceUnavailableError
+
+context_value = ContextVar('context_value', default=None)
+
+
+@override_settings(UPSTREAM_FAN_OUT_MAX_WORKERS=4, UPSTREAM_FAN_OUT_TIMEOUT=5)
+class FanOutTests(TestCase):
+    def test_concurrent(self):
+        barrier = threading.Barrier(3, timeout=5)
+
+        def call(value):
+            # Only returns once all three calls are running.
+            barrier.wait()
+            return value
+
+        self.assertEqual(fan_out(lambda: call(1), lambda: call(2), lambda: call(3)), [1, 2, 3])
+
+    def test_context(self):
+        token = context_value.set('request')
+        self.addCleanup(context_value.reset, token)
+        self.assertEqual(fan_out(context_value.get, context_value.get), ['request', 'request'])
+
+    def test_request_cache_not_kept(self):
+        def memoize():
+            request_cache = RequestCache('fan_out')
+            found = request_cache.get_cached_response('key').is_found
+            request_cache.set('key', True)
+            return found
+
+        for _ in range(3):
+            self.assertEqual(fan_out(memoize, memoize), [False, False])
+
+    def test_exceptions(self):
+        def fail():
+            raise ValueError('upstream unavailable')
+
+        with self.assertRaisesRegex(ValueError, 'upstream unavailable'):
+            fan_out(lambda: 1, fail)
+
+        result, error = fan_out(lambda: 1, fail, return_exceptions=True)
+        self.assertEqual(result, 1)
+        self.assertIsInstance(error, ValueError)
+
+    def test_deadline(self):
+        release = threading.Event()
+        self.addCleanup(release.set)
+
+        with self.assertRaises(ServiceUnavailableError):
+            fan_out(lambda: 1, lambda: release.wait(5), timeout=0.1)
+
+        result, error = fan_out(lambda: 1, lambda: release.wait(5), timeout=0.1, return_exceptions=True)
+        self.assertEqual(result, 1)
+        self.assertIsInstance(error, ServiceUnavailableError)
+
+    def test_request_deadline(self):
+        release = threading.Event()
+        self.addCleanup(release.set)
+        set_upstream_deadline(0.5)
+        self.addCleanup(set_upstream_deadline, None)
+
+        self.assertEqual(fan_out(lambda: 1, lambda: time.sleep(0.3)), [1, None])
+
+        # Later calls only get the time left before the deadline of the request.
+        start = time.monotonic()
+        with self.assertRaises(ServiceUnavailableError):
+            fan_out(lambda: 1, lambda: release.wait(5))
+        self.assertLess(time.monotonic() - start, 1)
+
+    def test_nested(self):
+        self.assertEqual(fan_out(lambda: fan_out(lambda: 1, lambda: 2), lambda: 3), [[1, 2], 3])
+
+    @override_settings(UPSTREAM_FAN_OUT_MAX_WORKERS=1)
+    def test_nested_in_busy_pool(self):
+        # The calls fanned out by the only thread of the pool are made by that thread.
+        with mock.patch('analytics_dashboard.core.concurrency._executor', None):
+            worker_results = fan_out(lambda: fan_out(threading.current_thread, threading.current_thread),
+                                     threading.current_thread, timeout=5)
+        self.assertEqual(worker_results[0], [worker_results[1], worker_results[1]])
+
+    @override_settings(UPSTREAM_FAN_OUT_MAX_WORKERS=0)
+    def test_disabled(self):
+        caller = threading.current_thread()
+        self.assertEqual(fan_out(threading.current_thread, threading.current_thread), [caller, caller])
+
+    def test_inline_exceptions(self):
+        def fail():
+            raise ValueError
+
+        with self.assertRaises(ValueError):
+            fan_out(fail)
+        self.assertIsInstance(fan_out(fail, return_exceptions=True)[0], ValueError)
+
+
+@override_settings(UPSTREAM_FAN_OUT_MAX_WORKERS=4, UPSTREAM_FAN_OUT_TIMEOUT=5)
+class FanOutAsyncTests(TestCase):
+    async def test_concurrent(self):
+        barrier = threading.Barrier(2, timeout=5)
+
+        def call(value):
+            barrier.wait()
+            return value
+
+        self.assertEqual(await fan_out_async(lambda: call(1), lambda: call(2)), [1, 2])
+
+    async def test_context(self):
+        token = context_value.set('request')
+        try:
+            self.assertEqual(await fan_out_async(context_value.get), ['request'])
+        finally:
+            context_value.reset(token)
+
+    async def test_exceptions(self):
+        def fail():
+            raise ValueError('upstream unavailable')
+
+        with self.assertRaisesRegex(ValueError, 'upstream unavailable'):
+            await fan_out_async(lambda: 1, fail)
+
+        result, error = await fan_out_async(lambda: 1, fail, return_exceptions=True)
+        self.assertEqual(result, 1)
+        self.assertIsInstance(error, ValueError)
+
+    async def test_deadline(self):
+        release = threading.Event()
+        try:
+            with self.assertRaises(ServiceUnavailableError):
+                await fan_out_async(lambda: release.wait(5), timeout=0.1)
+
+            result, error = await fan_out_async(lambda: 1, lambda: release.wait(5), timeout=0.1,
+                                                return_exceptions=True)
+            self.assertEqual(result, 1)
+            self.assertIsInstance(error, ServiceUnavailableError)
+        finally:
+            release.set()
+
+    @override_settings(UPSTREAM_FAN_OUT_MAX_WORKERS=0)
+    async def test_disabled(self):
+        self.assertEqual(await fan_out_async(lambda: 1, lambda: 2), [1, 2])
+        self.assertEqual(await fan_out_async(), [])
+
+    @override_settings(UPSTREAM_FAN_OUT_MAX_WORKERS=0)
+    async def test_disabled_request_cache_not_kept(self):
+        # The threads making the calls are shared by requests, which must see the course cache invalidated
+        # between them.
+        course_id = 'edX/DemoX/Demo_Course'
+        version = (await fan_out_async(lambda: get_course_cache_version(course_id)))[0]
+        await sync_to_async(invalidate_course_cache)(course_id)
+        self.assertNotEqual((await fan_out_async(lambda: get_course_cache_version(course_id)))[0], version)
@@ -1,17 +1,25 @@
+import asyncio
 import logging
 
+from django.conf import settings
 from django.template.response import TemplateResponse
-from django.test import RequestFactory, TestCase
+from django.test import AsyncRequestFactory, RequestFactory, TestCase
+from django.test.utils import override_settings
+from django.urls import resolve
 from django_dynamic_fixture import G
 from lang_pref_middleware.tests import LangPrefMiddlewareTestCaseMixin
 from testfixtures import LogCapture
 
+from analytics_dashboard.core import concurrency
 from analytics_dashboard.core.exceptions import ServiceUnavailableError
 from analytics_dashboard.core.middleware import (
+    AsyncViewURLConfMiddleware,
     LanguagePreferenceMiddleware,
     ServiceUnavailableExceptionMiddleware,
+    UpstreamDeadlineMiddleware,
 )
 from analytics_dashboard.core.models import User
+from analytics_dashboard.courses.tests.utils import CourseSamples
 
 
 class MiddlewareTestCase(TestCase):
@@ -59,3 +67,44 @@ class ServiceUnavaliableMiddlewareTests(MiddlewareAssertionMixin, MiddlewareTest
 
             # Verify the exception was logged
             log_capture.check(('analytics_dashboard.core.middleware', 'ERROR', str(exception)),)
+
+
+class UpstreamDeadlineMiddlewareTests(MiddlewareTestCase):
+    middleware_class = UpstreamDeadlineMiddleware
+
+    @override_settings(UPSTREAM_FAN_OUT_TIMEOUT=5)
+    def test_deadline(self):
+        request = self.factory.get('/')
+        self.addCleanup(concurrency.set_upstream_deadline, None)
+        self.middleware.process_request(request)
+        # pylint: disable=protected-access
+        self.assertLessEqual(concurrency._get_timeout(10), 5)
+
+        response = TemplateResponse(request, '503.html')
+        self.assertIs(self.middleware.process_response(request, response), response)
+        self.assertEqual(concurrency._get_timeout(10), 10)
+
+
+class AsyncViewURLConfMiddlewareTests(MiddlewareTestCase):
+    middleware_class = AsyncViewURLConfMiddleware
+
+    def test_wsgi(self):
+        request = self.factory.get('/')
+        self.middleware.process_request(request)
+        self.assertFalse(hasattr(request, 'urlconf'))
+
+    def test_asgi(self):
+        request = AsyncRequestFactory().get('/')
+        self.middleware.process_request(request)
+        self.assertEqual(request.urlconf, settings.ASGI_URLCONF)
+
+    def test_asgi_urls(self):
+        path = f'/courses/{CourseSamples.DEMO_COURSE_ID}/'
+        self.assertFalse(asyncio.iscoroutinefunction(resolve(path).func))
+
+        match = resolve(path, urlconf=settings.ASGI_URLCONF)
+        self.assertTrue(asyncio.iscoroutinefunction(match.func))
+        self.assertEqual(match.url_name, 'home')
+        self.assertEqual(match.namespaces, ['courses'])
+        # Views other than the course pages are served as they are.
+        self.assertEqual(resolve('/', urlconf=settings.ASGI_URLCONF).func, resolve('/').func)
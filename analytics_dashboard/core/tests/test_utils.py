@@ -1,18 +1,33 @@
+import calendar
+import datetime
+import os
 import uuid
 from copy import deepcopy
 
 from unittest.mock import MagicMock, call, patch
-from ddt import ddt
+import httpretty
+import requests
+from analyticsclient.client import Client
+from analyticsclient.exceptions import ClientError, InvalidRequestError, NotFoundError
+from analyticsclient.exceptions import TimeoutError as ClientTimeoutError
+from ddt import data, ddt, unpack
 from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.test import TestCase
 from django.test.utils import override_settings
 from django.utils.translation import gettext_lazy as _
 
+from analytics_dashboard.core import utils
 from analytics_dashboard.core.utils import (
+    AnalyticsApiClient,
     CourseStructureApiClient,
     Message,
+    close_shared_clients,
     delete_auto_auth_users,
+    OAuthAPIClient,
+    get_analytics_client,
+    get_lms_session,
+    get_oauth_client,
     remove_keys,
     sanitize_cache_key,
     translate_dict_values,
@@ -175,3 +190,158 @@ class CourseStructureApiClientTests(TestCase):
         )
         # pylint: disable=protected-access
         self.assertEqual(client._timeout, (2.05, 4))
+
+
+@ddt
+class AnalyticsApiClientTests(TestCase):
+    BASE_URL = 'http://data-api.test/api/v0'
+
+    def setUp(self):
+        super().setUp()
+        self.client = AnalyticsApiClient(self.BASE_URL, auth_token='token', timeout=5)
+
+    @httpretty.activate
+    def test_get(self):
+        httpretty.register_uri(httpretty.GET, f'{self.BASE_URL}/courses/', body='{"count": 1}')
+        self.assertEqual(self.client.get('courses/', data={'fields': ['a', 'b']}), {'count': 1})
+
+        request = httpretty.last_request()
+        self.assertEqual(request.headers['Authorization'], 'Token token')
+        self.assertEqual(request.querystring, {'fields': ['a,b']})
+
+    @httpretty.activate
+    def test_csv(self):
+        httpretty.register_uri(httpretty.GET, f'{self.BASE_URL}/courses/', body='a,b')
+        self.assertEqual(self.client.get('courses/', data_format='csv'), 'a,b')
+        self.assertEqual(httpretty.last_request().headers['Accept'], 'text/csv')
+
+    @httpretty.activate
+    @data((400, InvalidRequestError), (404, NotFoundError), (500, ClientError))
+    @unpack
+    def test_error_status(self, status, error_class):
+        httpretty.register_uri(httpretty.GET, f'{self.BASE_URL}/courses/', status=status)
+        # Errors are those of the library's client.
+        for client in (self.client, Client(self.BASE_URL, auth_token='token', timeout=5)):
+            with self.assertRaises(error_class) as context:
+                client.get('courses/')
+            self.assertIs(type(context.exception), error_class)
+
+    @data((requests.exceptions.Timeout, ClientTimeoutError), (requests.exceptions.ConnectionError, ClientError))
+    @unpack
+    def test_request_error(self, exception_class, error_class):
+        with patch.object(self.client.session, 'get', side_effect=exception_class):
+            with self.assertRaises(error_class):
+                self.client.get('courses/')
+
+    @httpretty.activate
+    def test_session(self):
+        httpretty.register_uri(httpretty.GET, f'{self.BASE_URL}/courses/', body='{"count": 1}')
+        with patch.object(self.client.session, 'get', wraps=self.client.session.get) as get_mock, \
+                patch('requests.get') as requests_get_mock:
+            self.assertEqual(self.client.get('courses/'), {'count': 1})
+        get_mock.assert_called_once()
+        requests_get_mock.assert_not_called()
+
+        # Other clients of the library send their requests as the library does.
+        self.assertEqual(Client(self.BASE_URL).get('courses/'), {'count': 1})
+
+
+class GetAnalyticsClientTests(TestCase):
+    def test_shared(self):
+        client = get_analytics_client()
+        self.assertIsInstance(client, AnalyticsApiClient)
+        self.assertIs(get_analytics_client(), client)
+        self.assertEqual(client.base_url, settings.DATA_API_URL)
+        self.assertEqual(client.timeout, settings.ANALYTICS_API_DEFAULT_TIMEOUT)
+
+        self.assertIsNot(get_analytics_client(settings.DATA_API_URL_V1), client)
+        self.assertIsNot(get_analytics_client(timeout=1), client)
+
+    def test_not_shared_with_forked_processes(self):
+        client = get_analytics_client()
+        read_fd, write_fd = os.pipe()
+        pid = os.fork()
+        if pid == 0:  # pragma: no cover
+            os.write(write_fd, b'1' if get_analytics_client() is client else b'0')
+            os._exit(0)  # pylint: disable=protected-access
+        os.waitpid(pid, 0)
+        self.assertEqual(os.read(read_fd, 1), b'0')
+
+    def test_close_shared_clients(self):
+        client = get_analytics_client()
+        with patch.object(client.session, 'close') as close_mock:
+            close_shared_clients()
+        close_mock.assert_called_once_with()
+        self.assertIsNot(get_analytics_client(), client)
+
+
+class GetLmsSessionTests(TestCase):
+    @override_settings(LMS_POOL_SIZE=3)
+    def test_shared(self):
+        session = get_lms_session()
+        self.assertIs(get_lms_session(), session)
+        adapter = session.get_adapter('https://lms.example.com')
+        self.assertEqual(adapter._pool_maxsize, 3)  # pylint: disable=protected-access
+
+
+@patch('edx_rest_api_client.client.get_oauth_access_token')
+class SharedAccessTokenTests(TestCase):
+    def setUp(self):
+        super().setUp()
+        patcher = patch.dict(utils._access_tokens, clear=True)  # pylint: disable=protected-access
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def get_client(self, client_class=CourseStructureApiClient):
+        return client_class(
+            settings.BACKEND_SERVICE_EDX_OAUTH2_PROVIDER_URL,
+            settings.BACKEND_SERVICE_EDX_OAUTH2_KEY,
+            settings.BACKEND_SERVICE_EDX_OAUTH2_SECRET,
+        )
+
+    @override_settings(OAUTH_ACCESS_TOKEN_REFRESH_MARGIN=300)
+    def test_shared_until_refresh(self, token_mock):
+        expires_at = datetime.datetime.utcnow() + datetime.timedelta(seconds=3600)
+        token_mock.return_value = ('token', expires_at)
+
+        self.assertEqual(self.get_client().get_jwt_access_token(), 'token')
+        self.assertEqual(self.get_client(OAuthAPIClient).get_jwt_access_token(), 'token')
+        token_mock.assert_called_once()
+
+        # The token is refreshed once within the margin of its expiry.
+        token_mock.return_value = ('new token', expires_at + datetime.timedelta(seconds=3600))
+        now = calendar.timegm(expires_at.timetuple()) - 100
+        with patch('analytics_dashboard.core.utils.time.time', return_value=now):
+            self.assertEqual(self.get_client().get_jwt_access_token(), 'new token')
+        self.assertEqual(token_mock.call_count, 2)
+
+    @override_settings(OAUTH_ACCESS_TOKEN_REFRESH_MARGIN=300)
+    def test_short_lived_token(self, token_mock):
+        token_mock.return_value = ('token', datetime.datetime.utcnow() + datetime.timedelta(seconds=10))
+        self.get_client().get_jwt_access_token()
+        self.get_client().get_jwt_access_token()
+        token_mock.assert_called_once()
+
+    def test_oauth_uri(self, token_mock):
+        token_mock.return_value = ('token', datetime.datetime.utcnow() + datetime.timedelta(seconds=3600))
+        client = self.get_client(OAuthAPIClient)
+        client.oauth_uri = '/oauth2'
+        client.get_jwt_access_token()
+        self.assertEqual(token_mock.call_args[0][0], settings.BACKEND_SERVICE_EDX_OAUTH2_PROVIDER_URL + '/oauth2')
+
+        # Tokens of other OAuth URLs are not shared.
+        self.get_client(OAuthAPIClient).get_jwt_access_token()
+        self.assertEqual(token_mock.call_count, 2)
+
+
+class GetOAuthClientTests(TestCase):
+    def test_shared(self):
+        client = get_oauth_client()
+        self.assertIsInstance(client, CourseStructureApiClient)
+        self.assertIs(get_oauth_client(), client)
+        # pylint: disable=protected-access
+        self.assertEqual(client._base_url, settings.BACKEND_SERVICE_EDX_OAUTH2_PROVIDER_URL)
+        self.assertEqual(client._timeout, settings.LMS_DEFAULT_TIMEOUT)
+
+        self.assertIsInstance(get_oauth_client(OAuthAPIClient), OAuthAPIClient)
+        self.assertIsNot(get_oauth_client(OAuthAPIClient), client)
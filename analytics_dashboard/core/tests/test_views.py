@@ -13,6 +13,7 @@ from django.urls import reverse, reverse_lazy
 from django_dynamic_fixture import G
 from testfixtures import LogCapture
 
+from analytics_dashboard.core.caching import cache_stats, get_cached
 from analytics_dashboard.core.views import OK, UNAVAILABLE
 from analytics_dashboard.courses.permissions import (
     get_user_course_permissions,
@@ -102,6 +103,30 @@ class ViewTests(TestCase):
             )
 
 
+class CacheStatsViewTests(UserTestCaseMixin, TestCase):
+    def test_anonymous(self):
+        response = self.client.get(reverse('cache_stats'))
+        self.assertEqual(response.status_code, 302)
+
+    def test_not_staff(self):
+        self.login()
+        response = self.client.get(reverse('cache_stats'))
+        self.assertEqual(response.status_code, 403)
+
+    def test_staff(self):
+        self.user.is_staff = True
+        self.user.save()
+        self.login()
+        cache_stats.reset()
+        get_cached('key', family='problem')
+
+        response = self.client.get(reverse('cache_stats'))
+        self.assertEqual(response.status_code, 200)
+        data = json.loads(response.content.decode())
+        self.assertEqual(data['families']['problem']['misses'], 1)
+        self.assertIn('bytes', data['local_cache'])
+
+
 class LoginViewTests(RedirectTestCaseMixin, TestCase):
     def test_login_redirect(self):
         """
@@ -1,8 +1,18 @@
+import calendar
+import contextvars
+import os
+import threading
+import time
 from hashlib import md5
 
+import requests
+from requests.adapters import HTTPAdapter
+from analyticsclient import client as analytics_client_module
+from analyticsclient.client import Client
 from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.utils.translation import gettext_lazy as _
+from edx_rest_api_client import client as rest_api_client
 from soapbox.models import Message
 
 from common import clients
@@ -24,15 +34,200 @@ def sanitize_cache_key(key):
     return md5(key.encode("utf-8")).hexdigest()
 
 
-class CourseStructureApiClient(clients.CourseStructureApiClient):
+# JWT access tokens of the OAuth clients of this process, keyed by OAuth URL and client ID, with the time after
+# which they are refreshed
+_access_tokens = {}
+_access_tokens_lock = threading.Lock()
+
+
+class SharedAccessTokenMixin:
+    """
+    Shares the JWT access token of OAuth clients with the same credentials across the process.
+
+    `OAuthAPIClient` looks its token up in the tiered cache before every request, which hands the same token out
+    until it (almost) expires.  Tokens are requested directly instead, kept in memory, and refreshed
+    settings.OAUTH_ACCESS_TOKEN_REFRESH_MARGIN seconds before they expire, so that they are never sent about to
+    expire.
+    """
+    def _ensure_authentication(self):
+        oauth_url = self._base_url + self.oauth_uri if self.oauth_uri else self._base_url
+        key = (oauth_url, self._client_id)
+        token, refresh_at = _access_tokens.get(key, (None, 0))
+        if time.time() >= refresh_at:
+            # One thread refreshes the token, while the others wait for it.
+            with _access_tokens_lock:
+                token, refresh_at = _access_tokens.get(key, (None, 0))
+                if time.time() >= refresh_at:
+                    token, refresh_at = self._request_access_token(oauth_url)
+                    _access_tokens[key] = (token, refresh_at)
+        self.auth.token = token
+
+    def _request_access_token(self, oauth_url):
+        """ Returns a new access token, with the time after which it is refreshed. """
+        token, expires_at = rest_api_client.get_oauth_access_token(
+            oauth_url, self._client_id, self._client_secret, grant_type='client_credentials', timeout=self._timeout,
+        )
+        # Expiry times are naive UTC datetimes.  Tokens living less than twice the margin are refreshed halfway
+        # through their lifetime instead, rather than on every request.
+        expires_at = calendar.timegm(expires_at.timetuple())
+        return token, expires_at - min(settings.OAUTH_ACCESS_TOKEN_REFRESH_MARGIN, (expires_at - time.time()) / 2)
+
+
+class OAuthAPIClient(SharedAccessTokenMixin, rest_api_client.OAuthAPIClient):
+    """
+    A very thin wrapper around `edx_rest_api_client.client.OAuthAPIClient`, which shares its access token
+    across the process.
+    """
+
+
+class CourseStructureApiClient(SharedAccessTokenMixin, clients.CourseStructureApiClient):
     """
     A very thin wrapper around `common.clients.CourseStructureApiClient`, which
-    defaults the client timeout to `settings.LMS_DEFAULT_TIMEOUT`.
+    defaults the client timeout to `settings.LMS_DEFAULT_TIMEOUT` and shares its
+    access token across the process.
     """
     def __init__(self, base_url, client_id, client_secret, timeout=settings.LMS_DEFAULT_TIMEOUT):
         super().__init__(base_url, client_id, client_secret, timeout=timeout)
 
 
+def create_pooled_session(pool_size):
+    """
+    Returns a session which keeps up to pool_size connections to its host alive, to be reused by later requests.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+class AnalyticsApiClient(Client):
+    """
+    A data API client which sends its requests through a pooled, keep-alive session, rather than opening new
+    connections for every request as `analyticsclient.client.Client` does.  Requests are still made, and their
+    responses and errors handled, by `analyticsclient.client.Client` (see _SessionRequests).
+
+    Clients are meant to be shared by the requests of a process, see get_analytics_client().
+    """
+    def __init__(self, base_url, auth_token=None, timeout=settings.ANALYTICS_API_DEFAULT_TIMEOUT, pool_size=10):
+        super().__init__(base_url, auth_token=auth_token, timeout=timeout)
+        self.session = create_pooled_session(pool_size)
+
+    def close(self):
+        """ Closes the connections kept alive by the client. """
+        self.session.close()
+
+    def _request(self, *args, **kwargs):
+        token = _analytics_api_session.set(self.session)
+        try:
+            return super()._request(*args, **kwargs)
+        finally:
+            _analytics_api_session.reset(token)
+
+
+# Session of the AnalyticsApiClient sending the current request, if any
+_analytics_api_session = contextvars.ContextVar('analytics_api_session', default=None)
+
+
+class _SessionRequests:
+    """
+    Stands in for the requests module used by `analyticsclient.client`, so that the requests of AnalyticsApiClient
+    are sent through its session while the library still handles their responses and errors.  Requests of other
+    clients are sent as the library sends them.
+    """
+
+    def __getattr__(self, name):
+        return getattr(requests, name)
+
+    def get(self, *args, **kwargs):
+        return (_analytics_api_session.get() or requests).get(*args, **kwargs)
+
+    def post(self, *args, **kwargs):
+        return (_analytics_api_session.get() or requests).post(*args, **kwargs)
+
+
+analytics_client_module.requests = _SessionRequests()
+
+
+# Clients of this process shared across requests, keyed by their type and configuration
+_shared_clients = {}
+_shared_clients_lock = threading.Lock()
+
+# Forked processes (e.g. the workers of management commands) must not share the connections of their parent.
+os.register_at_fork(after_in_child=_shared_clients.clear)
+
+
+def _get_shared_client(key, create):
+    with _shared_clients_lock:
+        client = _shared_clients.get(key)
+        if client is None:
+            client = _shared_clients[key] = create()
+    return client
+
+
+def close_shared_clients():
+    """
+    Closes the shared clients of this process and their connections, e.g. before forking worker processes which
+    would otherwise inherit them.  Clients are created again on next use.
+    """
+    with _shared_clients_lock:
+        shared_clients = list(_shared_clients.values())
+        _shared_clients.clear()
+    for client in shared_clients:
+        client.close()
+
+
+def get_analytics_client(base_url=None, timeout=None):
+    """
+    Returns the data API client of this process for the base URL and timeout, creating it on first use.  Clients
+    are shared across requests so that their connections to the data API are kept alive and reused, with up to
+    settings.DATA_API_POOL_SIZE connections each.
+
+    Arguments
+        base_url (str): Base URL of the data API, defaults to settings.DATA_API_URL.
+        timeout (float): Request timeout in seconds, defaults to settings.ANALYTICS_API_DEFAULT_TIMEOUT.
+    """
+    base_url = base_url or settings.DATA_API_URL
+    timeout = settings.ANALYTICS_API_DEFAULT_TIMEOUT if timeout is None else timeout
+    return _get_shared_client(
+        ('analytics', base_url, settings.DATA_API_AUTH_TOKEN, timeout),
+        lambda: AnalyticsApiClient(base_url, auth_token=settings.DATA_API_AUTH_TOKEN, timeout=timeout,
+                                   pool_size=settings.DATA_API_POOL_SIZE),
+    )
+
+
+def get_oauth_client(client_class=CourseStructureApiClient):
+    """
+    Returns the client of this process, of the given class, authenticated as the backend service of Insights (see
+    settings.BACKEND_SERVICE_EDX_OAUTH2_KEY) to call the course, grading policy and course permission APIs.
+
+    Clients are shared across requests, so that their connections are kept alive and reused, and their access
+    token is refreshed only before it expires.
+
+    Arguments
+        client_class (type): An OAuthAPIClient class, e.g. CourseStructureApiClient.
+    """
+    # Classes are keyed by identity, as they live as long as the process.
+    return _get_shared_client(
+        ('oauth', id(client_class), settings.BACKEND_SERVICE_EDX_OAUTH2_PROVIDER_URL,
+         settings.BACKEND_SERVICE_EDX_OAUTH2_KEY),
+        lambda: client_class(
+            settings.BACKEND_SERVICE_EDX_OAUTH2_PROVIDER_URL,
+            settings.BACKEND_SERVICE_EDX_OAUTH2_KEY,
+            settings.BACKEND_SERVICE_EDX_OAUTH2_SECRET,
+        ),
+    )
+
+
+def get_lms_session():
+    """
+    Returns the session of this process for plain requests to the LMS (e.g. course validation), keeping up to
+    settings.LMS_POOL_SIZE connections to the LMS alive across requests.
+    """
+    return _get_shared_client(('lms', settings.LMS_POOL_SIZE),
+                              lambda: create_pooled_session(settings.LMS_POOL_SIZE))
+
+
 def translate_dict_values(items, keys):
     """Translates the values of keys in given list of dicts
 
@@ -4,13 +4,16 @@ import uuid
 
 from django.conf import settings
 from django.contrib.auth import authenticate, get_user_model, login
+from django.contrib.auth.decorators import login_required
 from django.contrib.auth.views import LogoutView, logout_then_login
+from django.core.exceptions import PermissionDenied
 from django.db import DatabaseError, connection
 from django.http import Http404, HttpResponse
 from django.shortcuts import redirect
 from django.urls import reverse_lazy
 from django.views.generic import TemplateView, View
 
+from analytics_dashboard.core import caching
 from analytics_dashboard.courses import permissions
 
 try:
@@ -57,6 +60,26 @@ def health(_request):
     return HttpResponse(json.dumps(data), content_type='application/json', status=200 if overall_status == OK else 503)
 
 
+@login_required
+def cache_stats(request):
+    """
+    Returns the cache hits, misses, bytes written and time spent of each key family, as counted by the process
+    serving the request since it started, along with the size of its process-local cache.  Staff only.
+    """
+    if not (request.user.is_superuser or request.user.is_staff):
+        raise PermissionDenied
+
+    data = {
+        'since': caching.cache_stats.since,
+        'families': caching.cache_stats.snapshot(),
+        'local_cache': {
+            'entries': len(caching.local_cache),
+            'bytes': caching.local_cache.bytes,
+        },
+    }
+    return HttpResponse(json.dumps(data), content_type='application/json')
+
+
 class AutoAuth(View):
     """
     Creates and authenticates a new User.
@@ -0,0 +1,52 @@
+"""
+Pre-populates the caches read by the course pages, so that the first visitor of a course does not wait for the
+course structure, data API and grading policy requests.
+"""
+import logging
+
+from edx_django_utils.cache import RequestCache
+
+from analytics_dashboard.core.utils import get_analytics_client, get_oauth_client
+from analytics_dashboard.courses.presenters.course_summaries import CourseSummariesPresenter
+from analytics_dashboard.courses.presenters.engagement import CourseEngagementVideoPresenter
+from analytics_dashboard.courses.presenters.performance import CoursePerformancePresenter, TagsDistributionPresenter
+
+logger = logging.getLogger(__name__)
+
+
+def get_all_course_ids():
+    """ Returns the IDs of all courses known to the course API. """
+    return [course['id'] for course in get_oauth_client().all_courses]
+
+
+def warm_summaries():
+    """ Caches the summaries of all courses. """
+    CourseSummariesPresenter(get_analytics_client()).get_course_summaries()
+
+
+def warm_course(course_id):
+    """
+    Caches the course structure, sections, problem, video and tags data, and grading policy of a course.
+
+    Presenters memoize structures in the request cache, which is only cleared at the end of requests, so it is
+    cleared around each course to keep one course's data from piling up behind another's.
+
+    Arguments
+        course_id (str): ID of the course to warm.
+    """
+    RequestCache.clear_all_namespaces()
+    try:
+        client = get_analytics_client()
+
+        performance_presenter = CoursePerformancePresenter(course_id, client)
+        performance_presenter.grading_policy()
+        performance_presenter.assignments()
+        performance_presenter.sections()
+
+        CourseEngagementVideoPresenter(course_id, client).sections()
+
+        tags_presenter = TagsDistributionPresenter(course_id, client)
+        tags_presenter.get_available_tags()
+        tags_presenter.sections()
+    finally:
+        RequestCache.clear_all_namespaces()
@@ -0,0 +1,84 @@
+import abc
+import logging
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from django.core.cache import caches
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from analytics_dashboard.core.utils import close_shared_clients
+from analytics_dashboard.courses import cache_warming
+
+logger = logging.getLogger(__name__)
+
+
+class CourseJobCommand(BaseCommand, metaclass=abc.ABCMeta):
+    """
+    Base of the commands running a job on each of the given courses, or on all courses known to the course API,
+    with at most --concurrency courses at once.
+    """
+    # Verb describing the job, and its past participle, e.g. 'warm' and 'warmed'
+    verb = None
+    verb_past = None
+
+    def add_arguments(self, parser):
+        parser.add_argument('course_ids', nargs='*', metavar='course_id',
+                            help=f'Courses to {self.verb}.  All courses known to the course API are {self.verb_past} '
+                                 f'if none are given.')
+        parser.add_argument('--concurrency', type=int, default=4,
+                            help=f'Number of courses {self.verb_past} at once, which limits the load on upstream '
+                                 f'services.  Courses are {self.verb_past} in worker processes unless this is 1.')
+
+    @abc.abstractmethod
+    def handle(self, *args, **options):
+        """ Runs the job of the command on the courses (see run_jobs()) and reports the results. """
+
+    def get_course_ids(self, options):
+        """ Returns the IDs of the courses to run the job on. """
+        if options['concurrency'] < 1:
+            raise CommandError('--concurrency must be at least 1.')
+        return options['course_ids'] or cache_warming.get_all_course_ids()
+
+    def run_jobs(self, job, course_ids, concurrency, **kwargs):
+        """
+        Runs job(course_id, **kwargs) on each course, in worker processes unless the concurrency is 1.
+
+        Arguments
+            job (function): Module-level function run on each course, whose errors are logged and reported.
+            course_ids (list): IDs of the courses.
+            concurrency (int): Number of courses run at once.
+
+        Returns
+            generator of (progress, course ID, seconds taken, result of the job, error message or None) tuples, as
+            courses are done, where progress labels the course with its position, e.g. "[2/10] <course ID>".
+        """
+        if concurrency == 1:
+            results = (_run_job(job, self.verb, course_id, kwargs) for course_id in course_ids)
+        else:
+            results = self._run_jobs_in_workers(job, course_ids, concurrency, kwargs)
+
+        for index, (course_id, seconds, result, error) in enumerate(results, start=1):
+            yield f'[{index}/{len(course_ids)}] {course_id}', course_id, seconds, result, error
+
+    def _run_jobs_in_workers(self, job, course_ids, concurrency, kwargs):
+        # Workers are forked, whatever the platform's default start method, to inherit the configured settings.
+        # They must not share the parent's database, cache or HTTP connections.
+        connections.close_all()
+        caches.close_all()
+        close_shared_clients()
+        with ProcessPoolExecutor(max_workers=concurrency, mp_context=multiprocessing.get_context('fork')) as executor:
+            futures = [executor.submit(_run_job, job, self.verb, course_id, kwargs) for course_id in course_ids]
+            for future in as_completed(futures):
+                yield future.result()
+
+
+def _run_job(job, verb, course_id, kwargs):
+    start = time.monotonic()
+    try:
+        result = job(course_id, **kwargs)
+        return course_id, time.monotonic() - start, result, None
+    except Exception as e:  # pylint: disable=broad-except
+        logger.exception('Failed to %s course %s.', verb, course_id)
+        return course_id, time.monotonic() - start, None, str(e) or e.__class__.__name__
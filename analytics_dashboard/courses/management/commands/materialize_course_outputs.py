@@ -0,0 +1,58 @@
+from collections import defaultdict
+
+from django.core.management.base import CommandError
+
+from analytics_dashboard.courses import materialization
+from analytics_dashboard.courses.management.base import CourseJobCommand
+
+
+class Command(CourseJobCommand):
+    """A command to precompute the presenter outputs read by the course pages, run after each pipeline run."""
+
+    help = 'Materialize the enrollment, engagement and performance outputs of the given courses, or of all courses.'
+    verb = 'materialize'
+    verb_past = 'materialized'
+
+    def add_arguments(self, parser):
+        super().add_arguments(parser)
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Compute, and report the time taken by, every output without storing them.')
+
+    def handle(self, *args, **options):
+        course_ids = self.get_course_ids(options)
+        dry_run = options['dry_run']
+
+        failures = []
+        timings = defaultdict(list)
+        for progress, course_id, seconds, results, error in self.run_jobs(
+                materialization.materialize_course, course_ids, options['concurrency'], dry_run=dry_run):
+            if error:
+                failures.append(course_id)
+                self.stderr.write(f'{progress} failed after {seconds:.2f}s: {error}')
+                continue
+
+            failed_outputs = [result for result in results if result.error]
+            for result in results:
+                timings[result.name].append(result.seconds)
+                if result.error:
+                    self.stderr.write(f'{progress} {result.name} ({result.language}) failed: {result.error}')
+            if failed_outputs:
+                failures.append(course_id)
+
+            skipped = sum(result.skipped for result in results)
+            self.stdout.write(f'{progress} materialized {len(results) - len(failed_outputs) - skipped} outputs '
+                              f'({skipped} without data, {len(failed_outputs)} failed) in {seconds:.2f}s')
+
+        if dry_run:
+            self._write_timing_report(timings)
+
+        self.stdout.write(f'Materialized {len(course_ids) - len(failures)} of {len(course_ids)} courses'
+                          f'{" (dry run)" if dry_run else ""}.')
+        if failures:
+            raise CommandError(f'Failed to materialize: {", ".join(failures)}')
+
+    def _write_timing_report(self, timings):
+        self.stdout.write(f'{"output":<40}{"courses":>8}{"total s":>10}{"mean s":>10}{"max s":>10}')
+        for name, seconds in sorted(timings.items(), key=lambda item: sum(item[1]), reverse=True):
+            self.stdout.write(f'{name:<40}{len(seconds):>8}{sum(seconds):>10.2f}'
+                              f'{sum(seconds) / len(seconds):>10.2f}{max(seconds):>10.2f}')
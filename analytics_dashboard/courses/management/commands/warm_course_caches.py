@@ -0,0 +1,47 @@
+import logging
+
+from django.core.management.base import CommandError
+
+from analytics_dashboard.courses import cache_warming
+from analytics_dashboard.courses.management.base import CourseJobCommand
+
+logger = logging.getLogger(__name__)
+
+
+class Command(CourseJobCommand):
+    """A command to pre-populate the caches read by the course pages."""
+
+    help = 'Warm the course structure, data API and grading policy caches of the given courses, or of all courses.'
+    verb = 'warm'
+    verb_past = 'warmed'
+
+    def add_arguments(self, parser):
+        super().add_arguments(parser)
+        parser.add_argument('--skip-summaries', action='store_true',
+                            help='Do not warm the summaries of all courses.')
+
+    def handle(self, *args, **options):
+        course_ids = self.get_course_ids(options)
+
+        failures = []
+        if not options['skip_summaries']:
+            try:
+                cache_warming.warm_summaries()
+                self.stdout.write('Warmed course summaries.')
+            except Exception as e:  # pylint: disable=broad-except
+                logger.exception('Failed to warm the course summaries.')
+                failures.append('summaries')
+                self.stderr.write(f'Failed to warm course summaries: {e}')
+
+        for progress, course_id, seconds, _result, error in self.run_jobs(
+                cache_warming.warm_course, course_ids, options['concurrency']):
+            if error:
+                failures.append(course_id)
+                self.stderr.write(f'{progress} failed after {seconds:.2f}s: {error}')
+            else:
+                self.stdout.write(f'{progress} warmed in {seconds:.2f}s')
+
+        failed_courses = [failure for failure in failures if failure != 'summaries']
+        self.stdout.write(f'Warmed {len(course_ids) - len(failed_courses)} of {len(course_ids)} courses.')
+        if failures:
+            raise CommandError(f'Failed to warm: {", ".join(failures)}')
@@ -0,0 +1,104 @@
+"""
+Materializes the outputs of the course presenters after each run of the data pipeline, so that the course pages
+read them from the cache instead of querying the data API and reshaping its responses on every page view.
+
+Outputs of the materialized() presenter methods are stored under the versioned keys of the course, while the
+course structure, module data and grading policy behind the content pages are cached by the presenters themselves.
+Outputs are localized, so they are materialized in each of settings.COURSE_MATERIALIZED_LANGUAGES.
+"""
+import logging
+import time
+from collections import namedtuple
+
+from analyticsclient.exceptions import NotFoundError
+from django.conf import settings
+from django.utils import translation
+from edx_django_utils.cache import RequestCache
+
+from analytics_dashboard.core.utils import get_analytics_client
+from analytics_dashboard.courses.presenters import CoursePresenter, materializing
+from analytics_dashboard.courses.presenters.engagement import (
+    CourseEngagementActivityPresenter,
+    CourseEngagementVideoPresenter,
+)
+from analytics_dashboard.courses.presenters.enrollment import (
+    CourseEnrollmentDemographicsPresenter,
+    CourseEnrollmentPresenter,
+)
+from analytics_dashboard.courses.presenters.performance import CoursePerformancePresenter, TagsDistributionPresenter
+
+logger = logging.getLogger(__name__)
+
+MaterializedOutput = namedtuple('MaterializedOutput', ['name', 'presenter_class', 'method', 'args'])
+
+# Result of materializing an output in a language.  The error is None on success, and the output is skipped when the
+# data API has no data for the course.
+MaterializationResult = namedtuple('MaterializationResult', ['name', 'language', 'seconds', 'skipped', 'error'])
+
+OUTPUTS = (
+    MaterializedOutput('enrollment_activity', CourseEnrollmentPresenter, 'get_summary_and_trend_data', ()),
+    MaterializedOutput('enrollment_geography', CourseEnrollmentPresenter, 'get_geography_data', ()),
+    MaterializedOutput('enrollment_demographics_age', CourseEnrollmentDemographicsPresenter, 'get_ages', ()),
+    MaterializedOutput('enrollment_demographics_education', CourseEnrollmentDemographicsPresenter,
+                       'get_education', ()),
+    MaterializedOutput('enrollment_demographics_gender', CourseEnrollmentDemographicsPresenter, 'get_gender', ()),
+    MaterializedOutput('engagement_content', CourseEngagementActivityPresenter, 'get_summary_and_trend_data', ()),
+    MaterializedOutput('engagement_videos', CourseEngagementVideoPresenter, 'sections', ()),
+    MaterializedOutput('performance_grading_policy', CoursePerformancePresenter, 'grading_policy', ()),
+    MaterializedOutput('performance_graded_content', CoursePerformancePresenter, 'assignments', ()),
+    MaterializedOutput('performance_ungraded_content', CoursePerformancePresenter, 'sections', ()),
+    MaterializedOutput('performance_learning_outcomes', TagsDistributionPresenter, 'get_tags_distribution',
+                       ('learning_outcome',)),
+)
+
+
+def materialize_course(course_id, dry_run=False):
+    """
+    Computes, and caches, every output of OUTPUTS for a course, in each of settings.COURSE_MATERIALIZED_LANGUAGES.
+    Outputs that fail are logged and reported, without
+    stopping the others.
+
+    The course's cached data is first invalidated if the pipeline has produced new data for the course.  A dry run
+    only times the outputs: it neither invalidates nor stores them, though the data cached by the presenters along
+    the way is still filled.
+
+    Arguments
+        course_id (str): ID of the course to materialize.
+        dry_run (bool): Compute the outputs without storing them.
+
+    Returns
+        list of MaterializationResult, in the order of the languages, then of OUTPUTS.
+    """
+    RequestCache.clear_all_namespaces()
+    try:
+        client = get_analytics_client()
+        if not dry_run:
+            CoursePresenter(course_id, client).check_data_freshness(force=True)
+
+        results = []
+        with materializing(dry_run=dry_run):
+            for language in settings.COURSE_MATERIALIZED_LANGUAGES:
+                # Outputs are keyed by the language variant activated for requests, e.g. 'en' for 'en-us'.
+                presenters = {}
+                with translation.override(translation.get_supported_language_variant(language)):
+                    for output in OUTPUTS:
+                        if output.presenter_class not in presenters:
+                            presenters[output.presenter_class] = output.presenter_class(course_id, client)
+                        results.append(_materialize(presenters[output.presenter_class], output))
+        return results
+    finally:
+        RequestCache.clear_all_namespaces()
+
+
+def _materialize(presenter, output):
+    start = time.monotonic()
+    skipped, error = False, None
+    try:
+        getattr(presenter, output.method)(*output.args)
+    except NotFoundError:
+        skipped = True
+    except Exception as e:  # pylint: disable=broad-except
+        logger.exception('Failed to materialize %s of course %s in %s.', output.name, presenter.course_id,
+                         translation.get_language())
+        error = str(e) or e.__class__.__name__
+    return MaterializationResult(output.name, translation.get_language(), time.monotonic() - start, skipped, error)
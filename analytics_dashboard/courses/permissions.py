@@ -3,10 +3,10 @@ import logging
 
 from auth_backends.backends import EdXOAuth2
 from django.conf import settings
-from django.core.cache import cache
 from edx_django_utils.monitoring import set_custom_metric
-from edx_rest_api_client.client import OAuthAPIClient
 
+from analytics_dashboard.core.caching import delete_cached, get_cached, get_many_cached, set_cached, set_many_cached
+from analytics_dashboard.core.utils import OAuthAPIClient, get_oauth_client
 from analytics_dashboard.courses.exceptions import PermissionsRetrievalFailedError
 
 logger = logging.getLogger(__name__)
@@ -53,7 +53,7 @@ def set_user_course_permissions(user, courses):
     key_courses, key_last_updated = _get_course_permission_cache_keys(user)
 
     data = {key_courses: courses, key_last_updated: datetime.datetime.utcnow()}
-    cache.set_many(data, settings.COURSE_PERMISSIONS_TIMEOUT)
+    set_many_cached(data, settings.COURSE_PERMISSIONS_TIMEOUT, family='permissions')
 
 
 def revoke_user_course_permissions(user):
@@ -63,7 +63,7 @@ def revoke_user_course_permissions(user):
     Arguments
         user (User) --  User for which permissions should be revoked
     """
-    cache.delete_many(_get_course_permission_cache_keys(user))
+    delete_cached(*_get_course_permission_cache_keys(user))
 
 
 def get_user_tracking_id(user):
@@ -72,13 +72,13 @@ def get_user_tracking_id(user):
     is cached.
     """
     cache_key = _get_tracking_cache_key(user)
-    tracking_id = cache.get(cache_key)
+    tracking_id = get_cached(cache_key, family='tracking_id')
 
     # if tracking ID was not found in cache, fetch and cache it
     if tracking_id is None:
         # first, attempt to get the tracking id from an oauth2 social_auth record
         tracking_id = _get_lms_user_id_from_social_auth(user)
-        cache.set(cache_key, tracking_id)
+        set_cached(cache_key, tracking_id, family='tracking_id')
 
     set_custom_metric('tracking_id', tracking_id)
     return tracking_id
@@ -112,7 +112,7 @@ def get_user_course_permissions(user):
     keys = [key_courses, key_last_updated]
 
     # Check the cache for data
-    values = cache.get_many(keys)
+    values = get_many_cached(keys, family='permissions')
     courses = values.get(key_courses, [])
 
     # If data is not in the cache, refresh the permissions and validate against the new data.
@@ -151,11 +151,7 @@ def _refresh_user_course_permissions(user):
     """
     response_data = None
     try:
-        client = OAuthAPIClient(
-            settings.BACKEND_SERVICE_EDX_OAUTH2_PROVIDER_URL,
-            settings.BACKEND_SERVICE_EDX_OAUTH2_KEY,
-            settings.BACKEND_SERVICE_EDX_OAUTH2_SECRET,
-        )
+        client = get_oauth_client(OAuthAPIClient)
         course_ids = []
         page = 1
 
@@ -1,19 +1,88 @@
 import abc
+import contextlib
+import contextvars
 import datetime
+import functools
 import logging
 from collections import OrderedDict
+from types import MappingProxyType
 from urllib.parse import urljoin
 
 from analyticsclient.client import Client
+from analyticsclient.exceptions import ClientError
 from django.conf import settings
 from django.core.cache import cache
-
-from common.course_structure import CourseStructure
-from analytics_dashboard.core.utils import CourseStructureApiClient, sanitize_cache_key
+from django.utils.translation import get_language
+from edx_django_utils.cache import RequestCache
+
+from common.course_structure import CourseStructure, CourseStructureIndex, CourseStructureRegistry, CourseTree
+from common.module_data import ModuleDataTable
+from analytics_dashboard.core.caching import (
+    course_cache_key,
+    get_cached,
+    get_or_set_single_flight,
+    invalidate_course_cache,
+    set_cached,
+)
+from analytics_dashboard.core.utils import get_oauth_client, sanitize_cache_key
 from analytics_dashboard.courses.exceptions import BaseCourseError
 
 logger = logging.getLogger(__name__)
 
+# Parsed course structures shared by the presenters of this process
+structure_registry = CourseStructureRegistry(settings.COURSE_STRUCTURE_REGISTRY_SIZE)
+
+# Whether, and how, presenter outputs are being materialized in the current thread, see materialized()
+MATERIALIZE = 'materialize'
+MATERIALIZE_DRY_RUN = 'dry_run'
+_materialization_mode = contextvars.ContextVar('materialization_mode', default=None)
+
+
+@contextlib.contextmanager
+def materializing(dry_run=False):
+    """
+    Computes, and stores, the outputs of the materialized() presenter methods called within the block rather than
+    serving them from the cache.
+
+    Arguments
+        dry_run (bool): Compute the outputs without storing them.
+    """
+    token = _materialization_mode.set(MATERIALIZE_DRY_RUN if dry_run else MATERIALIZE)
+    try:
+        yield
+    finally:
+        _materialization_mode.reset(token)
+
+
+def materialized(method):
+    """
+    Serves the output of a course presenter method from the cache, where the materialization job (see
+    analytics_dashboard.courses.materialization) stores it under the versioned keys of the course after each pipeline
+    run, so that the course pages do not query the data API.
+
+    Outputs that have not been materialized are computed, but not cached, so the pages keep working between a
+    pipeline run and the job.  Outputs are keyed by the active language, as they include translated strings, and by
+    the state of the presenter they depend on (see CoursePresenter.get_output_variant()).
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args):
+        name = '_'.join(['materialized', method.__qualname__, get_language() or '', *self.get_output_variant(),
+                         *map(str, args)])
+        key = self.get_data_cache_key(name)
+        mode = _materialization_mode.get()
+
+        if mode is None:
+            # Outputs are wrapped in a tuple to tell a materialized None from a miss.
+            output = get_cached(key, family='materialized')
+            return output[0] if output else method(self, *args)
+
+        value = method(self, *args)
+        if mode == MATERIALIZE:
+            set_cached(key, (value,), settings.COURSE_MATERIALIZED_CACHE_TIMEOUT, family='materialized')
+        return value
+
+    return wrapper
+
 
 class BasePresenter:
 
@@ -47,11 +116,76 @@ class CoursePresenter(BasePresenter):
     This is the base class for the course pages and sets up the analytics client
     for the presenters to use to access the data API.
     """
+
+    # Namespace of the request cache used to memoize structures for the duration of a request
+    REQUEST_CACHE_NAMESPACE = 'course_structure'
+
     def __init__(self, course_id, analytics_client):
         super().__init__(analytics_client)
         self.course_id = course_id
         self.course = self.client.courses(self.course_id)
 
+    def get_cache_key(self, name):
+        """ Returns sanitized key for caching data derived from the course itself (e.g. its structure). """
+        return course_cache_key(self.course_id, name)
+
+    def get_data_cache_key(self, name):
+        """
+        Returns sanitized key for caching data derived from the output of the data pipeline, which is invalidated
+        when the pipeline produces new data for the course (see check_data_freshness()).
+        """
+        return course_cache_key(self.course_id, name, pipeline_data=True)
+
+    def get_output_variant(self):
+        """
+        Returns the strings describing the state, other than the course, that the outputs of the presenter depend
+        on (e.g. the switches enabling parts of them), by which materialized outputs are keyed.
+        """
+        return ()
+
+    def check_data_freshness(self, force=False):
+        """
+        Invalidates the cached pipeline data of the course (see get_data_cache_key()) if the data pipeline has
+        produced new data for the course since the data was cached, which lets the data API caches live until the
+        next pipeline run.  This is called by the course views before they read the data, and by the
+        materialization job.
+
+        The timestamp of the latest pipeline run is probed (from the course summary) at most once a request, and
+        once every settings.COURSE_DATA_FRESHNESS_PROBE_INTERVAL seconds per course across processes.
+
+        Arguments
+            force (bool): Probe regardless of the interval, e.g. right after a pipeline run.
+        """
+        request_cache = RequestCache(self.REQUEST_CACHE_NAMESPACE)
+        request_key = f'{self.course_id}_data_freshness'
+        interval = settings.COURSE_DATA_FRESHNESS_PROBE_INTERVAL
+        if not force and (not interval or request_cache.get_cached_response(request_key).is_found):
+            return
+        request_cache.set(request_key, True)
+
+        probe_key = sanitize_cache_key(f'course_{self.course_id}_data_freshness_probe')
+        if not force and not cache.add(probe_key, True, interval):
+            return
+
+        try:
+            summaries = self.client.course_summaries().course_summaries(
+                course_ids=[self.course_id], fields=['course_id', 'created'])
+        except ClientError as e:
+            logger.warning('Unable to probe the data freshness of course %s: %s', self.course_id, e)
+            return
+
+        created = summaries[0].get('created') if summaries else None
+        if not created:
+            return
+
+        # The run is not versioned with the rest of the course's cached data, and does not expire.  If it is
+        # evicted, the data is conservatively invalidated.
+        pipeline_run_key = sanitize_cache_key(f'course_{self.course_id}_pipeline_run')
+        if cache.get(pipeline_run_key) != created:
+            logger.info('Pipeline data for course %s was created at %s.', self.course_id, created)
+            cache.set(pipeline_run_key, created, None)
+            invalidate_course_cache(self.course_id, pipeline_data=True)
+
 
 class CourseAPIPresenterMixin(metaclass=abc.ABCMeta):
     """
@@ -60,35 +194,118 @@ class CourseAPIPresenterMixin(metaclass=abc.ABCMeta):
     """
 
     _last_updated = None
+    _prefetched_data = None
 
     def __init__(self, course_id, analytics_client):
         super().__init__(course_id, analytics_client)
-        self.course_api_client = CourseStructureApiClient(
-            settings.BACKEND_SERVICE_EDX_OAUTH2_PROVIDER_URL,
-            settings.BACKEND_SERVICE_EDX_OAUTH2_KEY,
-            settings.BACKEND_SERVICE_EDX_OAUTH2_SECRET,
-        )
+        self.course_api_client = get_oauth_client()
 
     def _get_structure(self):
-        """ Retrieves course structure from the course API. """
-        key = self.get_cache_key('structure')
-        structure = cache.get(key)
-        if not structure:
-            logger.debug('Retrieving structure for course: %s', self.course_id)
-            blocks_kwargs = {
-                'course_id': self.course_id,
-                'depth': 'all',
-                'all_blocks': 'true',
-                'requested_fields': 'children,format,graded',
-            }
-            structure = self.course_api_client.get(
-                urljoin(settings.COURSE_API_URL + '/', 'blocks/'),
-                params=blocks_kwargs
-            ).json()
-            cache.set(key, structure)
-
+        """
+        Retrieves course structure from the course API.  The structure is cached, and returned, as a
+        compact CourseTree rather than the raw blocks.
+        """
+        structure = get_or_set_single_flight(self.get_cache_key('structure'), self._fetch_structure,
+                                             settings.COURSE_STRUCTURE_CACHE_TIMEOUT,
+                                             settings.COURSE_STRUCTURE_CACHE_SOFT_TIMEOUT, family='structure')
+        return CourseTree.load(structure)
+
+    def _fetch_structure(self):
+        """ Fetches the course structure from the course API and caches the version of the parsed tree. """
+        logger.debug('Retrieving structure for course: %s', self.course_id)
+        blocks_kwargs = {
+            'course_id': self.course_id,
+            'depth': 'all',
+            'all_blocks': 'true',
+            'requested_fields': 'children,format,graded',
+        }
+        structure = self.course_api_client.get(
+            urljoin(settings.COURSE_API_URL + '/', 'blocks/'),
+            params=blocks_kwargs
+        ).json()
+        structure = CourseTree.from_blocks(structure)
+        set_cached(self.get_cache_key('structure_version'), structure.version,
+                   settings.COURSE_STRUCTURE_CACHE_TIMEOUT, family='structure_version')
         return structure
 
+    def _get_structure_index(self):
+        """
+        Returns the indexed course structure.  The parsed structure is shared by all presenters in the
+        process for as long as the cached structure version is unchanged.
+        """
+        return self._read_prefetched_data('structure', self._load_structure_index)
+
+    def _load_structure_index(self):
+        version_key = self.get_cache_key('structure_version')
+        version = get_cached(version_key, family='structure_version')
+        index = structure_registry.get(self.course_id, version)
+        if index is None:
+            index = CourseStructureIndex(self._get_structure())
+            structure_registry.add(self.course_id, index)
+            if version != index.tree.version:
+                # The version expired, or was evicted, before the cached structure: it is cached again so that
+                # the next requests find the shared structure rather than parse it again.
+                set_cached(version_key, index.tree.version, settings.COURSE_STRUCTURE_CACHE_TIMEOUT,
+                           family='structure_version')
+        return index
+
+    def get_prefetch_calls(self, output=None):
+        """
+        Returns the calls fetching, and caching, the course structure and module data read by the presenter, keyed
+        by name, for views to make concurrently (see fan_out()) before building their pages, and hand their results
+        back with use_prefetched_data().
+
+        The module data is only read to build the outputs of the presenter (e.g. its sections), and is not
+        prefetched if the output read by the page is already cached.  The cached output is then kept for the
+        request, rather than read again when the page is built.
+
+        Arguments
+            output (str): Name, in the data cache of the course (see get_data_cache_key()), of the output read by
+                the page, defaults to all sections of the course (see course_structure()).
+        """
+        calls = {'structure': self._load_structure_index}
+        if output is None:
+            output = self.section_type_template.format(None, None)
+        if self._get_cached_output(self.get_data_cache_key(output)) is None:
+            calls['module_data'] = self._load_course_module_data
+        return calls
+
+    def _get_cached_output(self, key):
+        """
+        Returns the output of the presenter cached under the key, or None if it is not cached.  Outputs found in the
+        cache are kept in the request cache, where the presenter methods building them look first.
+        """
+        request_cache = RequestCache(self.REQUEST_CACHE_NAMESPACE)
+        cached_response = request_cache.get_cached_response(key)
+        if cached_response.is_found:
+            return cached_response.value
+
+        output = get_cached(key, family=self.module_type)
+        if output:
+            request_cache.set(key, output)
+            return output
+        return None
+
+    def use_prefetched_data(self, data):
+        """
+        Makes the presenter read the results of the prefetch calls made by the view (see get_prefetch_calls()),
+        rather than make the calls again.
+
+        Arguments
+            data (dict): Results of the calls keyed by name, with the exceptions raised by calls in place of their
+                results.  Data of calls not included is fetched when read.
+        """
+        self._prefetched_data = data
+
+    def _read_prefetched_data(self, name, fetch):
+        """ Returns the prefetched result of the named call, or raises its exception, or else returns fetch(). """
+        if not self._prefetched_data or name not in self._prefetched_data:
+            return fetch()
+        data = self._prefetched_data[name]
+        if isinstance(data, Exception):
+            raise data
+        return data
+
     @abc.abstractproperty
     def section_type_template(self):
         """ Template for key generation to store/retrieve and cached structure data. E.g. "video_{}_{}" """
@@ -109,10 +326,6 @@ class CourseAPIPresenterMixin(metaclass=abc.ABCMeta):
         """
         return None
 
-    def get_cache_key(self, name):
-        """ Returns sanitized key for caching. """
-        return sanitize_cache_key(f'{self.course_id}_{name}')
-
     def course_structure(self, section_id=None, subsection_id=None):
         """
         Returns course structure from cache.  If structure isn't found, it is fetched from the
@@ -123,39 +336,64 @@ class CourseAPIPresenterMixin(metaclass=abc.ABCMeta):
         if section_id is None and subsection_id is not None:
             raise ValueError('section_id must be specified if subsection_id is specified.')
 
-        structure_type_key = self.get_cache_key(self.section_type_template.format(section_id, subsection_id))
-        found_structure = cache.get(structure_type_key)
+        structure_type_key = self.get_data_cache_key(self.section_type_template.format(section_id, subsection_id))
+
+        # Repeated lookups within a request return the same objects rather than new copies from the cache.
+        request_cache = RequestCache(self.REQUEST_CACHE_NAMESPACE)
+        cached_response = request_cache.get_cached_response(structure_type_key)
+        if cached_response.is_found:
+            return cached_response.value
+
+        found_structure = get_cached(structure_type_key, family=self.module_type)
 
         if not found_structure:
-            all_sections_key = self.get_cache_key(self.all_sections_key)
-            found_structure = cache.get(all_sections_key)
+            if subsection_id:
+                # Subsections are taken from their (separately materialized) section.
+                found_structure = self.course_structure(section_id)
+                if found_structure:
+                    found_structure = \
+                        [section for section in found_structure[0]['children'] if section['id'] == subsection_id]
+            else:
+                sections = list(enumerate(self._course_sections()))
+                if section_id:
+                    # Only the requested section needs data attached and rolled up.
+                    sections = [(index, section) for index, section in sections if section['id'] == section_id]
 
-            if not found_structure:
-                structure = self._get_structure()
-                found_structure = CourseStructure.course_structure_to_sections(structure, self.module_type,
-                                                                               graded=self.module_graded_type)
-                cache.set(all_sections_key, found_structure)
+                for index, section in sections:
+                    self._materialize_section(index, section)
 
-            for section in found_structure:
-                self.add_child_data_to_parent_blocks(section['children'],
-                                                     self.build_module_url_func(section['id']))
-                self.attach_data_to_parents(section['children'],
-                                            self.build_subsection_url_func(section['id']))
-                section['num_modules'] = sum(child.get('num_modules', 0) for child in section['children'])
+                found_structure = [section for _index, section in sections]
 
-            self.attach_data_to_parents(found_structure, self.build_section_url)
+            set_cached(structure_type_key, found_structure, family=self.module_type)
 
-            if found_structure:
-                if section_id:
-                    found_structure = [section for section in found_structure if section['id'] == section_id]
+        request_cache.set(structure_type_key, found_structure)
+        return found_structure
 
-                    if found_structure and subsection_id:
-                        found_structure = \
-                            [section for section in found_structure[0]['children'] if section['id'] == subsection_id]
+    def _course_sections(self):
+        """ Returns the sections, subsections, and modules of the course without any data attached. """
+        all_sections_key = self.get_cache_key(self.all_sections_key)
+        sections = get_cached(all_sections_key, family=self.module_type)
 
-            cache.set(structure_type_key, found_structure)
+        if not sections:
+            structure = self._get_structure_index()
+            sections = CourseStructure.course_structure_to_sections(structure, self.module_type,
+                                                                    graded=self.module_graded_type)
+            set_cached(all_sections_key, sections, family=self.module_type)
 
-        return found_structure
+        return sections
+
+    def _materialize_section(self, index, section):
+        """
+        Attaches data to the modules of the section and rolls it up to the subsections and the section.
+
+        Arguments:
+            index: Position of the section within the course.
+            section: Section returned by _course_sections().
+        """
+        self.add_child_data_to_parent_blocks(section['children'], self.build_module_url_func(section['id']))
+        self.attach_data_to_parents(section['children'], self.build_subsection_url_func(section['id']))
+        section['num_modules'] = sum(child.get('num_modules', 0) for child in section['children'])
+        self.attach_aggregated_data_to_parent(index, section, self.build_section_url)
 
     def attach_data_to_parents(self, parents, url_func=None):
         """ Convenience method for adding aggregated data from children."""
@@ -188,36 +426,37 @@ class CourseAPIPresenterMixin(metaclass=abc.ABCMeta):
 
     def _course_module_data(self):
         """ Retrieves course problems (from cache or course API) and calls process_module_data to attach data. """
+        return self._read_prefetched_data('module_data', self._load_course_module_data)
 
-        key = self.get_cache_key(self.module_type)
-        module_data = cache.get(key)
+    def _load_course_module_data(self):
+        return get_or_set_single_flight(self.get_data_cache_key(self.module_type), self._build_course_module_data,
+                                        settings.COURSE_MODULE_DATA_CACHE_TIMEOUT,
+                                        settings.COURSE_MODULE_DATA_CACHE_SOFT_TIMEOUT, family='module_data')
 
-        if not module_data:
-            module_data = self.fetch_course_module_data()
+    def _build_course_module_data(self):
+        """ Fetches course module data and builds a compact table of it keyed by module ID. """
+        module_data = self.fetch_course_module_data()
 
-            # Create a lookup table so that submission data can be quickly retrieved by downstream consumers.
-            table = OrderedDict()
-            last_updated = datetime.datetime.min
+        # Create a lookup table so that submission data can be quickly retrieved by downstream consumers.
+        table = OrderedDict()
+        last_updated = datetime.datetime.min
 
-            for datum in module_data:
-                self.attach_computed_data(datum)
-                table[datum['id']] = datum
+        for datum in module_data:
+            self.attach_computed_data(datum)
+            table[datum['id']] = datum
 
-                # Set the last_updated value
-                created = datum.pop('created', None)
-                if created:
-                    created = self.parse_api_datetime(created)
-                    last_updated = max(last_updated, created)
+            # Set the last_updated value
+            created = datum.pop('created', None)
+            if created:
+                created = self.parse_api_datetime(created)
+                last_updated = max(last_updated, created)
 
-            if last_updated is not datetime.datetime.min:
-                _key = self.get_cache_key(f'{self.module_type}_last_updated')
-                cache.set(_key, last_updated)
-                self._last_updated = last_updated
+        if last_updated is not datetime.datetime.min:
+            _key = self.get_data_cache_key(f'{self.module_type}_last_updated')
+            set_cached(_key, last_updated, settings.COURSE_MODULE_DATA_CACHE_TIMEOUT, family=self.module_type)
+            self._last_updated = last_updated
 
-            module_data = table
-            cache.set(key, module_data)
-
-        return module_data
+        return ModuleDataTable(table)
 
     def module_id_to_data_id(self, module):
         """ Translates the course structure module to the ID used by the analytics data API. """
@@ -298,19 +537,73 @@ class CourseAPIPresenterMixin(metaclass=abc.ABCMeta):
         return None
 
     def subsection_child(self, section_id, subsection_id, child_id):
-        """ Return the specified child of a subsection (e.g. problem, video). """
-        found_child = None
-        children = self.subsection_children(section_id, subsection_id)
-        if children:
-            found_children = [child for child in children if child['id'] == child_id]
-            found_child = found_children[0] if found_children else None
-        return found_child
+        """ Return a read-only view of the specified child of a subsection (e.g. problem, video). """
+        if not (section_id and subsection_id):
+            return None
+
+        parent_id, child = self._section_lookup(section_id).get(child_id, (None, None))
+        return child if parent_id == subsection_id else None
+
+    def _section_lookup(self, section_id):
+        """
+        Returns a dictionary mapping the IDs of a materialized section, its subsections and their children
+        to tuples of the ID of the parent block and a read-only view of the block.  The dictionary is built
+        once per request, when the section is first looked up.
+        """
+        key = self.get_data_cache_key(self.section_type_template.format(section_id, None)) + '_lookup'
+
+        request_cache = RequestCache(self.REQUEST_CACHE_NAMESPACE)
+        cached_response = request_cache.get_cached_response(key)
+        if cached_response.is_found:
+            return cached_response.value
+
+        lookup = {}
+        section = self.section(section_id)
+        if section:
+            lookup[section['id']] = (None, MappingProxyType(section))
+            for subsection in section.get('children', []):
+                lookup[subsection['id']] = (section['id'], MappingProxyType(subsection))
+                for child in subsection.get('children', []):
+                    lookup.setdefault(child['id'], (subsection['id'], MappingProxyType(child)))
+
+        request_cache.set(key, lookup)
+        return lookup
 
     def block(self, block_id):
-        """ Retrieve a specific block (e.g. problem, video). """
-        block = self._get_structure()['blocks'][block_id]
-        block['name'] = block.get('display_name')
-        return block
+        """ Retrieve a read-only view of a specific block (e.g. problem, video). """
+        block = self._get_structure_index().tree.block(block_id)
+        block['name'] = block['display_name']
+        return MappingProxyType(block)
+
+    def _neighbour_index(self):
+        """
+        Returns the modules with data (hence with URLs) in course order, and a dictionary mapping the ID of
+        each of these modules to its position in that list.
+        """
+        key = self.get_data_cache_key(f'{self.all_sections_key}_neighbours')
+
+        request_cache = RequestCache(self.REQUEST_CACHE_NAMESPACE)
+        cached_response = request_cache.get_cached_response(key)
+        if cached_response.is_found:
+            return cached_response.value
+
+        neighbours = get_cached(key, family=self.module_type)
+        if not neighbours:
+            components = [
+                component
+                for section in self.sections()
+                for subsection in section['children']
+                for component in subsection['children']
+                if component.get('url')  # Only consider siblings with data, hence with URLs
+            ]
+            positions = {}
+            for position, component in enumerate(components):
+                positions.setdefault(component['id'], position)
+            neighbours = (components, positions)
+            set_cached(key, neighbours, family=self.module_type)
+
+        request_cache.set(key, neighbours)
+        return neighbours
 
     def sibling_block(self, block_id, sibling_offset):
         """
@@ -320,24 +613,17 @@ class CourseAPIPresenterMixin(metaclass=abc.ABCMeta):
         its requested sibling.  Returns `None` if no such sibling is found.
         Only siblings with data are returned.
         """
-        sections = self.sections()
-        siblings = [
-            component
-            for section in sections
-            for subsection in section['children']
-            for component in subsection['children']
-            if component.get('url')  # Only consider siblings with data, hence with URLs
-        ]
-        try:
-            block_index = next((index for index, sibling in enumerate(siblings) if sibling['id'] == block_id))
-            sibling_index = block_index + sibling_offset
-            if sibling_index < 0:
-                return None
-            return siblings[sibling_index]
-        except (StopIteration, IndexError):
-            # StopIteration: requested video not found in the course structure
-            # IndexError: No such video with the requested offset
+        siblings, positions = self._neighbour_index()
+        block_index = positions.get(block_id)
+        if block_index is None:
+            # requested block not found in the course structure
+            return None
+
+        sibling_index = block_index + sibling_offset
+        if sibling_index < 0 or sibling_index >= len(siblings):
+            # No such block with the requested offset
             return None
+        return siblings[sibling_index]
 
     def next_block(self, block_id):
         """
@@ -361,8 +647,8 @@ class CourseAPIPresenterMixin(metaclass=abc.ABCMeta):
     def last_updated(self):
         """ Returns when data was last updated according to the data api. """
         if not self._last_updated:
-            key = self.get_cache_key(f'{self.module_type}_last_updated')
-            self._last_updated = cache.get(key)
+            key = self.get_data_cache_key(f'{self.module_type}_last_updated')
+            self._last_updated = get_cached(key, family=self.module_type)
 
         return self._last_updated
 
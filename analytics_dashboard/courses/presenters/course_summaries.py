@@ -1,8 +1,8 @@
 from analyticsclient.constants import enrollment_modes
 from django.conf import settings
-from django.core.cache import cache
 from waffle import switch_is_active
 
+from analytics_dashboard.core.caching import get_or_set_single_flight
 from analytics_dashboard.courses.presenters import BasePresenter
 
 
@@ -13,6 +13,10 @@ class CourseSummariesPresenter(BasePresenter):
     NON_NULL_STRING_FIELDS = ['course_id', 'catalog_course', 'catalog_course_title',
                               'start_date', 'end_date', 'pacing_type', 'availability']
 
+    # Whether the number of passing users is fetched, which defaults to the enable_course_passing switch.  Views
+    # set it when the presenter is called outside of the request's thread (see fan_out()).
+    include_passing_users = None
+
     @staticmethod
     def filter_summaries(all_summaries, course_ids=None):
         """Filter results to just the course IDs specified."""
@@ -26,27 +30,30 @@ class CourseSummariesPresenter(BasePresenter):
         If requesting full list and it's not cached or requesting a subset of course_summaries with the course_ids
         parameter, summaries will be fetched from the analytics data API.
         """
-        summaries = None
         if course_ids is None:
             # we only cache the full list of summaries
-            summaries = cache.get(self.CACHE_KEY)
-        if summaries is None:
-            exclude = ['programs']  # we make a separate call to the programs endpoint
-            if not switch_is_active('enable_course_passing'):
-                exclude.append('passing_users')
-            summaries = self.client.course_summaries().course_summaries(course_ids=course_ids, exclude=exclude)
-            summaries = [
-                {
-                    field: (
-                        '' if val is None and field in self.NON_NULL_STRING_FIELDS
-                        else val
-                    )
-                    for field, val in summary.items()
-                } for summary in summaries
-            ]
-            if course_ids is None:
-                cache.set(self.CACHE_KEY, summaries, settings.COURSE_SUMMARIES_CACHE_TIMEOUT)
-        return summaries
+            return get_or_set_single_flight(self.CACHE_KEY, self._fetch_summaries,
+                                            settings.COURSE_SUMMARIES_CACHE_TIMEOUT,
+                                            settings.COURSE_SUMMARIES_CACHE_SOFT_TIMEOUT, family='summaries')
+        return self._fetch_summaries(course_ids=course_ids)
+
+    def _fetch_summaries(self, course_ids=None):
+        exclude = ['programs']  # we make a separate call to the programs endpoint
+        include_passing_users = self.include_passing_users
+        if include_passing_users is None:
+            include_passing_users = switch_is_active('enable_course_passing')
+        if not include_passing_users:
+            exclude.append('passing_users')
+        summaries = self.client.course_summaries().course_summaries(course_ids=course_ids, exclude=exclude)
+        return [
+            {
+                field: (
+                    '' if val is None and field in self.NON_NULL_STRING_FIELDS
+                    else val
+                )
+                for field, val in summary.items()
+            } for summary in summaries
+        ]
 
     def _get_last_updated(self, summaries):
         # all the create times should be the same, so just use the first one
@@ -9,10 +9,11 @@ from django.urls import reverse
 from django.utils.translation import gettext_lazy as _
 from waffle import switch_is_active
 
+from analytics_dashboard.core.concurrency import fan_out
 from analytics_dashboard.core.templatetags.dashboard_extras import metric_percentage
 from analytics_dashboard.courses import utils
 from analytics_dashboard.courses.exceptions import NoVideosError
-from analytics_dashboard.courses.presenters import CourseAPIPresenterMixin, CoursePresenter
+from analytics_dashboard.courses.presenters import CourseAPIPresenterMixin, CoursePresenter, materialized
 
 logger = logging.getLogger(__name__)
 
@@ -22,11 +23,23 @@ class CourseEngagementActivityPresenter(CoursePresenter):
     Presenter for the engagement activity page.
     """
 
+    # Whether forum activity is included, which defaults to the show_engagement_forum_activity switch.  Views set
+    # it when the presenter is called outside of the request's thread (see fan_out()).
+    show_forum_activity = None
+
+    def is_forum_activity_shown(self):
+        if self.show_forum_activity is None:
+            return switch_is_active('show_engagement_forum_activity')
+        return self.show_forum_activity
+
+    def get_output_variant(self):
+        return (f'forum_activity_{int(self.is_forum_activity_shown())}',)
+
     def get_activity_types(self):
         activities = [AT.ANY, AT.PLAYED_VIDEO, AT.ATTEMPTED_PROBLEM]
 
         # Include forum activity only if feature is enabled.
-        if switch_is_active('show_engagement_forum_activity'):
+        if self.is_forum_activity_shown():
             activities.append(AT.POSTED_FORUM)
 
         return activities
@@ -128,16 +141,25 @@ class CourseEngagementActivityPresenter(CoursePresenter):
                 elif key in summary:
                     summary[key + '_percent_str'] = '--'
 
+    @materialized
     def get_summary_and_trend_data(self):
         """
         Retrieve recent summary and all historical trend data.
         """
         end_date = datetime.datetime.utcnow().strftime(Client.DATETIME_FORMAT)
-        api_trends = self.course.activity(start_date=None, end_date=end_date)
+        # Enrollment is only needed if there are trends, but is fetched alongside activity rather than after it.
+        api_trends, enrollment_data = fan_out(
+            lambda: self.course.activity(start_date=None, end_date=end_date),
+            lambda: self.course.enrollment(start_date=None, end_date=end_date),
+            return_exceptions=True,
+        )
+        if isinstance(api_trends, Exception):
+            raise api_trends
         summary = self._build_summary(api_trends)
         trends = self._build_trend(api_trends)
         if trends:
-            enrollment_data = self.course.enrollment(start_date=None, end_date=end_date)
+            if isinstance(enrollment_data, Exception):
+                raise enrollment_data
             self._annotate_with_enrollment(summary, trends, enrollment_data)
         return summary, trends
 
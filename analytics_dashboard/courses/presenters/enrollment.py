@@ -10,7 +10,7 @@ from django.utils.translation import gettext_lazy as _
 from django_countries import countries
 
 import analytics_dashboard.courses.utils as utils
-from analytics_dashboard.courses.presenters import CoursePresenter
+from analytics_dashboard.courses.presenters import CoursePresenter, materialized
 
 logger = logging.getLogger(__name__)
 
@@ -81,6 +81,7 @@ class CourseEnrollmentPresenter(CoursePresenter):
 
     NUMBER_TOP_COUNTRIES = 3
 
+    @materialized
     def get_summary_and_trend_data(self):
         """
         Retrieve recent summary and all historical trend data.
@@ -196,6 +197,7 @@ class CourseEnrollmentPresenter(CoursePresenter):
 
         return data
 
+    @materialized
     def get_geography_data(self):
         """
         Returns a list of course geography data and the updated date (ex. 2014-1-31).
@@ -281,6 +283,7 @@ class CourseEnrollmentDemographicsPresenter(CoursePresenter):
     # ages at this and above will be binned
     MAX_AGE = 100
 
+    @materialized
     def get_gender(self):
         """
         Returns the updated time, most recent gender counts, and breakdown of daily
@@ -333,6 +336,7 @@ class CourseEnrollmentDemographicsPresenter(CoursePresenter):
         all_enrollment = self._calculate_sum(most_recent_data, GENDERS)
         return utils.math.calculate_percent(known_enrollment, all_enrollment)
 
+    @materialized
     def get_ages(self):
         """
         Returns the updated time, summary of age ranges displayed in metrics, and
@@ -531,6 +535,7 @@ class CourseEnrollmentDemographicsPresenter(CoursePresenter):
 
         return api_response
 
+    @materialized
     def get_education(self):
         api_response = self.course.enrollment(demographics.EDUCATION)
         education_levels = None
@@ -4,17 +4,18 @@ from urllib.parse import urljoin
 
 from analyticsclient.exceptions import NotFoundError
 from django.conf import settings
-from django.core.cache import cache
 from django.urls import reverse
 from django.utils.translation import gettext_lazy as _
+from edx_django_utils.cache import RequestCache
 from requests.exceptions import HTTPError
 from slugify import slugify
 
 from common.course_structure import CourseStructure
-from analytics_dashboard.core.utils import CourseStructureApiClient, sanitize_cache_key
+from analytics_dashboard.core.caching import get_cached, get_or_set_single_flight, set_cached
+from analytics_dashboard.core.utils import get_oauth_client
 from analytics_dashboard.courses import utils
 from analytics_dashboard.courses.exceptions import BaseCourseError, NoAnswerSubmissionsError
-from analytics_dashboard.courses.presenters import CourseAPIPresenterMixin, CoursePresenter
+from analytics_dashboard.courses.presenters import CourseAPIPresenterMixin, CoursePresenter, materialized
 
 logger = logging.getLogger(__name__)
 
@@ -44,11 +45,7 @@ class CoursePerformancePresenter(CourseAPIPresenterMixin, CoursePresenter):
 
     def __init__(self, course_id, analytics_client):
         super().__init__(course_id, analytics_client)
-        self.grading_policy_client = CourseStructureApiClient(
-            settings.BACKEND_SERVICE_EDX_OAUTH2_PROVIDER_URL,
-            settings.BACKEND_SERVICE_EDX_OAUTH2_KEY,
-            settings.BACKEND_SERVICE_EDX_OAUTH2_SECRET,
-        )
+        self.grading_policy_client = get_oauth_client()
 
     def course_module_data(self):
         try:
@@ -181,21 +178,20 @@ class CoursePerformancePresenter(CourseAPIPresenterMixin, CoursePresenter):
 
     def grading_policy(self):
         """ Returns the grading policy for the represented course."""
-        key = self.get_cache_key('grading_policy')
-        grading_policy = cache.get(key)
+        return self._read_prefetched_data('grading_policy', self._load_grading_policy)
 
-        if not grading_policy:
-            logger.debug('Retrieving grading policy for course: %s', self.course_id)
-            grading_policy = self.grading_policy_client.get(
-                urljoin(settings.GRADING_POLICY_API_URL + '/', f'policy/courses/{self.course_id}'),
-            ).json()
+    def _load_grading_policy(self):
+        return get_or_set_single_flight(self.get_cache_key('grading_policy'), self._fetch_grading_policy,
+                                        family='grading_policy')
 
-            # Remove empty assignment types as they are not useful and will cause issues downstream.
-            grading_policy = [item for item in grading_policy if item['assignment_type']]
+    def _fetch_grading_policy(self):
+        logger.debug('Retrieving grading policy for course: %s', self.course_id)
+        grading_policy = self.grading_policy_client.get(
+            urljoin(settings.GRADING_POLICY_API_URL + '/', f'policy/courses/{self.course_id}'),
+        ).json()
 
-            cache.set(key, grading_policy)
-
-        return grading_policy
+        # Remove empty assignment types as they are not useful and will cause issues downstream.
+        return [item for item in grading_policy if item['assignment_type']]
 
     def get_max_policy_display_percent(self, grading_policy):
         """
@@ -262,19 +258,24 @@ class CoursePerformancePresenter(CourseAPIPresenterMixin, CoursePresenter):
     def assignments(self, assignment_type=None):
         """ Returns the assignments (and problems) for the represented course. """
 
-        assignment_type_name = None if assignment_type is None else assignment_type['name']
-        assignment_type_key = self.get_cache_key(f'assignments_{assignment_type_name}')
-        assignments = cache.get(assignment_type_key)
+        assignment_type_key = self.get_data_cache_key(self._assignments_output(assignment_type))
+
+        request_cache = RequestCache(self.REQUEST_CACHE_NAMESPACE)
+        cached_response = request_cache.get_cached_response(assignment_type_key)
+        if cached_response.is_found:
+            return cached_response.value
+
+        assignments = get_cached(assignment_type_key, family=self.module_type)
 
         if not assignments:
             all_assignments_key = self.get_cache_key('assignments')
-            assignments = cache.get(all_assignments_key)
+            assignments = get_cached(all_assignments_key, family=self.module_type)
 
             if not assignments:
-                structure = self._get_structure()
+                structure = self._get_structure_index()
                 assignments = CourseStructure.course_structure_to_assignments(
                     structure, graded=True, assignment_type=None)
-                cache.set(all_assignments_key, assignments)
+                set_cached(all_assignments_key, assignments, family=self.module_type)
 
             if assignment_type:
                 assignment_type['name'] = assignment_type['name'].lower()
@@ -285,8 +286,9 @@ class CoursePerformancePresenter(CourseAPIPresenterMixin, CoursePresenter):
             self.attach_data_to_parents(assignments, self._build_assignment_url)
 
             # Cache the data for the course-assignment_type combination.
-            cache.set(assignment_type_key, assignments)
+            set_cached(assignment_type_key, assignments, family=self.module_type)
 
+        request_cache.set(assignment_type_key, assignments)
         return assignments
 
     def attach_aggregated_data_to_parent(self, index, parent, url_func=None):
@@ -367,6 +369,19 @@ class CoursePerformancePresenter(CourseAPIPresenterMixin, CoursePresenter):
                     return True
         return False
 
+    def get_assignments_prefetch_calls(self):
+        """
+        Returns the prefetch calls (see get_prefetch_calls()) of the pages reading the assignments of the course,
+        whose module data is not prefetched if the assignments are already cached.
+        """
+        return self.get_prefetch_calls(self._assignments_output(None))
+
+    @staticmethod
+    def _assignments_output(assignment_type):
+        """ Returns the name of the cached assignments of the type (see assignments()). """
+        assignment_type_name = None if assignment_type is None else assignment_type['name']
+        return f'assignments_{assignment_type_name}'
+
     def assignment(self, assignment_id):
         """ Retrieve a specific assignment. """
         filtered = [assignment for assignment in self.assignments() if assignment['id'] == assignment_id]
@@ -421,8 +436,9 @@ class TagsDistributionPresenter(CourseAPIPresenterMixin, CoursePresenter):
     def module_graded_type(self):
         return None
 
-    def get_cache_key(self, name):
-        return sanitize_cache_key(f'{self.course_id}_{name}')
+    def get_prefetch_calls(self, output=None):
+        # The available tags, read by every page, are built from the module data.
+        return {'structure': self._load_structure_index, 'module_data': self._load_course_module_data}
 
     def fetch_course_module_data(self):
         try:
@@ -504,23 +520,7 @@ class TagsDistributionPresenter(CourseAPIPresenterMixin, CoursePresenter):
             logger.error("Unable to retrieve tags distribution info for %s: %s", self.course_id, e)
             return {}
 
-    def _get_course_structure(self):
-        def _update_node(updated_structure, origin_structure, node_id, parent_id=None):
-            """
-            Helper function to get proper course structure.
-            Updates the dict that passed as the first argument (adds the parent to each node)
-            """
-            updated_structure[node_id] = origin_structure[node_id]
-            updated_structure[node_id]['parent'] = parent_id if parent_id else None
-            for child_id in origin_structure[node_id].get("children", []):
-                _update_node(updated_structure, origin_structure, child_id, origin_structure[node_id]['id'])
-
-        updated_structure = OrderedDict()
-        origin_structure = self._get_structure()
-        if origin_structure:
-            _update_node(updated_structure, origin_structure["blocks"], origin_structure['root'])
-        return updated_structure
-
+    @materialized
     def get_tags_distribution(self, key):
         tags_distribution_data = self._get_course_module_data()
 
@@ -605,17 +605,18 @@ class TagsDistributionPresenter(CourseAPIPresenterMixin, CoursePresenter):
         result = []
         index = 0
 
-        course_structure = self._get_course_structure()
+        tree = self._get_structure_index().tree
 
-        for key, val in course_structure.items():
-            if key in intermediate:
-                first_parent = course_structure[val['parent']]
-                second_parent = course_structure[first_parent['parent']]
+        for position in tree.pre_order():
+            key = tree.ids[position]
+            if key in intermediate and 'index' not in intermediate[key]:
+                first_parent = tree.parent(position)
+                second_parent = tree.parent(first_parent)
 
                 index += 1
                 intermediate[key]['index'] = index
-                intermediate[key]['name'] = ', '.join([second_parent['display_name'], first_parent['display_name'],
-                                                       val['display_name']])
+                intermediate[key]['name'] = ', '.join([tree.names[second_parent], tree.names[first_parent],
+                                                       tree.names[position]])
                 result.append(intermediate[key])
 
         return result
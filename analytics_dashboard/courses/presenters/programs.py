@@ -1,5 +1,4 @@
-from django.core.cache import cache
-
+from analytics_dashboard.core.caching import get_cached, set_cached
 from analytics_dashboard.courses.presenters import BasePresenter
 
 
@@ -29,13 +28,13 @@ class ProgramsPresenter(BasePresenter):
         Returns all programs. If not cached, programs will be fetched
         from the analytics data API.
         """
-        all_programs = cache.get(self.CACHE_KEY)
+        all_programs = get_cached(self.CACHE_KEY, family='programs')
         if all_programs is None:
             all_programs = self.client.programs().programs()
             all_programs = [
                 {field: ('' if val is None and field in self.NON_NULL_STRING_FIELDS else val)
                  for field, val in program.items()} for program in all_programs]
-            cache.set(self.CACHE_KEY, all_programs)
+            set_cached(self.CACHE_KEY, all_programs, family='programs')
         return all_programs
 
     def get_programs(self, program_ids=None, course_ids=None):
@@ -0,0 +1,89 @@
+from concurrent.futures import ThreadPoolExecutor
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+from edx_django_utils.cache import RequestCache
+
+from analytics_dashboard.courses import cache_warming
+
+COURSE_ID = 'edX/DemoX/Demo_Course'
+
+
+class CacheWarmingTests(TestCase):
+    @mock.patch('analytics_dashboard.courses.cache_warming.TagsDistributionPresenter')
+    @mock.patch('analytics_dashboard.courses.cache_warming.CourseEngagementVideoPresenter')
+    @mock.patch('analytics_dashboard.courses.cache_warming.CoursePerformancePresenter')
+    def test_warm_course(self, performance_mock, video_mock, tags_mock):
+        RequestCache('course_structure').set('key', 'value')
+        cache_warming.warm_course(COURSE_ID)
+
+        performance_mock.return_value.grading_policy.assert_called_once_with()
+        performance_mock.return_value.assignments.assert_called_once_with()
+        performance_mock.return_value.sections.assert_called_once_with()
+        video_mock.return_value.sections.assert_called_once_with()
+        tags_mock.return_value.get_available_tags.assert_called_once_with()
+        tags_mock.return_value.sections.assert_called_once_with()
+        self.assertFalse(RequestCache('course_structure').get_cached_response('key').is_found)
+
+    @mock.patch('analytics_dashboard.courses.cache_warming.CoursePerformancePresenter')
+    def test_request_cache_cleared_on_failure(self, performance_mock):
+        performance_mock.return_value.grading_policy.side_effect = ValueError
+
+        def memoize(*_args):
+            RequestCache('course_structure').set('key', 'value')
+            return mock.DEFAULT
+
+        performance_mock.side_effect = memoize
+        with self.assertRaises(ValueError):
+            cache_warming.warm_course(COURSE_ID)
+        self.assertFalse(RequestCache('course_structure').get_cached_response('key').is_found)
+
+
+@mock.patch('analytics_dashboard.courses.cache_warming.warm_summaries')
+@mock.patch('analytics_dashboard.courses.cache_warming.warm_course')
+class WarmCourseCachesCommandTests(TestCase):
+    def call_command(self, *args):
+        stdout, stderr = StringIO(), StringIO()
+        call_command('warm_course_caches', *args, stdout=stdout, stderr=stderr)
+        return stdout.getvalue(), stderr.getvalue()
+
+    def test_courses(self, warm_course_mock, warm_summaries_mock):
+        stdout, _stderr = self.call_command(COURSE_ID, 'course-v1:edX+DemoX+Demo', '--concurrency', '1')
+        warm_summaries_mock.assert_called_once_with()
+        self.assertEqual(warm_course_mock.call_args_list, [mock.call(COURSE_ID), mock.call('course-v1:edX+DemoX+Demo')])
+        self.assertIn(f'[1/2] {COURSE_ID} warmed', stdout)
+        self.assertIn('Warmed 2 of 2 courses.', stdout)
+
+    @mock.patch('analytics_dashboard.courses.cache_warming.get_all_course_ids', return_value=[COURSE_ID])
+    def test_all_courses(self, _all_courses_mock, warm_course_mock, warm_summaries_mock):
+        self.call_command('--concurrency', '1', '--skip-summaries')
+        warm_summaries_mock.assert_not_called()
+        warm_course_mock.assert_called_once_with(COURSE_ID)
+
+    def test_failures(self, warm_course_mock, _warm_summaries_mock):
+        warm_course_mock.side_effect = [ValueError('upstream unavailable'), None]
+        stdout, stderr = StringIO(), StringIO()
+        with self.assertRaisesRegex(CommandError, COURSE_ID):
+            call_command('warm_course_caches', COURSE_ID, 'course-v1:edX+DemoX+Demo', '--concurrency', '1',
+                         stdout=stdout, stderr=stderr)
+        self.assertIn(f'[1/2] {COURSE_ID} failed', stderr.getvalue())
+        self.assertIn('upstream unavailable', stderr.getvalue())
+        self.assertIn('Warmed 1 of 2 courses.', stdout.getvalue())
+
+    @mock.patch('analytics_dashboard.courses.management.base.ProcessPoolExecutor',
+                side_effect=lambda max_workers, mp_context: ThreadPoolExecutor(max_workers))
+    @mock.patch('analytics_dashboard.courses.management.base.close_shared_clients')
+    def test_workers(self, close_clients_mock, executor_mock, warm_course_mock, _warm_summaries_mock):
+        stdout, _stderr = self.call_command(COURSE_ID, 'course-v1:edX+DemoX+Demo', '--skip-summaries')
+        close_clients_mock.assert_called_once_with()
+        # Workers are forked whatever the default start method of the platform.
+        self.assertEqual(executor_mock.call_args.kwargs['mp_context'].get_start_method(), 'fork')
+        self.assertEqual(warm_course_mock.call_count, 2)
+        self.assertIn('Warmed 2 of 2 courses.', stdout)
+
+    def test_invalid_concurrency(self, _warm_course_mock, _warm_summaries_mock):
+        with self.assertRaises(CommandError):
+            self.call_command(COURSE_ID, '--concurrency', '0')
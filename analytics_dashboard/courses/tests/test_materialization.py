@@ -0,0 +1,150 @@
+from io import StringIO
+from unittest import mock
+
+from analyticsclient.client import Client
+from analyticsclient.exceptions import NotFoundError
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase, override_settings
+from django.utils import translation
+from edx_django_utils.cache import RequestCache
+
+from analytics_dashboard.core.caching import invalidate_course_cache
+from analytics_dashboard.courses import materialization
+from analytics_dashboard.courses.materialization import MaterializationResult, MaterializedOutput
+from analytics_dashboard.courses.presenters import materializing
+from analytics_dashboard.courses.presenters.enrollment import CourseEnrollmentPresenter
+from analytics_dashboard.courses.tests import utils
+
+COURSE_ID = 'edX/DemoX/Demo_Course'
+
+
+@mock.patch('analyticsclient.course.Course.enrollment')
+class MaterializedTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        RequestCache.clear_all_namespaces()
+        self.presenter = CourseEnrollmentPresenter(COURSE_ID, Client('base_url'))
+
+    def test_not_materialized(self, enrollment_mock):
+        enrollment_mock.return_value = utils.get_mock_api_enrollment_data(COURSE_ID)
+        expected = self.presenter.get_summary_and_trend_data()
+        self.assertEqual(self.presenter.get_summary_and_trend_data(), expected)
+        self.assertEqual(enrollment_mock.call_count, 2)
+
+    def test_materialized(self, enrollment_mock):
+        enrollment_mock.return_value = utils.get_mock_api_enrollment_data(COURSE_ID)
+        with materializing():
+            expected = self.presenter.get_summary_and_trend_data()
+
+        self.assertEqual(self.presenter.get_summary_and_trend_data(), expected)
+        self.assertEqual(self.presenter.get_summary_and_trend_data(), expected)
+        enrollment_mock.assert_called_once()
+
+        with translation.override('es-419'):
+            self.presenter.get_summary_and_trend_data()
+        self.assertEqual(enrollment_mock.call_count, 2)
+
+        invalidate_course_cache(COURSE_ID)
+        self.presenter.get_summary_and_trend_data()
+        self.assertEqual(enrollment_mock.call_count, 3)
+
+    def test_dry_run(self, enrollment_mock):
+        enrollment_mock.return_value = utils.get_mock_api_enrollment_data(COURSE_ID)
+        with materializing(dry_run=True):
+            self.presenter.get_summary_and_trend_data()
+        self.presenter.get_summary_and_trend_data()
+        self.assertEqual(enrollment_mock.call_count, 2)
+
+
+class MaterializeCourseTests(TestCase):
+    def setUp(self):
+        self.presenter_class = mock.Mock()
+        self.presenter = self.presenter_class.return_value
+        self.presenter.course_id = COURSE_ID
+        outputs = (
+            MaterializedOutput('trend', self.presenter_class, 'get_trend', ()),
+            MaterializedOutput('missing', self.presenter_class, 'get_missing', ()),
+            MaterializedOutput('broken', self.presenter_class, 'get_broken', ()),
+            MaterializedOutput('tags', self.presenter_class, 'get_tags', ('learning_outcome',)),
+        )
+        patcher = mock.patch.object(materialization, 'OUTPUTS', outputs)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    @mock.patch('analytics_dashboard.courses.presenters.CoursePresenter.check_data_freshness')
+    def test_materialize_course(self, freshness_mock):
+        self.presenter.get_missing.side_effect = NotFoundError
+        self.presenter.get_broken.side_effect = ValueError('upstream unavailable')
+
+        results = materialization.materialize_course(COURSE_ID)
+
+        freshness_mock.assert_called_once_with(force=True)
+        self.presenter_class.assert_called_once()
+        self.presenter.get_trend.assert_called_once_with()
+        self.presenter.get_tags.assert_called_once_with('learning_outcome')
+        self.assertEqual([(result.name, result.skipped, result.error) for result in results], [
+            ('trend', False, None),
+            ('missing', True, None),
+            ('broken', False, 'upstream unavailable'),
+            ('tags', False, None),
+        ])
+
+    @mock.patch('analytics_dashboard.courses.presenters.CoursePresenter.check_data_freshness', mock.Mock())
+    @override_settings(COURSE_MATERIALIZED_LANGUAGES=('en-us', 'fr'))
+    def test_languages(self):
+        languages = []
+        self.presenter.get_trend.side_effect = lambda: languages.append(translation.get_language())
+
+        results = materialization.materialize_course(COURSE_ID)
+
+        self.assertEqual(languages, ['en', 'fr'])
+        self.assertEqual(self.presenter_class.call_count, 2)
+        self.assertEqual([(result.name, result.language) for result in results if result.name == 'trend'],
+                         [('trend', 'en'), ('trend', 'fr')])
+
+    @mock.patch('analytics_dashboard.courses.presenters.CoursePresenter.check_data_freshness')
+    def test_dry_run(self, freshness_mock):
+        materialization.materialize_course(COURSE_ID, dry_run=True)
+        freshness_mock.assert_not_called()
+        self.presenter.get_trend.assert_called_once_with()
+
+
+@mock.patch('analytics_dashboard.courses.materialization.materialize_course')
+class MaterializeCourseOutputsCommandTests(TestCase):
+    def call_command(self, *args):
+        stdout, stderr = StringIO(), StringIO()
+        call_command('materialize_course_outputs', *args, stdout=stdout, stderr=stderr)
+        return stdout.getvalue(), stderr.getvalue()
+
+    def test_courses(self, materialize_mock):
+        materialize_mock.return_value = [MaterializationResult('trend', 'en', 0.5, False, None),
+                                         MaterializationResult('missing', 'en', 0.1, True, None)]
+        stdout, _stderr = self.call_command(COURSE_ID, '--concurrency', '1')
+        materialize_mock.assert_called_once_with(COURSE_ID, dry_run=False)
+        self.assertIn(f'[1/1] {COURSE_ID} materialized 1 outputs (1 without data, 0 failed)', stdout)
+        self.assertIn('Materialized 1 of 1 courses.', stdout)
+        self.assertNotIn('mean s', stdout)
+
+    @mock.patch('analytics_dashboard.courses.cache_warming.get_all_course_ids',
+                return_value=[COURSE_ID, 'course-v1:edX+DemoX+Demo'])
+    def test_dry_run(self, _all_courses_mock, materialize_mock):
+        materialize_mock.side_effect = [[MaterializationResult('trend', 'en', 0.5, False, None)],
+                                        [MaterializationResult('trend', 'en', 1.5, False, None)]]
+        stdout, _stderr = self.call_command('--concurrency', '1', '--dry-run')
+        materialize_mock.assert_called_with('course-v1:edX+DemoX+Demo', dry_run=True)
+        self.assertRegex(stdout, r'trend\s+2\s+2.00\s+1.00\s+1.50')
+        self.assertIn('Materialized 2 of 2 courses (dry run).', stdout)
+
+    def test_failures(self, materialize_mock):
+        materialize_mock.side_effect = [[MaterializationResult('broken', 'en', 0.5, False, 'upstream unavailable')],
+                                        ValueError('no client')]
+        stdout, stderr = StringIO(), StringIO()
+        with self.assertRaisesRegex(CommandError, 'course-v1:edX'):
+            call_command('materialize_course_outputs', COURSE_ID, 'course-v1:edX+DemoX+Demo', '--concurrency', '1',
+                         stdout=stdout, stderr=stderr)
+        self.assertIn(f'[1/2] {COURSE_ID} broken (en) failed: upstream unavailable', stderr.getvalue())
+        self.assertIn('[2/2] course-v1:edX+DemoX+Demo failed', stderr.getvalue())
+        self.assertIn('no client', stderr.getvalue())
+        self.assertIn('Materialized 0 of 2 courses.', stdout.getvalue())
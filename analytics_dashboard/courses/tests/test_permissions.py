@@ -9,8 +9,10 @@ from django_dynamic_fixture import G
 from edx_django_utils.cache import TieredCache
 from social_django.models import UserSocialAuth
 
+from analytics_dashboard.core.caching import local_cache
 from analytics_dashboard.courses import permissions
 from analytics_dashboard.courses.exceptions import PermissionsRetrievalFailedError
+from analytics_dashboard.settings import base as base_settings
 
 User = get_user_model()
 
@@ -179,6 +181,17 @@ class PermissionsTests(TestCase):
         self.assertIsNone(cache.get(permissions_key))
         self.assertIsNone(cache.get(update_key))
 
+    @override_settings(CACHE_LOCAL_TIMEOUTS=base_settings.CACHE_LOCAL_TIMEOUTS)
+    @mock.patch('analytics_dashboard.courses.permissions._refresh_user_course_permissions', return_value=[])
+    def test_revoke_user_permissions_in_other_process(self, _refresh_mock):
+        self.addCleanup(local_cache.clear)
+        permissions.set_user_course_permissions(self.user, [self.course_id])
+        self.assertTrue(permissions.user_can_view_course(self.user, self.course_id))
+
+        # Permissions revoked by another process are only removed from the shared cache.
+        cache.clear()
+        self.assertFalse(permissions.user_can_view_course(self.user, self.course_id))
+
     def _setup_mock_course_ids_responses_and_expects(self, mock_client, course_ids, page_size=100):
         """ Sets up mock client calls for course_ids endpoint and returns the expected calls to be made. """
         paged_responses = []
@@ -10,9 +10,11 @@ from ddt import data, ddt, unpack
 from django.core.cache import cache
 from django.test import TestCase, override_settings
 from django.urls import reverse
+from edx_django_utils.cache import RequestCache
 from slugify import slugify
 from waffle.testutils import override_switch
 
+from common.course_structure import CourseStructureIndex
 from common.tests.course_fixtures import (
     ChapterFixture,
     CourseFixture,
@@ -20,8 +22,10 @@ from common.tests.course_fixtures import (
     VerticalFixture,
     VideoFixture,
 )
+from analytics_dashboard.core.exceptions import ServiceUnavailableError
+from analytics_dashboard.core.utils import sanitize_cache_key
 from analytics_dashboard.courses.exceptions import NoVideosError
-from analytics_dashboard.courses.presenters import CoursePresenter
+from analytics_dashboard.courses.presenters import CoursePresenter, materializing
 from analytics_dashboard.courses.presenters.engagement import (
     CourseEngagementActivityPresenter,
     CourseEngagementVideoPresenter,
@@ -180,6 +184,23 @@ class CourseEngagementActivityPresenterTests(TestCase):
                                          self.get_expected_summary_normal(False))
         self.assertSummaryAndTrendsValid(True, self.get_expected_trends(True), self.get_expected_summary_normal(True))
 
+    @mock.patch('analyticsclient.course.Course.activity', mock.Mock(side_effect=utils.mock_course_activity))
+    @mock.patch('analyticsclient.course.Course.enrollment', mock.Mock(side_effect=utils.mock_course_enrollment))
+    def test_materialized_summary_and_trend_data(self):
+        """ Materialized outputs are only served while forum activity is shown, or not, as when materialized. """
+        cache.clear()
+        self.addCleanup(cache.clear)
+        with override_switch('show_engagement_forum_activity', active=False), materializing():
+            self.presenter.get_summary_and_trend_data()
+        self.assertSummaryAndTrendsValid(False, self.get_expected_trends(False),
+                                         self.get_expected_summary_normal(False))
+        self.assertSummaryAndTrendsValid(True, self.get_expected_trends(True), self.get_expected_summary_normal(True))
+
+        self.presenter.show_forum_activity = True
+        with override_switch('show_engagement_forum_activity', active=False):
+            self.assertEqual(self.presenter.get_activity_types()[-1], AT.POSTED_FORUM)
+            self.assertIn(AT.POSTED_FORUM, self.presenter.get_summary_and_trend_data()[1][0])
+
     @mock.patch('analyticsclient.course.Course.activity', mock.Mock(side_effect=utils.mock_course_activity_week_ahead))
     @mock.patch('analyticsclient.course.Course.enrollment', mock.Mock(side_effect=utils.mock_course_enrollment))
     def test_get_summary_and_trend_data_lagging_enrollment(self):
@@ -212,6 +233,7 @@ class CourseEngagementVideoPresenterTests(TestCase):
 
     def setUp(self):
         super().setUp()
+        RequestCache.clear_all_namespaces()
         self.course_id = 'this/course/id'
         self.presenter = CourseEngagementVideoPresenter(self.course_id, Client('base_url'))
 
@@ -283,6 +305,68 @@ class CourseEngagementVideoPresenterTests(TestCase):
                 for index, actual_video in enumerate(actual_videos):
                     utils.assert_dict_contains_subset(actual_video, expected[index])
 
+    @override_settings(CACHES={
+        'default': {
+            'BACKEND': 'django.core.cache.backends.dummy.DummyCache',
+        }
+    })
+    def test_section_materialized_alone(self):
+        """
+        Ensure that only the requested section has data attached when a section is requested.
+        """
+        chapters = [ChapterFixture(), ChapterFixture()]
+        course_fixture = CourseFixture(org='this', course='course', run='id')
+        for chapter in chapters:
+            chapter.add_children(SequentialFixture().add_children(VerticalFixture().add_children(VideoFixture())))
+            course_fixture.add_children(chapter)
+
+        with mock.patch('analytics_dashboard.core.utils.CourseStructureApiClient.get') as api_client_get_mock:
+            api_client_get_mock.return_value.json.return_value = course_fixture.course_structure()
+            with mock.patch('analyticsclient.course.Course.videos',
+                            mock.Mock(return_value=utils.get_mock_video_data(course_fixture))):
+                with mock.patch.object(self.presenter, 'add_child_data_to_parent_blocks',
+                                       wraps=self.presenter.add_child_data_to_parent_blocks) as add_data_mock:
+                    section = self.presenter.section(chapters[1].id)
+                    self.assertEqual(add_data_mock.call_count, 1)
+
+                    # The section keeps its position in the course and has its data rolled up.
+                    self.assertEqual(section['index'], 2)
+                    self.assertEqual(section['num_modules'], 1)
+                    self.assertTrue(section['users_at_start'] > 0)
+
+                    subsection = self.presenter.subsection(chapters[1].id, chapters[1].children[0].id)
+                    self.assertEqual(subsection['id'], chapters[1].children[0].id)
+                    self.assertEqual(add_data_mock.call_count, 1)
+
+    @override_settings(CACHES={
+        'default': {
+            'BACKEND': 'django.core.cache.backends.dummy.DummyCache',
+        }
+    })
+    def test_subsection_child(self):
+        """
+        Verify that subsection children are looked up by ID and returned as read-only views.
+        """
+        chapter = ChapterFixture()
+        sequential = SequentialFixture()
+        course_fixture = CourseFixture(org='this', course='course', run='id')
+        course_fixture.add_children(chapter.add_children(sequential.add_children(
+            VerticalFixture().add_children(self.VIDEO_1, self.VIDEO_2))))
+
+        with mock.patch('analytics_dashboard.core.utils.CourseStructureApiClient.get') as api_client_get_mock:
+            api_client_get_mock.return_value.json.return_value = course_fixture.course_structure()
+            with mock.patch('analyticsclient.course.Course.videos',
+                            mock.Mock(return_value=utils.get_mock_video_data(course_fixture))):
+                video_id = utils.get_encoded_module_id(self.VIDEO_2['id'])
+                child = self.presenter.subsection_child(chapter.id, sequential.id, video_id)
+                self.assertEqual(child['id'], video_id)
+                with self.assertRaises(TypeError):
+                    child['name'] = 'changed'
+
+                self.assertIsNone(self.presenter.subsection_child(chapter.id, sequential.id, 'non-existent-id'))
+                self.assertIsNone(self.presenter.subsection_child(chapter.id, chapter.id, video_id))
+                self.assertIsNone(self.presenter.subsection_child(None, sequential.id, video_id))
+
     def test_module_id_to_data_id(self):
         opaque_key_id = 'i4x-edX-DemoX-video-0b9e39477cf34507a7a48f74be381fdd'
         module_id = 'i4x://edX/DemoX/video/0b9e39477cf34507a7a48f74be381fdd'
@@ -629,6 +713,41 @@ class CourseEngagementVideoPresenterTests(TestCase):
                 sibling = self.presenter.sibling_block(utils.get_encoded_module_id(self.VIDEO_1['id']), 1)
                 self.assertEqual(sibling['id'], utils.get_encoded_module_id(self.VIDEO_3['id']))
 
+    def test_sibling_index_cached(self):
+        """
+        Verify that the neighbour index is cached, so that later navigation does not rebuild the sections.
+        """
+        fixture = CourseFixture().add_children(
+            ChapterFixture().add_children(
+                SequentialFixture().add_children(
+                    VerticalFixture().add_children(
+                        self.VIDEO_1,
+                        self.VIDEO_2,
+                        self.VIDEO_3
+                    )
+                )
+            )
+        )
+        with mock.patch(
+            'analyticsclient.course.Course.videos', mock.Mock(return_value=utils.get_mock_video_data(fixture))
+        ):
+            with mock.patch('analytics_dashboard.core.utils.CourseStructureApiClient.get') as api_client_get_mock:
+                api_client_get_mock.return_value.json.return_value = fixture.course_structure()
+                self.presenter.sibling_block(utils.get_encoded_module_id(self.VIDEO_1['id']), 1)
+
+        RequestCache.clear_all_namespaces()
+        with mock.patch.object(self.presenter, 'sections') as sections_mock:
+            self.assertEqual(
+                self.presenter.next_block(utils.get_encoded_module_id(self.VIDEO_2['id']))['id'],
+                utils.get_encoded_module_id(self.VIDEO_3['id'])
+            )
+            self.assertEqual(
+                self.presenter.previous_block(utils.get_encoded_module_id(self.VIDEO_2['id']))['id'],
+                utils.get_encoded_module_id(self.VIDEO_1['id'])
+            )
+            self.assertIsNone(self.presenter.next_block('unknown-block'))
+            sections_mock.assert_not_called()
+
     @data('http://example.com', 'http://example.com/')
     def test_build_render_xblock_url(self, xblock_render_base):
         self.assertIsNone(self.presenter.build_render_xblock_url(None, None))
@@ -804,6 +923,7 @@ class CoursePerformancePresenterTests(TestCase):
 
     def setUp(self):
         cache.clear()
+        RequestCache.clear_all_namespaces()
         self.course_id = PERFORMER_PRESENTER_COURSE_ID
         self.problem_id = 'i4x://edX/DemoX.1/problem/05d289c5ad3d47d48a77622c4a81ec36'
         self.presenter = CoursePerformancePresenter(self.course_id, Client('base_url'))
@@ -914,6 +1034,38 @@ class CoursePerformancePresenterTests(TestCase):
         percent = self.presenter.get_max_policy_display_percent([{'weight': 0.0}, {'weight': 1.0}, {'weight': 0.04}])
         self.assertEqual(90, percent)
 
+    @mock.patch('analytics_dashboard.core.utils.CourseStructureApiClient.get')
+    def test_prefetched_data(self, api_client_get_mock):
+        """ Verify the presenter reads the prefetched data, and raises prefetch errors, without fetching again. """
+        error = ServiceUnavailableError('Upstream calls did not return within 20s.')
+        self.presenter.use_prefetched_data({'grading_policy': self.factory.presented_grading_policy,
+                                            'structure': error})
+        self.assertListEqual(self.presenter.grading_policy(), self.factory.presented_grading_policy)
+        with self.assertRaises(ServiceUnavailableError):
+            self.presenter._get_structure_index()  # pylint: disable=protected-access
+        api_client_get_mock.assert_not_called()
+
+    def test_prefetch_calls(self):
+        """ Verify the module data is only prefetched if the output read by the page is not cached. """
+        self.assertSetEqual(set(self.presenter.get_assignments_prefetch_calls()), {'structure', 'module_data'})
+        self.assertSetEqual(set(self.presenter.get_prefetch_calls()), {'structure', 'module_data'})
+
+        with mock.patch('analytics_dashboard.core.utils.CourseStructureApiClient.get') as api_client_get_mock:
+            api_client_get_mock.return_value.json.return_value = self.factory.structure
+            with mock.patch('analyticsclient.course.Course.problems', self.factory.problems):
+                assignments = self.presenter.assignments()
+                sections = self.presenter.sections()
+
+        RequestCache.clear_all_namespaces()
+        self.assertSetEqual(set(self.presenter.get_assignments_prefetch_calls()), {'structure'})
+        self.assertSetEqual(set(self.presenter.get_prefetch_calls()), {'structure'})
+        # The cached outputs are kept for the request.
+        with mock.patch('analytics_dashboard.courses.presenters.performance.get_cached') as get_cached_mock, \
+                mock.patch('analytics_dashboard.courses.presenters.get_cached', get_cached_mock):
+            self.assertListEqual(self.presenter.assignments(), assignments)
+            self.assertListEqual(self.presenter.sections(), sections)
+        get_cached_mock.assert_not_called()
+
     def test_assignment_types(self):
         """ Verify the presenter returns the correct assignment types. """
         with mock.patch('analytics_dashboard.courses.presenters.performance.CoursePerformancePresenter.grading_policy',
@@ -971,6 +1123,11 @@ class CoursePerformancePresenterTests(TestCase):
             }
             utils.assert_dict_contains_subset(actual, expected)
 
+            # The block is a read-only view which does not leak into later lookups.
+            with self.assertRaises(TypeError):
+                actual['name'] = 'changed'
+            self.assertEqual(self.presenter.block(_id)['name'], problem['name'])
+
     def test_sections(self):
         """ Verify the presenter returns a specific assignment. """
         ungraded_problems = self.factory.problems(False)
@@ -1034,12 +1191,98 @@ class CoursePerformancePresenterTests(TestCase):
                 self.assertListEqual(
                     self.presenter.subsection_children(section['id'], subsection['id']), expected_problems)
 
+    @override_settings(COURSE_DATA_FRESHNESS_PROBE_INTERVAL=300)
+    @mock.patch('analyticsclient.course_summaries.CourseSummaries.course_summaries')
+    def test_data_freshness(self, course_summaries_mock):
+        """ Cached pipeline data is invalidated only when the pipeline has produced new data for the course. """
+        course_summaries_mock.return_value = [{'course_id': self.course_id, 'created': '2014-01-01T000000'}]
+        structure_key = self.presenter.get_cache_key('structure')
+        self.assertEqual(course_summaries_mock.call_count, 0)
+
+        self.presenter.check_data_freshness()
+        key = self.presenter.get_data_cache_key('problem')
+        self.assertEqual(course_summaries_mock.call_count, 1)
+
+        # The pipeline is probed once per request, and once per interval across requests.
+        self.presenter.check_data_freshness()
+        RequestCache.clear_all_namespaces()
+        self.presenter.check_data_freshness()
+        self.assertEqual(self.presenter.get_data_cache_key('problem'), key)
+        self.assertEqual(course_summaries_mock.call_count, 1)
+
+        # Past the interval, keys only change once the pipeline has run again.
+        probe_key = sanitize_cache_key(f'course_{self.course_id}_data_freshness_probe')
+        cache.delete(probe_key)
+        RequestCache.clear_all_namespaces()
+        self.presenter.check_data_freshness()
+        self.assertEqual(self.presenter.get_data_cache_key('problem'), key)
+        self.assertEqual(course_summaries_mock.call_count, 2)
+
+        course_summaries_mock.return_value = [{'course_id': self.course_id, 'created': '2014-01-02T000000'}]
+        cache.delete(probe_key)
+        RequestCache.clear_all_namespaces()
+        self.presenter.check_data_freshness()
+        self.assertNotEqual(self.presenter.get_data_cache_key('problem'), key)
+        # Data derived from the course itself is kept.
+        self.assertEqual(self.presenter.get_cache_key('structure'), structure_key)
+
+    def test_structure_shared_between_presenters(self):
+        """ Verify presenters for the same course share one parsed course structure. """
+        with mock.patch('analytics_dashboard.core.utils.CourseStructureApiClient.get') as api_client_get_mock:
+            api_client_get_mock.return_value.json.return_value = self.factory.structure
+            index = self.presenter._get_structure_index()  # pylint: disable=protected-access
+            for presenter_class in [CoursePerformancePresenter, CourseEngagementVideoPresenter,
+                                    TagsDistributionPresenter]:
+                presenter = presenter_class(self.course_id, Client('base_url'))
+                self.assertIs(presenter._get_structure_index(), index)  # pylint: disable=protected-access
+            self.assertEqual(api_client_get_mock.call_count, 1)
+
+            # A new version of the structure replaces the shared one.
+            cache.clear()
+            self.assertIsNot(self.presenter._get_structure_index(), index)  # pylint: disable=protected-access
+
+    def test_structure_version_recached(self):
+        """ Verify the shared structure is found again once its expired version is cached again. """
+        with mock.patch('analytics_dashboard.core.utils.CourseStructureApiClient.get') as api_client_get_mock:
+            api_client_get_mock.return_value.json.return_value = self.factory.structure
+            self.presenter._get_structure_index()  # pylint: disable=protected-access
+
+            cache.delete(self.presenter.get_cache_key('structure_version'))
+            with mock.patch('analytics_dashboard.courses.presenters.CourseStructureIndex',
+                            wraps=CourseStructureIndex) as index_mock:
+                index = self.presenter._get_structure_index()  # pylint: disable=protected-access
+                self.assertIs(self.presenter._get_structure_index(), index)  # pylint: disable=protected-access
+                self.assertEqual(index_mock.call_count, 1)
+            self.assertEqual(api_client_get_mock.call_count, 1)
+
+    def test_sections_memoized_per_request(self):
+        """ Verify repeated lookups within a request return the same objects without going to the cache. """
+        ungraded_problems = self.factory.problems(False)
+        with mock.patch('analytics_dashboard.core.utils.CourseStructureApiClient.get') as api_client_get_mock:
+            api_client_get_mock.return_value.json.return_value = self.factory.structure
+            with mock.patch('analyticsclient.course.Course.problems', mock.Mock(return_value=ungraded_problems)):
+                section_id = self.factory.presented_sections[0]['id']
+                sections = self.presenter.sections()
+                section = self.presenter.section(section_id)
+
+                with mock.patch('analytics_dashboard.courses.presenters.get_cached') as cache_get_mock:
+                    self.assertIs(self.presenter.sections(), sections)
+                    self.assertIs(self.presenter.section(section_id), section)
+                    self.assertIs(self.presenter.subsections(section_id), section['children'])
+                    cache_get_mock.assert_not_called()
+
+                # A new request starts with an empty memo.
+                RequestCache.clear_all_namespaces()
+                self.assertIsNot(self.presenter.sections(), sections)
+                self.assertListEqual(self.presenter.sections(), sections)
+
 
 @ddt
 class TagsDistributionPresenterTests(TestCase):
 
     def setUp(self):
         cache.clear()
+        RequestCache.clear_all_namespaces()
         self.course_id = PERFORMER_PRESENTER_COURSE_ID
         self.presenter = TagsDistributionPresenter(self.course_id, Client('base_url'))
 
@@ -1202,6 +1445,7 @@ class CourseReportDownloadPresenterTests(TestCase):
 
     def setUp(self):
         cache.clear()
+        RequestCache.clear_all_namespaces()
         self.course_id = PERFORMER_PRESENTER_COURSE_ID
         self.presenter = CourseReportDownloadPresenter(self.course_id, Client('base_url'))
 
@@ -5,10 +5,13 @@ from urllib.parse import urljoin
 
 import httpretty
 from analyticsclient.exceptions import NotFoundError
+from asgiref.sync import async_to_sync
 from ddt import data, ddt, unpack
 from django.conf import settings
 from django.contrib.humanize.templatetags.humanize import intcomma
 from django.core.cache import cache
+from django.test import AsyncClient
+from django.test.utils import override_settings
 from django.urls import reverse
 from django.utils.translation import gettext_lazy as _
 from waffle.testutils import override_switch
@@ -407,6 +410,13 @@ class PatchMixin:
         self.clear_patches()
 
 
+class ASGITestClient(AsyncClient):
+    """ Test client serving its requests under ASGI, whose get() returns the response as Client.get() does. """
+
+    def get(self, *args, **kwargs):  # pylint: disable=invalid-overridden-method
+        return async_to_sync(super().get)(*args, **kwargs)
+
+
 class CourseStructureViewMixin(NavAssertMixin, ViewTestMixin):
 
     def assertValidContext(self, context):
@@ -433,6 +443,13 @@ class CourseStructureViewMixin(NavAssertMixin, ViewTestMixin):
         self.assertPrimaryNav(response.context['primary_nav_item'], course_id)
         self.assertSecondaryNavs(response.context['secondary_nav_items'], course_id)
 
+    def test_valid_course_asgi(self):
+        """ Served under ASGI, the view awaits its upstream data and returns the same page. """
+        client = ASGITestClient()
+        client.cookies = self.client.cookies
+        self.client = client
+        self.test_valid_course()
+
     def test_invalid_course(self):
         """
         The view will return HTTP 404 if the course is invalid.
@@ -452,7 +469,8 @@ class CourseStructureViewMixin(NavAssertMixin, ViewTestMixin):
         api_path = api_template.format(course_id=course_id)
         self.mock_course_api(api_path, status=404)
 
-        response = self.client.get(path, follow=True)
+        with self.serial_upstream_calls():
+            response = self.client.get(path, follow=True)
         self.assertEqual(response.status_code, 404)
 
     def _test_api_error(self):
@@ -463,4 +481,10 @@ class CourseStructureViewMixin(NavAssertMixin, ViewTestMixin):
         self.mock_course_detail(course_id)
 
         path = self.path(course_id=course_id)
-        self.assertRaises(Exception, self.client.get, path, follow=True)
+        with self.serial_upstream_calls():
+            self.assertRaises(Exception, self.client.get, path, follow=True)
+
+    def serial_upstream_calls(self):
+        # httpretty lets unmocked requests (e.g. to the data API) through by restoring the real socket module for
+        # all threads, so that concurrent upstream calls could miss their mocks.  They are made one at a time.
+        return override_settings(UPSTREAM_FAN_OUT_MAX_WORKERS=0)
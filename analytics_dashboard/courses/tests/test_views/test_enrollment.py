@@ -2,8 +2,12 @@ import json
 
 import unittest.mock as mock
 from ddt import ddt
-from django.test import TestCase
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from edx_django_utils.cache import RequestCache
 
+from analytics_dashboard.core.caching import get_course_cache_version
+from analytics_dashboard.core.utils import sanitize_cache_key
 from analytics_dashboard.courses.tests import utils
 from analytics_dashboard.courses.tests.test_views import (
     CourseEnrollmentDemographicsMixin,
@@ -49,6 +53,30 @@ class CourseEnrollmentActivityViewTests(CourseEnrollmentViewTestMixin, TestCase)
         self.assertIsNone(context['summary'])
         self.assertIsNone(context['js_data']['course']['enrollmentTrends'])
 
+    @override_settings(COURSE_DATA_FRESHNESS_PROBE_INTERVAL=300)
+    @mock.patch('analyticsclient.course_summaries.CourseSummaries.course_summaries')
+    def test_data_freshness_probe(self, course_summaries_mock):
+        """ Course pages invalidate the cached pipeline data of the course once the pipeline has new data. """
+        course_id = utils.CourseSamples.DEMO_COURSE_ID
+        course_summaries_mock.return_value = [{'course_id': course_id, 'created': '2014-01-01T000000'}]
+        version = get_course_cache_version(course_id)
+
+        with mock.patch(self.presenter_method, return_value=utils.get_mock_enrollment_summary_and_trend(course_id)):
+            self.assertEqual(self.client.get(self.path(course_id=course_id)).status_code, 200)
+            course_summaries_mock.assert_called_once_with(course_ids=[course_id], fields=['course_id', 'created'])
+            RequestCache.clear_all_namespaces()
+            data_version = get_course_cache_version(course_id, pipeline_data=True)
+
+            # The pipeline has run again since the last probe.
+            course_summaries_mock.return_value = [{'course_id': course_id, 'created': '2014-01-02T000000'}]
+            cache.delete(sanitize_cache_key(f'course_{course_id}_data_freshness_probe'))
+            self.assertEqual(self.client.get(self.path(course_id=course_id)).status_code, 200)
+
+        self.assertEqual(course_summaries_mock.call_count, 2)
+        RequestCache.clear_all_namespaces()
+        self.assertNotEqual(get_course_cache_version(course_id, pipeline_data=True), data_version)
+        self.assertEqual(get_course_cache_version(course_id), version)
+
 
 @ddt
 class CourseEnrollmentGeographyViewTests(CourseEnrollmentViewTestMixin, TestCase):
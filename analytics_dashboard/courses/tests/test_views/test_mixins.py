@@ -1,14 +1,29 @@
+import asyncio
 import unittest.mock as mock
+
+import requests
+from asgiref.sync import async_to_sync
 from django.conf import settings
+from django.core.cache import cache
+from django.http import Http404, JsonResponse
 from django.test import RequestFactory, TestCase
 from django.test.utils import override_settings
 
+from analytics_dashboard.core.caching import local_cache, set_cached
 from analytics_dashboard.courses.tests.utils import CourseSamples
-from analytics_dashboard.courses.views import CourseValidMixin, AnalyticsV0Mixin, AnalyticsV1Mixin
+from analytics_dashboard.courses.views import (
+    AsyncViewMixin,
+    CourseValidMixin,
+    AnalyticsV0Mixin,
+    AnalyticsV1Mixin,
+    TemplateView,
+)
 
 
 class CourseValidMixinTests(TestCase):
     def setUp(self):
+        cache.clear()
+        local_cache.clear()
         self.mixin = CourseValidMixin()
         self.mixin.course_id = CourseSamples.DEPRECATED_DEMO_COURSE_ID
 
@@ -17,13 +32,47 @@ class CourseValidMixinTests(TestCase):
         self.assertTrue(self.mixin.is_valid_course())
 
     @override_settings(LMS_COURSE_VALIDATION_BASE_URL='a/url')
-    @mock.patch('courses.views.requests.get')
-    def test_valid_url(self, mock_lms_request):
+    @mock.patch('analytics_dashboard.courses.views.get_lms_session')
+    def test_valid_url(self, mock_lms_session):
+        mock_lms_request = mock_lms_session.return_value.get
         mock_lms_request.return_value.status_code = 404
         self.assertFalse(self.mixin.is_valid_course())
 
+        cache.clear()
+        local_cache.clear()
         mock_lms_request.return_value.status_code = 200
         self.assertTrue(self.mixin.is_valid_course())
+        mock_lms_request.assert_called_with(
+            f'a/url/{CourseSamples.DEPRECATED_DEMO_COURSE_ID}/info', timeout=settings.LMS_DEFAULT_TIMEOUT)
+
+    @override_settings(LMS_COURSE_VALIDATION_BASE_URL='a/url', COURSE_VALIDATION_CACHE_TIMEOUT=3600,
+                       COURSE_VALIDATION_NEGATIVE_CACHE_TIMEOUT=60, CACHE_TIMEOUT_JITTER=0)
+    @mock.patch('analytics_dashboard.courses.views.set_cached', wraps=set_cached)
+    @mock.patch('analytics_dashboard.courses.views.get_lms_session')
+    def test_cached(self, mock_lms_session, set_cached_mock):
+        mock_lms_request = mock_lms_session.return_value.get
+        for status_code, is_valid, timeout in ((200, True, 3600), (404, False, 60)):
+            cache.clear()
+            local_cache.clear()
+            mock_lms_request.reset_mock()
+            mock_lms_request.return_value.status_code = status_code
+            self.assertEqual(self.mixin.is_valid_course(), is_valid)
+            self.assertEqual(self.mixin.is_valid_course(), is_valid)
+            mock_lms_request.assert_called_once()
+            self.assertEqual(set_cached_mock.call_args[0][1:], (is_valid, timeout))
+
+    @override_settings(LMS_COURSE_VALIDATION_BASE_URL='a/url')
+    @mock.patch('analytics_dashboard.courses.views.get_lms_session')
+    def test_errors_not_cached(self, mock_lms_session):
+        mock_lms_request = mock_lms_session.return_value.get
+        mock_lms_request.side_effect = requests.exceptions.Timeout
+        self.assertTrue(self.mixin.is_valid_course())
+
+        mock_lms_request.side_effect = None
+        mock_lms_request.return_value.status_code = 503
+        self.assertFalse(self.mixin.is_valid_course())
+        self.assertFalse(self.mixin.is_valid_course())
+        self.assertEqual(mock_lms_request.call_count, 3)
 
 
 class AnalyticsV0MixinTests(TestCase):
@@ -77,3 +126,72 @@ class AnalyticsV1MixinTests(TestCase):
         r = self.req.get('whatever?v=1')
         self.mixin.setup(r)
         self.assertEqual(self.mixin.analytics_client.base_url, settings.DATA_API_URL_V1)
+
+
+class UpstreamDataView(AsyncViewMixin, TemplateView):
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.dispatch_count = 0
+        self.calls = {'summary': mock.Mock(return_value={'learners': 10}),
+                      'missing': mock.Mock(side_effect=ValueError('upstream unavailable'))}
+
+    def dispatch(self, request, *args, **kwargs):
+        self.dispatch_count += 1
+        return super().dispatch(request, *args, **kwargs)
+
+    def get_upstream_calls(self):
+        return self.calls
+
+    def get_context_data(self, **kwargs):
+        try:
+            self.get_upstream_data('missing')
+            missing = None
+        except ValueError as e:
+            missing = str(e)
+        return {'summary': self.get_upstream_data('summary'), 'missing': missing}
+
+    def render_to_response(self, context, **response_kwargs):
+        response = JsonResponse(context)
+        response.view = self
+        return response
+
+
+class AsyncViewMixinTests(TestCase):
+    def setUp(self):
+        self.request = RequestFactory().get('/')
+
+    def assertResponseValid(self, response):
+        self.assertJSONEqual(response.content, {'summary': {'learners': 10}, 'missing': 'upstream unavailable'})
+        for call in response.view.calls.values():
+            call.assert_called_once_with()
+
+    def test_async(self):
+        view = UpstreamDataView.as_async_view()
+        self.assertTrue(asyncio.iscoroutinefunction(view))
+        self.assertIs(view.view_class, UpstreamDataView)
+
+        response = async_to_sync(view)(self.request)
+        self.assertResponseValid(response)
+        self.assertEqual(response.view.dispatch_count, 1)
+
+    def test_sync(self):
+        view = UpstreamDataView.as_view()
+        self.assertFalse(asyncio.iscoroutinefunction(view))
+
+        response = view(self.request)
+        self.assertResponseValid(response)
+        self.assertEqual(response.view.dispatch_count, 1)
+
+    def test_no_upstream_calls(self):
+        with mock.patch.object(UpstreamDataView, 'get_upstream_calls', return_value={}), \
+                mock.patch.object(UpstreamDataView, 'get_context_data', return_value={}):
+            response = async_to_sync(UpstreamDataView.as_async_view())(self.request)
+        self.assertEqual(response.view.dispatch_count, 1)
+
+    def test_handle_exception(self):
+        with mock.patch.object(UpstreamDataView, 'get_context_data', side_effect=ValueError), \
+                mock.patch.object(UpstreamDataView, 'handle_exception', side_effect=Http404) as handle_exception:
+            with self.assertRaises(Http404):
+                async_to_sync(UpstreamDataView.as_async_view())(self.request)
+        handle_exception.assert_called_once()
+        self.assertIsInstance(handle_exception.call_args[0][0], ValueError)
@@ -6,15 +6,15 @@ from datetime import datetime
 from urllib.parse import urljoin
 
 import requests
-from analyticsclient.client import Client
 from analyticsclient.exceptions import ClientError, NotFoundError
+from asgiref.sync import sync_to_async
 from braces.views import LoginRequiredMixin
 from django.conf import settings
-from django.core.cache import cache
 from django.core.exceptions import PermissionDenied
 from django.http import Http404
 from django.urls import reverse
 from django.utils import dateformat
+from django.utils.decorators import classonlymethod
 from django.utils.functional import cached_property
 from django.utils.translation import gettext_lazy as _
 from django.utils.translation import gettext_noop
@@ -25,13 +25,19 @@ from requests.exceptions import RequestException
 from opaque_keys.edx.keys import CourseKey
 from waffle import switch_is_active
 
+from analytics_dashboard.core.caching import course_cache_key, get_cached, set_cached
+from analytics_dashboard.core.concurrency import fan_out, fan_out_async
 from analytics_dashboard.core.exceptions import ServiceUnavailableError
 from analytics_dashboard.core.utils import (
     CourseStructureApiClient,
+    get_analytics_client,
+    get_lms_session,
+    get_oauth_client,
     sanitize_cache_key,
     translate_dict_values,
 )
 from analytics_dashboard.courses import permissions
+from analytics_dashboard.courses.presenters import CoursePresenter
 from analytics_dashboard.courses.presenters.performance import CourseReportDownloadPresenter
 from analytics_dashboard.courses.serializers import LazyEncoder
 from analytics_dashboard.courses.utils import get_page_name, is_feature_enabled
@@ -60,16 +66,12 @@ class CourseAPIMixin:
         self.course_api_enabled = switch_is_active('enable_course_api')
 
         if self.course_api_enabled and request.user.is_authenticated:
-            self.course_api = CourseStructureApiClient(
-                settings.BACKEND_SERVICE_EDX_OAUTH2_PROVIDER_URL,
-                settings.BACKEND_SERVICE_EDX_OAUTH2_KEY,
-                settings.BACKEND_SERVICE_EDX_OAUTH2_SECRET,
-            )
+            self.course_api = get_oauth_client()
 
         return super().dispatch(request, *args, **kwargs)
 
     def _course_detail_cache_key(self, course_id):
-        return sanitize_cache_key(f'course_{course_id}_details')
+        return course_cache_key(course_id, 'details')
 
     def get_course_info(self, course_id):
         """
@@ -81,7 +83,7 @@ class CourseAPIMixin:
             course_id       -- ID of the course for which data should be retrieved
         """
         key = self._course_detail_cache_key(course_id)
-        info = cache.get(key)
+        info = get_cached(key, family='course_details')
 
         if not info:
             try:
@@ -89,7 +91,7 @@ class CourseAPIMixin:
                 info = self.course_api.get(
                     urljoin(settings.COURSE_API_URL + '/', f'courses/{course_id}')
                 ).json()
-                cache.set(key, info)
+                set_cached(key, info, family='course_details')
             except HTTPError as e:
                 logger.error("Unable to retrieve course info for %s: %s", course_id, e)
                 info = {}
@@ -99,7 +101,7 @@ class CourseAPIMixin:
     def get_courses(self):
         # Check the cache for the user's courses
         key = sanitize_cache_key(f'user_{self.request.user.pk}_courses')
-        courses = cache.get(key)
+        courses = get_cached(key, family='user_courses')
 
         # If no cached courses, iterate over the data from the course API.
         if not courses:
@@ -122,7 +124,7 @@ class CourseAPIMixin:
                     for course in course_details:
                         course_id = course['id']
                         _key = self._course_detail_cache_key(course_id)
-                        cache.set(_key, course)
+                        set_cached(_key, course, family='course_details')
 
                     courses += course_details
 
@@ -136,7 +138,7 @@ class CourseAPIMixin:
                     page = None
                     break
 
-        cache.set(key, courses)
+        set_cached(key, courses, family='user_courses')
         return courses
 
 
@@ -232,6 +234,9 @@ class CourseContextMixin(CourseAPIMixin, TrackedViewMixin, LazyEncoderMixin):
 class CourseValidMixin:
     """
     Mixin that checks the validity of a course ID against the LMS.
+
+    Answers of the LMS are cached (see settings.COURSE_VALIDATION_CACHE_TIMEOUT), so that the LMS is asked once
+    per course rather than on every page view.
     """
 
     course_id = None
@@ -240,16 +245,26 @@ class CourseValidMixin:
 
         if settings.LMS_COURSE_VALIDATION_BASE_URL:
             uri = f'{settings.LMS_COURSE_VALIDATION_BASE_URL}/{self.course_id}/info'
+            key = sanitize_cache_key(f'course_validation_{uri}')
+            is_valid = get_cached(key, family='course_validation')
+            if is_valid is not None:
+                return is_valid
 
             try:
-                response = requests.get(uri, timeout=settings.LMS_DEFAULT_TIMEOUT)
+                response = get_lms_session().get(uri, timeout=settings.LMS_DEFAULT_TIMEOUT)
             except requests.exceptions.Timeout:
                 logger.error('Course validation timed out: %s', uri)
                 # consider the course valid if the LMS times out
                 return True
 
             # pylint: disable=no-member
-            return response.status_code == requests.codes.ok
+            is_valid = response.status_code == requests.codes.ok
+            # other errors of the LMS are not cached, as they say nothing of the course
+            if is_valid:
+                set_cached(key, True, settings.COURSE_VALIDATION_CACHE_TIMEOUT, family='course_validation')
+            elif response.status_code == requests.codes.not_found:
+                set_cached(key, False, settings.COURSE_VALIDATION_NEGATIVE_CACHE_TIMEOUT, family='course_validation')
+            return is_valid
         # all courses valid if LMS url isn't specified
         return True
 
@@ -274,6 +289,19 @@ class CoursePermissionMixin:
         return super().dispatch(request, *args, **kwargs)
 
 
+class CourseDataFreshnessMixin:
+    """
+    Invalidates the cached pipeline data of the course, once access to the page is granted and before the page
+    reads the data, if the data pipeline has produced new data for the course since it was cached.
+    """
+    analytics_client = None
+    course_id = None
+
+    def dispatch(self, request, *args, **kwargs):
+        CoursePresenter(self.course_id, self.analytics_client).check_data_freshness()
+        return super().dispatch(request, *args, **kwargs)
+
+
 class CourseNavBarMixin:
     """
     Mixin to add navbar items to context.
@@ -426,9 +454,7 @@ class AnalyticsV0Mixin(View):
         super().setup(request, *args, **kwargs)
         api_version = request.GET.get('v', '0')
         analytics_base_url = settings.DATA_API_URL_V1 if api_version == '1' else settings.DATA_API_URL
-        self.analytics_client = Client(base_url=analytics_base_url,
-                                       auth_token=settings.DATA_API_AUTH_TOKEN,
-                                       timeout=settings.ANALYTICS_API_DEFAULT_TIMEOUT)
+        self.analytics_client = get_analytics_client(analytics_base_url)
 
 
 class AnalyticsV1Mixin(View):
@@ -447,12 +473,119 @@ class AnalyticsV1Mixin(View):
 
         api_version = request.GET.get('v', v_default)
         analytics_base_url = settings.DATA_API_URL_V1 if api_version == '1' else settings.DATA_API_URL
-        self.analytics_client = Client(base_url=analytics_base_url,
-                                       auth_token=settings.DATA_API_AUTH_TOKEN,
-                                       timeout=settings.ANALYTICS_API_DEFAULT_TIMEOUT)
+        self.analytics_client = get_analytics_client(analytics_base_url)
+
+
+class UpstreamDataMixin:
+    """
+    Fetches the upstream data of a page (e.g. from the data API or course API) with concurrent calls, once access
+    to the page is granted and before the page is built.
+
+    Views return the calls fetching their data from get_upstream_calls(), and read the results with
+    get_upstream_data(), or hand them to their presenters in use_upstream_data().  The calls are made (see
+    fan_out()) by GET requests, unless awaited by the asynchronous view (see AsyncViewMixin).
+    """
+    upstream_calls = None
+    upstream_data = None
+    # Set by the asynchronous view, whose GET handler returns None once the upstream calls are known, for the
+    # asynchronous view to await them.
+    awaiting_upstream_data = False
+
+    def get(self, request, *args, **kwargs):
+        if self.upstream_data is None:
+            self.upstream_calls = self.get_upstream_calls()
+            if self.awaiting_upstream_data and self.upstream_calls:
+                return None
+            self.set_upstream_data(fan_out(*self.upstream_calls.values(), return_exceptions=True))
+        self.use_upstream_data()
+        return super().get(request, *args, **kwargs)
+
+    def get_upstream_calls(self):
+        """
+        Returns a dictionary of the calls fetching the upstream data of the page, keyed by name.
+
+        This is called once access to the page is granted, and the calls made before the page is built, so views
+        may create the presenters making the calls here.
+        """
+        return {}
+
+    def set_upstream_data(self, results):
+        """ Sets the results of the upstream calls, in the order of get_upstream_calls(). """
+        self.upstream_data = dict(zip(self.upstream_calls, results))
+
+    def get_upstream_data(self, name):
+        """ Returns the result of the named upstream call of the page, or raises its exception. """
+        data = self.upstream_data[name]
+        if isinstance(data, Exception):
+            raise data
+        return data
+
+    def get_upstream_results(self, *names):
+        """
+        Returns the results of the named upstream calls of the page, keyed by name, with the exceptions raised by
+        calls in place of their results.  Names of calls the page did not make are left out.
+        """
+        return {name: self.upstream_data[name] for name in names if name in self.upstream_data}
+
+    def use_upstream_data(self):
+        """
+        Hands the upstream data of the page to the presenters reading it (see
+        CourseAPIPresenterMixin.use_prefetched_data()), once fetched, so that they do not make the calls again.
+        """
+
+    def handle_exception(self, exception):
+        """
+        Translates an exception raised while the page is built (e.g. into Http404) by raising another, or returns
+        to let it propagate.  Called by dispatch(), and by the asynchronous view for the part of the page built
+        after its upstream calls.
+        """
 
 
-class CourseView(LoginRequiredMixin, CourseValidMixin, CoursePermissionMixin, TemplateView):
+class AsyncViewMixin(UpstreamDataMixin):
+    """
+    Serves the view asynchronously from the URLs of the site served under ASGI (see analytics_dashboard.asgi_urls),
+    so that the worker is not held while the upstream data of the page is fetched.
+
+    The view is dispatched once, in a thread, up to the upstream calls of the page.  The calls are then awaited
+    (see fan_out_async()), and the page built in the same thread.  The calls themselves are blocking, and are made
+    in the upstream thread pool, so that at most settings.UPSTREAM_FAN_OUT_MAX_WORKERS calls of the process are in
+    flight at once.  Under WSGI, as_view() serves the view synchronously, as any other view.
+    """
+
+    @classonlymethod
+    def as_async_view(cls, **initkwargs):
+        """ Returns the asynchronous view, the counterpart of as_view(). """
+        view = cls.as_view(**initkwargs)
+
+        async def async_view(request, *args, **kwargs):
+            self = cls(**initkwargs)
+            self.setup(request, *args, **kwargs)
+            return await self.dispatch_async(request, *args, **kwargs)
+
+        async_view.__doc__ = view.__doc__
+        async_view.__module__ = view.__module__
+        async_view.__dict__.update(view.__dict__)
+        return async_view
+
+    async def dispatch_async(self, request, *args, **kwargs):
+        self.awaiting_upstream_data = True
+        response = await sync_to_async(self.dispatch)(request, *args, **kwargs)
+        if response is not None:
+            return response
+
+        self.set_upstream_data(await fan_out_async(*self.upstream_calls.values(), return_exceptions=True))
+        return await sync_to_async(self._get_with_upstream_data)(request, *args, **kwargs)
+
+    def _get_with_upstream_data(self, request, *args, **kwargs):
+        try:
+            return self.get(request, *args, **kwargs)
+        except Exception as e:  # pylint: disable=broad-except
+            self.handle_exception(e)
+            raise
+
+
+class CourseView(LoginRequiredMixin, CourseValidMixin, CoursePermissionMixin, CourseDataFreshnessMixin,
+                 UpstreamDataMixin, TemplateView):
     """
     Base course view.
 
@@ -469,17 +602,22 @@ class CourseView(LoginRequiredMixin, CourseValidMixin, CoursePermissionMixin, Te
         self.course_id = request.course_id
         self.course_key = request.course_key
 
-        # some views will catch the NotFoundError to set data to a state that
-        # the template can rendering a loading error message for the section
         try:
             return super().dispatch(request, *args, **kwargs)
-        except NotFoundError as e:
-            logger.error('The requested data from the Analytics Data API was not found: %s', e)
-            raise Http404 from e
-        except ClientError as e:
-            logger.error('An error occurred while retrieving data from the Analytics Data API: %s', e)
+        except Exception as e:  # pylint: disable=broad-except
+            self.handle_exception(e)
             raise
 
+    def handle_exception(self, exception):
+        # some views will catch the NotFoundError to set data to a state that
+        # the template can rendering a loading error message for the section
+        if isinstance(exception, NotFoundError):
+            logger.error('The requested data from the Analytics Data API was not found: %s', exception)
+            raise Http404 from exception
+        if isinstance(exception, ClientError):
+            logger.error('An error occurred while retrieving data from the Analytics Data API: %s', exception)
+        super().handle_exception(exception)
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         self.course = self.analytics_client.courses(self.course_id)
@@ -498,7 +636,8 @@ class LastUpdatedView:
                 'update_time': dateformat.format(d, settings.TIME_FORMAT)}
 
 
-class CourseTemplateView(LastUpdatedView, ContextSensitiveHelpMixin, CourseContextMixin, CourseView):
+class CourseTemplateView(AsyncViewMixin, LastUpdatedView, ContextSensitiveHelpMixin, CourseContextMixin,
+                         CourseView):
     update_message = None
 
     @property
@@ -524,6 +663,16 @@ class CourseHome(AnalyticsV0Mixin, CourseTemplateWithNavView):
     }
     page_title = _('Course Home')
 
+    @cached_property
+    def problem_response_report_info(self):
+        """ Returns the download information of the problem response report of the course, if it exists. """
+        try:
+            return CourseReportDownloadPresenter(self.course_id, self.analytics_client).get_report_info(
+                report_name=CourseReportDownloadPresenter.PROBLEM_RESPONSES
+            )
+        except NotFoundError:
+            return {}
+
     def get_table_items(self):
         items = []
 
@@ -656,13 +805,7 @@ class CourseHome(AnalyticsV0Mixin, CourseTemplateWithNavView):
                 })
 
             if switch_is_active('enable_problem_response_download'):
-                try:
-                    info = CourseReportDownloadPresenter(self.course_id, self.analytics_client).get_report_info(
-                        report_name=CourseReportDownloadPresenter.PROBLEM_RESPONSES
-                    )
-                except NotFoundError:
-                    info = {}
-                if 'download_url' in info:
+                if 'download_url' in self.problem_response_report_info:
                     # A problem response report CSV is available:
                     subitems.append({
                         'title': gettext_noop('How are learners responding to questions?'),
@@ -684,6 +827,15 @@ class CourseHome(AnalyticsV0Mixin, CourseTemplateWithNavView):
 
         return items
 
+    def get_upstream_calls(self):
+        # The calls set the cached properties read by the page.
+        calls = {}
+        if self.course_api_enabled:
+            calls['course_info'] = lambda: self.course_info
+            if switch_is_active('enable_problem_response_download'):
+                calls['problem_response_report_info'] = lambda: self.problem_response_report_info
+        return calls
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context.update({
@@ -760,22 +912,20 @@ class CourseStructureExceptionMixin:
     CourseAPIMixin.
     """
 
-    def dispatch(self, request, *args, **kwargs):
-        try:
-            return super().dispatch(request, *args, **kwargs)
-        except RequestException as e:
+    def handle_exception(self, exception):
+        if isinstance(exception, RequestException):
             # Return the appropriate response if a 404 occurred.
-            response = getattr(e, 'response')
+            response = getattr(exception, 'response')
             if response is not None:
                 if response.status_code == 404:
-                    logger.info('Course API data not found for %s: %s', self.course_id, e)
-                    raise Http404 from e
+                    logger.info('Course API data not found for %s: %s', self.course_id, exception)
+                    raise Http404 from exception
                 if response.status_code == 503:
-                    raise ServiceUnavailableError from e
+                    raise ServiceUnavailableError from exception
 
             # Not a 404. Continue raising the error.
-            logger.error('An error occurred while using Slumber to communicate with an API: %s', e)
-            raise
+            logger.error('An error occurred while using Slumber to communicate with an API: %s', exception)
+        super().handle_exception(exception)
 
 
 class CourseStructureMixin:
@@ -1,3 +1,4 @@
+import copy
 import logging
 
 from braces.views import LoginRequiredMixin
@@ -13,6 +14,7 @@ from analytics_dashboard.courses import permissions
 from analytics_dashboard.courses.presenters.course_summaries import CourseSummariesPresenter
 from analytics_dashboard.courses.presenters.programs import ProgramsPresenter
 from analytics_dashboard.courses.views import (
+    AsyncViewMixin,
     CourseAPIMixin,
     LastUpdatedView,
     LazyEncoderMixin,
@@ -25,8 +27,8 @@ from analytics_dashboard.courses.views.csv import DatetimeCSVResponseMixin
 logger = logging.getLogger(__name__)
 
 
-class CourseIndex(AnalyticsV1Mixin, CourseAPIMixin, LoginRequiredMixin, TrackedViewMixin, LastUpdatedView,
-                  LazyEncoderMixin, TemplateView):
+class CourseIndex(AsyncViewMixin, AnalyticsV1Mixin, CourseAPIMixin, LoginRequiredMixin, TrackedViewMixin,
+                  LastUpdatedView, LazyEncoderMixin, TemplateView):
     template_name = 'courses/index.html'
     page_title = _('Courses')
     page_name = {
@@ -37,17 +39,28 @@ class CourseIndex(AnalyticsV1Mixin, CourseAPIMixin, LoginRequiredMixin, TrackedV
     }
     # Translators: Do not translate UTC.
     update_message = _('Course summary data was last updated %(update_date)s at %(update_time)s UTC.')
+    courses = None
 
-    def get_context_data(self, **kwargs):
-        context = super().get_context_data(**kwargs)
+    def get_upstream_calls(self):
         user = self.request.user
-        courses = permissions.get_user_course_permissions(user)
-        if not courses and not (user.is_superuser or user.is_staff):
+        self.courses = permissions.get_user_course_permissions(user)
+        if not self.courses and not (user.is_superuser or user.is_staff):
             # The user is probably not a course administrator and should not be using this application.
             raise PermissionDenied
 
         summaries_presenter = CourseSummariesPresenter(analytics_client=self.analytics_client)
-        summaries, last_updated = summaries_presenter.get_course_summaries(courses)
+        summaries_presenter.include_passing_users = switch_is_active('enable_course_passing')
+        calls = {
+            'summaries': lambda: summaries_presenter.get_course_summaries(self.courses),
+        }
+        if switch_is_active('enable_course_filters'):
+            calls['programs'] = lambda: ProgramsPresenter(
+                analytics_client=self.analytics_client).get_programs(course_ids=self.courses)
+        return calls
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        summaries, last_updated = self.get_upstream_data('summaries')
 
         context.update({
             'update_message': self.get_last_updated_message(last_updated)
@@ -62,13 +75,12 @@ class CourseIndex(AnalyticsV1Mixin, CourseAPIMixin, LoginRequiredMixin, TrackedV
         }
 
         if enable_course_filters:
-            programs_presenter = ProgramsPresenter(analytics_client=self.analytics_client)
-            programs = programs_presenter.get_programs(course_ids=courses)
-            data['programs_json'] = programs
+            data['programs_json'] = self.get_upstream_data('programs')
 
         context['js_data']['course'] = data
         context['page_data'] = self.get_page_data(context)
-        context['summary'] = summaries_presenter.get_course_summary_metrics(summaries)
+        context['summary'] = CourseSummariesPresenter(
+            analytics_client=self.analytics_client).get_course_summary_metrics(summaries)
 
         return context
 
@@ -107,8 +119,9 @@ class CourseIndexCSV(AnalyticsV1Mixin, CourseAPIMixin, LoginRequiredMixin, Datet
             # Instead of returning a useless blank CSV, return a 404 error
             raise Http404
 
-        # Exclude specified fields from each summary entry
-        summaries = [remove_keys(summary, self.exclude_fields) for summary in summaries]
+        # Exclude specified fields from each summary entry.  Summaries are copied first as they may be shared with
+        # other requests through the process-local cache.
+        summaries = [remove_keys(copy.deepcopy(summary), self.exclude_fields) for summary in summaries]
 
         if enable_course_filters:
             # Add list of associated program IDs to each summary entry
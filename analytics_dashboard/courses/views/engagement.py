@@ -67,15 +67,19 @@ class EngagementContentView(AnalyticsV1Mixin, EngagementTemplateView):
     # Translators: Do not translate UTC.
     update_message = _('Course engagement data was last updated %(update_date)s at %(update_time)s UTC.')
 
+    def get_upstream_calls(self):
+        self.presenter = CourseEngagementActivityPresenter(self.course_id, self.analytics_client)
+        self.presenter.show_forum_activity = switch_is_active('show_engagement_forum_activity')
+        return {'summary_and_trends': self.presenter.get_summary_and_trend_data}
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        self.presenter = CourseEngagementActivityPresenter(self.course_id, self.analytics_client)
 
         summary = None
         trends = None
         last_updated = None
         try:
-            summary, trends = self.presenter.get_summary_and_trend_data()
+            summary, trends = self.get_upstream_data('summary_and_trends')
             last_updated = summary['last_updated']
         except NotFoundError:
             logger.error("Failed to retrieve engagement content data for %s.", self.course_id)
@@ -100,8 +104,14 @@ class EngagementVideoContentTemplateView(AnalyticsV1Mixin, CourseStructureMixin,
     update_message = _('Video data was last updated %(update_date)s at %(update_time)s UTC.')
     no_data_message = _('Looks like no one has watched any videos in these sections.')
 
-    def get_context_data(self, **kwargs):
+    def get_upstream_calls(self):
         self.presenter = CourseEngagementVideoPresenter(self.course_id, self.analytics_client)
+        return self.presenter.get_prefetch_calls()
+
+    def use_upstream_data(self):
+        self.presenter.use_prefetched_data(self.get_upstream_results('structure', 'module_data'))
+
+    def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context.update({
             'sections': self.presenter.sections(),
@@ -143,16 +143,18 @@ class EnrollmentActivityView(AnalyticsV1Mixin, EnrollmentTemplateView):
     # Translators: Do not translate UTC.
     update_message = _('Enrollment activity data was last updated %(update_date)s at %(update_time)s UTC.')
 
+    def get_upstream_calls(self):
+        presenter = CourseEnrollmentPresenter(self.course_id, self.analytics_client)
+        return {'summary_and_trend': presenter.get_summary_and_trend_data}
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
 
-        presenter = CourseEnrollmentPresenter(self.course_id, self.analytics_client)
-
         summary = None
         trend = None
         last_updated = None
         try:
-            summary, trend = presenter.get_summary_and_trend_data()
+            summary, trend = self.get_upstream_data('summary_and_trend')
             last_updated = summary['last_updated']
         except NotFoundError:
             logger.error("Failed to retrieve enrollment activity data for %s.", self.course_id)
@@ -180,16 +182,19 @@ class EnrollmentDemographicsAgeView(AnalyticsV0Mixin, EnrollmentDemographicsTemp
     }
     active_tertiary_nav_item = 'age'
 
+    def get_upstream_calls(self):
+        presenter = CourseEnrollmentDemographicsPresenter(self.course_id, self.analytics_client)
+        return {'ages': presenter.get_ages}
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        presenter = CourseEnrollmentDemographicsPresenter(self.course_id, self.analytics_client)
         binned_ages = None
         summary = None
         known_enrollment_percent = None
         last_updated = None
 
         try:
-            last_updated, summary, binned_ages, known_enrollment_percent = presenter.get_ages()
+            last_updated, summary, binned_ages, known_enrollment_percent = self.get_upstream_data('ages')
         except NotFoundError:
             logger.error("Failed to retrieve enrollment demographic age data for %s.", self.course_id)
 
@@ -218,16 +223,19 @@ class EnrollmentDemographicsEducationView(AnalyticsV1Mixin, EnrollmentDemographi
     }
     active_tertiary_nav_item = 'education'
 
+    def get_upstream_calls(self):
+        presenter = CourseEnrollmentDemographicsPresenter(self.course_id, self.analytics_client)
+        return {'education': presenter.get_education}
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        presenter = CourseEnrollmentDemographicsPresenter(self.course_id, self.analytics_client)
         binned_education = None
         summary = None
         known_enrollment_percent = None
         last_updated = None
 
         try:
-            last_updated, summary, binned_education, known_enrollment_percent = presenter.get_education()
+            last_updated, summary, binned_education, known_enrollment_percent = self.get_upstream_data('education')
         except NotFoundError:
             logger.error("Failed to retrieve enrollment demographic education data for %s.", self.course_id)
 
@@ -256,16 +264,19 @@ class EnrollmentDemographicsGenderView(AnalyticsV1Mixin, EnrollmentDemographicsT
     }
     active_tertiary_nav_item = 'gender'
 
+    def get_upstream_calls(self):
+        presenter = CourseEnrollmentDemographicsPresenter(self.course_id, self.analytics_client)
+        return {'gender': presenter.get_gender}
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        presenter = CourseEnrollmentDemographicsPresenter(self.course_id, self.analytics_client)
         gender_data = None
         trend = None
         known_enrollment_percent = None
         last_updated = None
 
         try:
-            last_updated, gender_data, trend, known_enrollment_percent = presenter.get_gender()
+            last_updated, gender_data, trend, known_enrollment_percent = self.get_upstream_data('gender')
         except NotFoundError:
             logger.error("Failed to retrieve enrollment demographic gender data for %s.", self.course_id)
 
@@ -297,15 +308,17 @@ class EnrollmentGeographyView(AnalyticsV1Mixin, EnrollmentTemplateView):
     # Translators: Do not translate UTC.
     update_message = _('Geographic learner data was last updated %(update_date)s at %(update_time)s UTC.')
 
+    def get_upstream_calls(self):
+        presenter = CourseEnrollmentPresenter(self.course_id, self.analytics_client)
+        return {'geography': presenter.get_geography_data}
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
 
-        presenter = CourseEnrollmentPresenter(self.course_id, self.analytics_client)
-
         data = None
         last_updated = None
         try:
-            summary, data = presenter.get_geography_data()
+            summary, data = self.get_upstream_data('geography')
             last_updated = summary['last_updated']
 
             # Add summary data (e.g. num countries, top 3 countries) directly to the context
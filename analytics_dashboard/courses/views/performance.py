@@ -77,7 +77,6 @@ class PerformanceTemplateView(AnalyticsV1Mixin, CourseStructureExceptionMixin, C
                 translate_dict_values(self.secondary_nav_items, ('text',))
 
         context_data = super().get_context_data(**kwargs)
-        self.presenter = CoursePerformancePresenter(self.course_id, self.analytics_client)
 
         context_data['no_data_message'] = self.no_data_message
         context_data['js_data']['course'].update({
@@ -86,6 +85,20 @@ class PerformanceTemplateView(AnalyticsV1Mixin, CourseStructureExceptionMixin, C
 
         return context_data
 
+    def get_upstream_calls(self):
+        self.presenter = CoursePerformancePresenter(self.course_id, self.analytics_client)
+        return self.get_prefetch_calls()
+
+    def get_prefetch_calls(self):
+        """
+        Returns the calls fetching, and caching, the data read by the page through its presenters.  Errors are
+        left for the presenter methods reading the data to raise.
+        """
+        return self.presenter.get_prefetch_calls()
+
+    def use_upstream_data(self):
+        self.presenter.use_prefetched_data(self.get_upstream_results('structure', 'module_data', 'grading_policy'))
+
 
 class PerformanceUngradedContentTemplateView(CourseStructureMixin, PerformanceTemplateView):
     page_title = _('Ungraded Problems')
@@ -114,6 +127,12 @@ class PerformanceGradedContentTemplateView(PerformanceTemplateView):
         self.assignment_id = kwargs.get('assignment_id')
         return super().dispatch(request, *args, **kwargs)
 
+    def get_prefetch_calls(self):
+        calls = {'grading_policy': self.presenter.grading_policy}
+        if self.assignment_type or self.assignment_id:
+            calls.update(self.presenter.get_assignments_prefetch_calls())
+        return calls
+
     def _deslugify_assignment_type(self):
         """
         Assignment type is slugified in the templates to avoid issues with our URL regex failing to match unknown
@@ -377,11 +396,14 @@ class PerformanceLearningOutcomesMixin(PerformanceTemplateView):
     update_message = _('Tags distribution data was last updated %(update_date)s at %(update_time)s UTC.')
     no_data_message = _('No submissions received for these exercises.')
 
+    def get_upstream_calls(self):
+        self.tags_presenter = TagsDistributionPresenter(self.course_id, self.analytics_client)
+        return super().get_upstream_calls()
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
 
         self.selected_tag_value = kwargs.get('tag_value', None)
-        self.tags_presenter = TagsDistributionPresenter(self.course_id, self.analytics_client)
 
         first_level_content_nav, first_selected_item = self.tags_presenter.get_tags_content_nav(
             'learning_outcome', self.selected_tag_value)
@@ -394,6 +416,12 @@ class PerformanceLearningOutcomesMixin(PerformanceTemplateView):
         }
         return context
 
+    def get_prefetch_calls(self):
+        return self.tags_presenter.get_prefetch_calls()
+
+    def use_upstream_data(self):
+        self.tags_presenter.use_prefetched_data(self.get_upstream_results('structure', 'module_data'))
+
 
 class PerformanceLearningOutcomesContent(PerformanceLearningOutcomesMixin):
     template_name = 'courses/performance_learning_outcomes_content.html'
@@ -176,6 +176,8 @@ MIDDLEWARE = [
     'edx_django_utils.monitoring.CookieMonitoringMiddleware',
     'edx_django_utils.monitoring.DeploymentMonitoringMiddleware',
     'edx_django_utils.cache.middleware.RequestCacheMiddleware',
+    'core.middleware.UpstreamDeadlineMiddleware',
+    'core.middleware.AsyncViewURLConfMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.locale.LocaleMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -200,6 +202,10 @@ MIDDLEWARE = [
 ########## URL CONFIGURATION
 # See: https://docs.djangoproject.com/en/dev/ref/settings/#root-urlconf
 ROOT_URLCONF = '%s.urls' % SITE_NAME
+
+# URLs of the requests served under ASGI, whose course pages await their upstream data asynchronously (see
+# core.middleware.AsyncViewURLConfMiddleware)
+ASGI_URLCONF = '%s.asgi_urls' % SITE_NAME
 ########## END URL CONFIGURATION
 
 
@@ -323,6 +329,8 @@ DATA_API_URL = 'http://127.0.0.1:9001/api/v0'
 DATA_API_V1_ENABLED = False
 DATA_API_URL_V1 = 'http://127.0.0.1:9001/api/v1'
 DATA_API_AUTH_TOKEN = 'changeme'
+# Maximum number of keep-alive connections each process keeps open to each data API URL
+DATA_API_POOL_SIZE = 10
 ########## END DATA API CONFIGURATION
 
 # can this installation collect and display age info
@@ -331,6 +339,15 @@ ENROLLMENT_AGE_AVAILABLE = True
 # used to determine if a course ID is valid
 LMS_COURSE_VALIDATION_BASE_URL = None
 
+# Validity of course IDs checked against the LMS is cached for COURSE_VALIDATION_CACHE_TIMEOUT seconds for valid
+# courses, and COURSE_VALIDATION_NEGATIVE_CACHE_TIMEOUT seconds for courses the LMS does not know of, so that a
+# course created after being looked up is not reported as missing for long.
+COURSE_VALIDATION_CACHE_TIMEOUT = 3600
+COURSE_VALIDATION_NEGATIVE_CACHE_TIMEOUT = 60
+
+# Maximum number of keep-alive connections each process keeps open to the LMS for course validation
+LMS_POOL_SIZE = 10
+
 # used to construct the shortcut link to course modules
 LMS_COURSE_SHORTCUT_BASE_URL = 'URL_FOR_LMS_COURSE_LIST_PAGE'
 
@@ -370,6 +387,8 @@ SOCIAL_AUTH_EDX_OAUTH2_LOGOUT_URL = "http://127.0.0.1:8000/logout"
 BACKEND_SERVICE_EDX_OAUTH2_KEY = "insights-backend-service-key"
 BACKEND_SERVICE_EDX_OAUTH2_SECRET = "insights-backend-service-secret"
 BACKEND_SERVICE_EDX_OAUTH2_PROVIDER_URL = "http://127.0.0.1:8000/oauth2"
+# The access token of the backend service is refreshed this many seconds before it expires
+OAUTH_ACCESS_TOKEN_REFRESH_MARGIN = 300
 
 # Enables a special view that, when accessed, creates and logs in a new user.
 # This should NOT be enabled for production deployments!
@@ -424,6 +443,12 @@ MODULE_PREVIEW_URL = 'http://127.0.0.1:8000/xblock'
 # configuration.
 ANALYTICS_API_DEFAULT_TIMEOUT = 10
 LMS_DEFAULT_TIMEOUT = (3.05, 5)
+
+# Independent upstream calls of a page are made concurrently by a pool of UPSTREAM_FAN_OUT_MAX_WORKERS threads per
+# process (0 makes them one after another), and must all return within UPSTREAM_FAN_OUT_TIMEOUT seconds of the start
+# of the request.
+UPSTREAM_FAN_OUT_MAX_WORKERS = 8
+UPSTREAM_FAN_OUT_TIMEOUT = 20
 ########## END EXTERNAL SERVICE TIMEOUTS
 
 _ = lambda s: s  # pylint: disable=unnecessary-lambda-assignment
@@ -468,6 +493,77 @@ CACHES = {
     }
 }
 COURSE_SUMMARIES_CACHE_TIMEOUT = 3600  # 1 hour timeout
+
+# Maximum number of parsed course structures each process keeps in memory to share between presenters
+COURSE_STRUCTURE_REGISTRY_SIZE = 100
+
+# When a cached course structure or data API response is missing, a single request recomputes it while
+# concurrent requests poll the cache for the result.  The lock expires after CACHE_SINGLE_FLIGHT_LOCK_TIMEOUT
+# seconds and waiters give up, computing the value themselves, after CACHE_SINGLE_FLIGHT_WAIT seconds.
+CACHE_SINGLE_FLIGHT_LOCK_TIMEOUT = 60
+CACHE_SINGLE_FLIGHT_WAIT = 15
+CACHE_SINGLE_FLIGHT_POLL_INTERVAL = 0.1
+
+# The cached pipeline data of a course (e.g. enrollment, engagement, problem and video data) is invalidated when the
+# data pipeline has produced new data for the course, which the course pages probe at most once every
+# COURSE_DATA_FRESHNESS_PROBE_INTERVAL seconds per course.  None disables the probe.
+COURSE_DATA_FRESHNESS_PROBE_INTERVAL = 300
+
+# Course structures, data API module data and course summaries are served from the cache until they expire
+# (hard timeout), but are refreshed in the background, while the stale value is served, once they are older
+# than their soft timeout.  A soft timeout of None disables background refreshes.
+COURSE_STRUCTURE_CACHE_TIMEOUT = 3600
+COURSE_STRUCTURE_CACHE_SOFT_TIMEOUT = 300
+COURSE_MODULE_DATA_CACHE_TIMEOUT = 86400
+COURSE_MODULE_DATA_CACHE_SOFT_TIMEOUT = 3600
+COURSE_SUMMARIES_CACHE_SOFT_TIMEOUT = 900
+
+# Presenter outputs materialized by the materialize_course_outputs command after each pipeline run are kept under
+# the versioned keys of the course, which are replaced by the next run, for COURSE_MATERIALIZED_CACHE_TIMEOUT seconds.
+# The timeout outlasts a missed daily run.
+COURSE_MATERIALIZED_CACHE_TIMEOUT = 2 * 86400
+
+# Outputs are localized, so they are materialized in each of COURSE_MATERIALIZED_LANGUAGES.  Pages viewed in
+# other languages compute their outputs on demand.
+COURSE_MATERIALIZED_LANGUAGES = (LANGUAGE_CODE,)
+
+# Timeouts (in seconds) of the key families whose cache writes do not pass their own timeout (see the timeouts
+# above).  Families not listed get the default timeout of the cache.  All timeouts are shortened by a random
+# fraction of up to CACHE_TIMEOUT_JITTER, so that values written together do not expire together.
+CACHE_TIMEOUTS = {
+    # Sections, assignments and neighbours built from the course structure and module data
+    'problem': 3600,
+    'video': 3600,
+    'tags_problem': 3600,
+    'grading_policy': 3600,
+    'programs': 3600,
+    'course_details': 3600,
+    'user_courses': 300,
+    'tracking_id': 3600,
+}
+CACHE_TIMEOUT_JITTER = 0.1
+
+# Cached values of these key families may exceed the item size limit of memcached (1 MB).  They are compressed
+# when their pickled size exceeds CACHE_COMPRESSION_THRESHOLD bytes, and split across several cache entries when
+# still larger than CACHE_CHUNK_SIZE bytes.
+CACHE_LARGE_VALUE_FAMILIES = ('structure', 'module_data', 'summaries', 'materialized')
+CACHE_COMPRESSION_THRESHOLD = 64 * 1024
+CACHE_CHUNK_SIZE = 900 * 1024
+
+# Values of these key families are also kept in a process-local LRU cache, for the given number of seconds, so
+# that the values read on almost every request skip the round-trip to, and deserialization from, the shared cache.
+# The local cache holds at most CACHE_LOCAL_MAX_ENTRIES values, totalling at most CACHE_LOCAL_MAX_BYTES (pickled).
+# Course permissions are not kept locally, as revoking them (e.g. on logout) only clears the local cache of the
+# process revoking them.
+CACHE_LOCAL_TIMEOUTS = {
+    'summaries': 30,
+    'programs': 60,
+    'course_details': 60,
+    'structure': 30,
+    'course_validation': 30,
+}
+CACHE_LOCAL_MAX_ENTRIES = 1000
+CACHE_LOCAL_MAX_BYTES = 64 * 1024 * 1024
 ########## END CACHE CONFIGURATION
 
 ########## WEBPACK CONFIGURATION
@@ -29,4 +29,9 @@ DATA_API_URL = 'http://data-api-host/api/v0'
 DATA_API_V1_ENABLED = True
 DATA_API_URL_V1 = 'http://data-api-host/api/v1'
 
+# Tests clear the shared cache between cases, which the process-local cache would outlive.
+CACHE_LOCAL_TIMEOUTS = {}
+# Course views under test do not expect requests probing the freshness of the course data.
+COURSE_DATA_FRESHNESS_PROBE_INTERVAL = None
+
 LOGGING = get_logger_config(debug=DEBUG, dev_env=True, local_loglevel='DEBUG')
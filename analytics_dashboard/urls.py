@@ -30,6 +30,7 @@ urlpatterns = AUTH_URLS + [
     ),
     path('status/', views.status, name='status'),
     path('health/', views.health, name='health'),
+    path('debug/cache/', views.cache_stats, name='cache_stats'),
     path('courses/', include('courses.urls')),
     re_path(r'^admin/', admin.site.urls),
     path('api-auth/', include((AUTH_URLS, 'auth_urls'), namespace='rest_framework')),
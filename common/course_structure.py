@@ -1,50 +1,365 @@
-class CourseStructure:
+import sys
+import threading
+import uuid
+from array import array
+from bisect import bisect_left
+from collections import OrderedDict
+
+
+class CourseTree:
+    """
+    Compact, in-memory representation of a course structure (as returned by the course blocks API).
+
+    Blocks are stored in parallel arrays, numbered in pre-order from the root.  Block types and assignment
+    formats are interned in small lookup tables and stored as integer codes, and children are stored as
+    integer offsets into the arrays rather than as lists of ID strings.  This keeps the structure small to
+    pickle and cache, and a block's descendants are simply the positions in [position, ends[position]).
+    """
+
+    __slots__ = ('version', 'ids', 'names', 'type_names', 'types', 'format_names', 'formats', 'graded', 'parents',
+                 'child_offsets', 'child_positions', 'ends', '_positions')
+
+    # Values of the graded field, stored by index
+    GRADED_VALUES = (None, False, True)
+
+    def __init__(self):
+        # Identifies this parse of the structure, e.g. for sharing it between presenters
+        self.version = uuid.uuid4().hex
+        self.ids = []
+        self.names = []
+        self.type_names = []
+        self.types = array('H')
+        self.format_names = []
+        self.formats = array('H')
+        self.graded = array('b')
+        self.parents = array('l')
+        self.child_offsets = array('l')
+        self.child_positions = array('l')
+        self.ends = array('l')
+        self._positions = None
+
+    def __getstate__(self):
+        # The ID lookup table is rebuilt on demand rather than cached.
+        return {slot: getattr(self, slot) for slot in self.__slots__ if slot != '_positions'}
+
+    def __setstate__(self, state):
+        for slot, value in state.items():
+            setattr(self, slot, value)
+        self.type_names = [sys.intern(name) if name else name for name in self.type_names]
+        self._positions = None
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __contains__(self, block_id):
+        return block_id in self.positions
+
+    @classmethod
+    def load(cls, structure):
+        """ Returns the given structure as a CourseTree, converting it from blocks API data if needed. """
+        if isinstance(structure, cls):
+            return structure
+        return cls.from_blocks(structure)
+
+    @classmethod
+    def from_blocks(cls, structure):
+        """
+        Builds a tree from the blocks API response by walking the blocks once from the root.
+
+        Arguments
+            structure   --  Dictionary with the root block ID and a dictionary mapping ID strings to block dicts
+        """
+        tree = cls()
+        blocks = structure['blocks']
+        type_codes = {}
+        format_codes = {}
+
+        # Entries are (block ID, parent position), or (None, position) once all descendants of the block
+        # at that position have been numbered.
+        stack = [(structure['root'], -1)]
+        while stack:
+            key, parent = stack.pop()
+            if key is None:
+                tree.ends[parent] = len(tree.ids)
+                continue
+
+            block = blocks[key]
+            position = len(tree.ids)
+            tree.ids.append(key)
+            tree.names.append(block.get('display_name'))
+            tree.types.append(cls._code(type_codes, tree.type_names, block.get('type')))
+            tree.formats.append(cls._code(format_codes, tree.format_names, block.get('format')))
+            graded = block.get('graded')
+            tree.graded.append(cls.GRADED_VALUES.index(None if graded is None else bool(graded)))
+            tree.parents.append(parent)
+            tree.ends.append(position + 1)
+
+            stack.append((None, position))
+            stack.extend((child, position) for child in reversed(block.get('children', [])) if child in blocks)
+
+        # Children of each block are stored contiguously, in course order, starting at child_offsets[position].
+        count = len(tree.ids)
+        offsets = [0] * (count + 1)
+        for parent in tree.parents[1:]:
+            offsets[parent + 1] += 1
+        for position in range(count):
+            offsets[position + 1] += offsets[position]
+
+        tree.child_offsets = array('l', offsets)
+        tree.child_positions = array('l', [0] * max(count - 1, 0))
+        fill = offsets[:-1]
+        for position in range(1, count):
+            parent = tree.parents[position]
+            tree.child_positions[fill[parent]] = position
+            fill[parent] += 1
+
+        return tree
+
     @staticmethod
-    def _filter_children(blocks, key, require_format=False, **kwargs):
+    def _code(codes, names, value):
+        if value not in codes:
+            codes[value] = len(names)
+            names.append(sys.intern(value) if isinstance(value, str) else value)
+        return codes[value]
+
+    @property
+    def positions(self):
+        """ Dictionary mapping block IDs to their (first) pre-order position. """
+        if self._positions is None:
+            positions = {}
+            for position, block_id in enumerate(self.ids):
+                positions.setdefault(block_id, position)
+            self._positions = positions
+        return self._positions
+
+    @property
+    def root(self):
+        return self.ids[0]
+
+    def position(self, block_id):
+        return self.positions[block_id]
+
+    def block_type(self, position):
+        return self.type_names[self.types[position]]
+
+    def block_format(self, position):
+        return self.format_names[self.formats[position]]
+
+    def is_graded(self, position):
+        return self.GRADED_VALUES[self.graded[position]]
+
+    def parent(self, position):
+        """ Returns the position of the parent block, or None for the root. """
+        parent = self.parents[position]
+        return None if parent < 0 else parent
+
+    def children(self, position):
+        """ Returns the positions of the children of the block. """
+        return self.child_positions[self.child_offsets[position]:self.child_offsets[position + 1]]
+
+    def pre_order(self, block_id=None, block_type=None, graded=None):
         """
-        Given the blocks, locates the nested blocks matching the criteria set in kwargs.
+        Yields the positions of the blocks nested under (and including) the given block in pre-order,
+        which is course order.
 
         Arguments
-            blocks          --   Dictionary mapping ID strings to block dicts
-            key             --   ID of the root node where tree traversal should begin
+            block_id    --  ID of the block where traversal should begin.  Defaults to the root.
+            block_type  --  If specified, only blocks of this type are yielded
+            graded      --  If specified (True/False), only blocks with this graded value are yielded
+        """
+        start = 0 if block_id is None else self.position(block_id)
+        for position in range(start, self.ends[start]):
+            if self._include(position, block_type, graded):
+                yield position
+
+    def post_order(self, block_id=None, block_type=None, graded=None):
+        """
+        Yields the positions of the blocks nested under (and including) the given block in post-order,
+        i.e. every block after all of its descendants.  Arguments are the same as for pre_order().
+        """
+        start = 0 if block_id is None else self.position(block_id)
+        # Blocks which have been visited in pre-order but whose descendants have not all been visited yet
+        opened = []
+        for position in range(start, self.ends[start]):
+            while opened and self.ends[opened[-1]] <= position:
+                closed = opened.pop()
+                if self._include(closed, block_type, graded):
+                    yield closed
+            opened.append(position)
+
+        while opened:
+            closed = opened.pop()
+            if self._include(closed, block_type, graded):
+                yield closed
+
+    def _include(self, position, block_type, graded):
+        if block_type is not None and self.block_type(position) != block_type:
+            return False
+        return graded is None or self.is_graded(position) == graded
+
+    def block(self, block_id):
+        """ Returns a new dictionary, in the form of the blocks API, for the block with the given ID. """
+        position = self.position(block_id)
+        return {
+            'id': block_id,
+            'display_name': self.names[position],
+            'type': self.block_type(position),
+            'graded': self.is_graded(position),
+            'format': self.block_format(position),
+            'children': [self.ids[child] for child in self.children(position)],
+        }
+
+
+class CourseStructureIndex:
+    """
+    Indexes a course structure so that nested blocks can be located without repeatedly walking the tree.
+
+    Every block of the (pre-order) CourseTree occupies the position range [start, end) covering its
+    descendants.  Positions are additionally indexed by block type, and by block type and graded value,
+    so locating the blocks of a type under a block is a range lookup rather than a tree walk.
+    """
+
+    def __init__(self, structure):
+        self.tree = CourseTree.load(structure)
+
+        # Block type -> ordered list of positions
+        self.types = {}
+        # (block type, graded) -> ordered list of positions
+        self.graded_types = {}
+
+        type_names = self.tree.type_names
+        graded_values = self.tree.GRADED_VALUES
+        for position, (code, graded) in enumerate(zip(self.tree.types, self.tree.graded)):
+            block_type = type_names[code]
+            self.types.setdefault(block_type, []).append(position)
+            self.graded_types.setdefault((block_type, graded_values[graded]), []).append(position)
+
+    @classmethod
+    def load(cls, structure):
+        """ Returns the given structure as a CourseStructureIndex, indexing it if needed. """
+        if isinstance(structure, cls):
+            return structure
+        return cls(structure)
+
+    def descendants(self, key, block_type, **kwargs):
+        """
+        Returns the tree positions, in course order, of the blocks of the given type nested under (and
+        including) the given block.
+
+        Arguments
+            key         --  ID of the ancestor block
+            block_type  --  Type of blocks to return
+            kwargs      --  May contain 'graded', in which case only blocks with that graded value are returned
+        """
+        if 'graded' in kwargs:
+            positions = self.graded_types.get((block_type, kwargs['graded']), [])
+        else:
+            positions = self.types.get(block_type, [])
+
+        start = self.tree.position(key)
+        end = self.tree.ends[start]
+        return positions[bisect_left(positions, start):bisect_left(positions, end)]
+
+    def filter(self, key, require_format=False, block_type=None, **kwargs):
+        """
+        Locates the blocks, nested under (and including) the given block, matching the criteria set in kwargs.
+
+        Returns the tree positions of the matching blocks in course order.  Once a block matches, its
+        descendants are not searched.
+
+        Arguments
+            key             --   ID of the root node where the search should begin
             require_format  --   Boolean indicating if the format field should be required to have a
                                  non-empty (truthy) value if a match is made
-            kwargs          --   Dictionary mapping field names to required values for matches
+            block_type      --   Type of blocks to match
+            kwargs          --   Dictionary mapping field names (graded, format) to required values for matches
         """
-        block = blocks[key]
-
-        block_type = kwargs.pop('block_type', None)
-        if block_type:
-            kwargs['type'] = block_type
-
-        matched = True
-        for name, value in kwargs.items():
-            matched &= (block.get(name, None) == value)
-            if not matched:
-                break
-
-        if matched:
-            if require_format:
-                if 'format' in block and block['format']:
-                    return [block]
+        start = self.tree.position(key)
+
+        if block_type is None:
+            candidates = range(start, self.tree.ends[start])
+        elif 'graded' in kwargs:
+            candidates = self.descendants(key, block_type, graded=kwargs['graded'])
+        else:
+            candidates = self.descendants(key, block_type)
+
+        matches = []
+        skip_until = start
+        for position in candidates:
+            if position < skip_until:
+                # Descendant of a block which has already matched
+                continue
+
+            if self._matches(position, require_format, kwargs):
+                matches.append(position)
+                skip_until = self.tree.ends[position]
+
+        return matches
+
+    def _matches(self, position, require_format, criteria):
+        tree = self.tree
+        for name, value in criteria.items():
+            if name == 'graded':
+                field = tree.is_graded(position)
+            elif name == 'format':
+                field = tree.block_format(position)
+            elif name == 'type':
+                field = tree.block_type(position)
             else:
-                return [block]
+                raise ValueError(f'Unable to filter blocks by {name}.')
+
+            if field != value:
+                return False
+
+        return not require_format or bool(tree.block_format(position))
+
+
+class CourseStructureRegistry:
+    """
+    Thread-safe registry of parsed (indexed) course structures, keyed by course ID and structure version,
+    so that a structure only needs to be parsed once per process.  The least recently used courses are
+    discarded once the registry holds more than `size` courses.
+    """
+
+    def __init__(self, size):
+        self.size = size
+        self._lock = threading.Lock()
+        # Course ID -> (version, CourseStructureIndex)
+        self._entries = OrderedDict()
+
+    def get(self, course_id, version):
+        """ Returns the index registered for the course if it is of the given version, otherwise None. """
+        if version is None:
+            return None
 
-        children = []
-        if 'children' in block:
-            for child in block['children']:
-                children += CourseStructure._filter_children(blocks, child, require_format=require_format, **kwargs)
+        with self._lock:
+            entry = self._entries.get(course_id)
+            if entry is None or entry[0] != version:
+                return None
+            self._entries.move_to_end(course_id)
+            return entry[1]
 
-        return children
+    def add(self, course_id, index):
+        """ Registers the index, replacing any other version registered for the course. """
+        with self._lock:
+            self._entries[course_id] = (index.tree.version, index)
+            self._entries.move_to_end(course_id)
+            while len(self._entries) > self.size:
+                self._entries.popitem(last=False)
 
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class CourseStructure:
     @staticmethod
     def course_structure_to_assignments(structure, graded=None, assignment_type=None):
         """
         Returns the assignments and nested problems from the given course structure.
         """
-
-        blocks = structure['blocks']
-        root = blocks[structure['root']]
+        index = CourseStructureIndex.load(structure)
+        tree = index.tree
 
         # Break down the course structure into assignments and nested problems, returning only the data
         # we absolutely need.
@@ -57,22 +372,21 @@ class CourseStructure:
         if assignment_type:
             kwargs['format'] = assignment_type
 
-        filtered = CourseStructure._filter_children(blocks, root['id'], require_format=True, **kwargs)
+        filtered = index.filter(tree.root, require_format=True, **kwargs)
 
         for assignment in filtered:
-            filtered_children = CourseStructure._filter_children(blocks, assignment['id'], graded=graded,
-                                                                 block_type='problem', require_format=False)
+            filtered_children = index.filter(tree.ids[assignment], graded=graded, block_type='problem')
             problems = []
             for problem in filtered_children:
                 problems.append({
-                    'id': problem['id'],
-                    'name': problem['display_name']
+                    'id': tree.ids[problem],
+                    'name': tree.names[problem]
                 })
 
             assignments.append({
-                'id': assignment['id'],
-                'name': assignment['display_name'],
-                'assignment_type': assignment['format'],
+                'id': tree.ids[assignment],
+                'name': tree.names[assignment],
+                'assignment_type': tree.block_format(assignment),
                 'children': problems,
             })
 
@@ -84,35 +398,26 @@ class CourseStructure:
         Returns sections, subsections, and the child block type (e.g. problem or video), nested
         within 'children' attributes.
         """
+        index = CourseStructureIndex.load(structure)
+        tree = index.tree
+        filter_kwargs = {}
+        if graded is not None:
+            filter_kwargs['graded'] = graded
 
-        blocks = structure['blocks']
-        root = blocks[structure['root']]
-        sections = CourseStructure._build_sections(blocks, root['id'],
-                                                   graded, ['chapter', 'sequential', str(child_block_type)])
-        return sections
-
-    @staticmethod
-    def _build_sections(blocks, section_id, graded, block_types):
-        """ Recursively build sections of block_type. """
+        # Each level of the hierarchy is located beneath the blocks found for the previous level.
         sections = []
-        if block_types:
-            block_types = list(block_types)
-            block_type = block_types.pop(0)
-            filter_kwargs = {
-                'block_type': block_type,
-            }
-            if graded is not None:
-                filter_kwargs['graded'] = graded
-            structure_sections = CourseStructure._filter_children(blocks, section_id,
-                                                                  require_format=False,
-                                                                  **filter_kwargs)
-
-            for section in structure_sections:
-                children = CourseStructure._build_sections(blocks, section['id'], graded, block_types)
-                sections.append({
-                    'id': section['id'],
-                    'name': section['display_name'],
-                    'children': children
-                })
+        parents = [(tree.root, sections)]
+        for block_type in ['chapter', 'sequential', str(child_block_type)]:
+            found = []
+            for parent_id, children in parents:
+                for position in index.filter(parent_id, block_type=block_type, **filter_kwargs):
+                    section = {
+                        'id': tree.ids[position],
+                        'name': tree.names[position],
+                        'children': []
+                    }
+                    children.append(section)
+                    found.append((section['id'], section['children']))
+            parents = found
 
         return sections
@@ -0,0 +1,164 @@
+import copy
+from array import array
+from collections.abc import Mapping
+
+
+class ModuleDataTable(Mapping):
+    """
+    Compact, columnar table of data API module data (e.g. problems or videos) keyed by module ID.
+
+    Field names are stored once rather than in every row, and the values of each field are stored in a single
+    column: integers and floats in typed arrays, repeated values (e.g. course IDs) as integer codes into a list
+    of the distinct values, strings (e.g. block IDs) as the suffixes following their common prefix, and
+    anything else in a plain list.  Rows are hydrated into new dictionaries only when they are read, and list and
+    dictionary values (e.g. part IDs or tags) are copied, so changes to a row do not change the table.
+
+    Module IDs are usually strings, which share a common prefix; IDs of other types are stored as they are.
+    """
+
+    __slots__ = ('id_prefix', 'id_suffixes', 'fields', 'columns', 'missing', '_rows')
+
+    # Column kinds.  A column of KEYS holds the module IDs the rows are keyed by.
+    INTEGERS, FLOATS, CODES, STRINGS, OBJECTS, KEYS = range(6)
+
+    # Largest number of distinct values stored as codes
+    MAX_CODES = 2 ** 16 - 1
+
+    def __init__(self, rows=None):
+        """
+        Arguments
+            rows    --  Mapping of module IDs to dictionaries of module data
+        """
+        rows = rows or {}
+        ids = list(rows.keys())
+        self.id_prefix, self.id_suffixes = self._split_prefix(ids)
+        self.fields = []
+        self.columns = []
+        # Row indices, by field, of the rows without that field
+        self.missing = {}
+        self._rows = None
+
+        values = list(rows.values())
+        for row in values:
+            for field in row:
+                if field not in self.missing:
+                    self.missing[field] = None
+                    self.fields.append(field)
+
+        for field in self.fields:
+            column = []
+            missing = set()
+            for index, row in enumerate(values):
+                if field in row:
+                    column.append(row[field])
+                else:
+                    column.append(None)
+                    missing.add(index)
+            self.columns.append((self.KEYS, None, None) if column == ids else self._column(column))
+            self.missing[field] = frozenset(missing)
+
+        self.missing = {field: missing for field, missing in self.missing.items() if missing}
+
+    def __getstate__(self):
+        # The ID lookup table is rebuilt on demand rather than cached.
+        return {slot: getattr(self, slot) for slot in self.__slots__ if slot != '_rows'}
+
+    def __setstate__(self, state):
+        for slot, value in state.items():
+            setattr(self, slot, value)
+        self._rows = None
+
+    def __getitem__(self, module_id):
+        return self._hydrate(self.rows[module_id])
+
+    def __contains__(self, module_id):
+        return module_id in self.rows
+
+    def __iter__(self):
+        return iter(self.rows)
+
+    def __len__(self):
+        return len(self.rows)
+
+    @property
+    def ids(self):
+        if not self.id_prefix:
+            return list(self.id_suffixes)
+        return [self.id_prefix + suffix for suffix in self.id_suffixes]
+
+    def _id(self, index):
+        """ Returns the module ID of the row, which has no prefix unless all IDs are strings. """
+        if not self.id_prefix:
+            return self.id_suffixes[index]
+        return self.id_prefix + self.id_suffixes[index]
+
+    @property
+    def rows(self):
+        """ Dictionary mapping module IDs to their row indices. """
+        if self._rows is None:
+            self._rows = {module_id: index for index, module_id in enumerate(self.ids)}
+        return self._rows
+
+    @staticmethod
+    def _split_prefix(values):
+        """
+        Returns the longest common prefix of the strings, and the strings without it.  Values which are not all
+        strings have no prefix, and are returned as they are.
+        """
+        if not values or not all(isinstance(value, str) for value in values):
+            return '', list(values)
+        shortest, longest = min(values), max(values)
+        length = 0
+        while length < len(shortest) and shortest[length] == longest[length]:
+            length += 1
+        return shortest[:length], [value[length:] for value in values]
+
+    @classmethod
+    def _column(cls, values):
+        """
+        Returns the most compact column holding the values, as a (kind, data, extra) tuple where `extra` is the
+        list of distinct values of a column of CODES, or the common prefix of a column of STRINGS.
+        """
+        value_types = {type(value) for value in values}
+        if value_types == {int}:
+            try:
+                typecode = 'i' if -2 ** 31 <= min(values) and max(values) < 2 ** 31 else 'q'
+                return cls.INTEGERS, array(typecode, values), None
+            except OverflowError:
+                pass
+        elif value_types == {float}:
+            return cls.FLOATS, array('d', values), None
+
+        try:
+            # Values are keyed by type as well, so that e.g. True and 1 are kept apart.
+            codes = {}
+            for value in values:
+                codes.setdefault((type(value), value), len(codes))
+        except TypeError:
+            # Unhashable values, e.g. lists of part IDs
+            return cls.OBJECTS, values, None
+
+        if len(codes) <= cls.MAX_CODES and len(codes) * 2 <= len(values):
+            return cls.CODES, array('H', [codes[(type(value), value)] for value in values]), \
+                [value for _type, value in codes]
+        if value_types == {str}:
+            prefix, suffixes = cls._split_prefix(values)
+            return cls.STRINGS, suffixes, prefix
+        return cls.OBJECTS, values, None
+
+    def _hydrate(self, index):
+        row = {}
+        for field, (kind, data, extra) in zip(self.fields, self.columns):
+            if field in self.missing and index in self.missing[field]:
+                continue
+            if kind == self.KEYS:
+                row[field] = self._id(index)
+            elif kind == self.CODES:
+                row[field] = extra[data[index]]
+            elif kind == self.STRINGS:
+                row[field] = extra + data[index]
+            elif isinstance(data[index], (list, dict)):
+                row[field] = copy.deepcopy(data[index])
+            else:
+                row[field] = data[index]
+        return row
@@ -1,6 +1,7 @@
+import pickle
 from unittest import TestCase
 
-from common.course_structure import CourseStructure
+from common.course_structure import CourseStructure, CourseStructureIndex, CourseStructureRegistry, CourseTree
 from common.tests.factories import CourseStructureFactory
 
 
@@ -69,3 +70,142 @@ class CourseStructureTests(TestCase):
 
         actual = CourseStructure.course_structure_to_sections(structure, 'problem', False)
         self.assertListEqual(actual, self._prepare_structure(structure, factory.sections, False))
+
+
+class CourseTreeTests(TestCase):
+    def setUp(self):
+        self.factory = CourseStructureFactory()
+        self.structure = self.factory.structure
+        self.tree = CourseTree.from_blocks(self.structure)
+
+    def test_block(self):
+        for block_id, block in self.structure['blocks'].items():
+            self.assertDictEqual(self.tree.block(block_id), block)
+
+    def test_parents_and_children(self):
+        tree = self.tree
+        root = tree.position(self.structure['root'])
+        self.assertIsNone(tree.parent(root))
+        self.assertListEqual([tree.ids[child] for child in tree.children(root)],
+                             self.structure['blocks'][tree.root]['children'])
+
+        for assignment in self.factory.assignments[:-2]:
+            position = tree.position(assignment['id'])
+            self.assertEqual(tree.parent(position), root)
+            for child in tree.children(position):
+                self.assertEqual(tree.parent(child), position)
+
+    def test_pre_order(self):
+        tree = self.tree
+        self.assertListEqual(list(tree.pre_order()), list(range(len(tree))))
+
+        section = self.factory.sections[0]
+        expected = [section['id'], self.factory.subsections[0]['id']] + self.factory.subsections[0]['children']
+        self.assertListEqual([tree.ids[position] for position in tree.pre_order(section['id'])], expected)
+
+        problems = [tree.ids[position] for position in tree.pre_order(block_type='problem', graded=False)]
+        self.assertListEqual(problems, self.factory.subsections[0]['children'])
+
+    def test_post_order(self):
+        tree = self.tree
+        positions = list(tree.post_order())
+        self.assertCountEqual(positions, range(len(tree)))
+        self.assertEqual(positions[-1], 0)
+        for index, position in enumerate(positions):
+            # Every block is yielded after all of its descendants
+            self.assertTrue(all(child in positions[:index] for child in tree.children(position)))
+
+        section = self.factory.sections[0]
+        expected = self.factory.subsections[0]['children'] + [self.factory.subsections[0]['id'], section['id']]
+        self.assertListEqual([tree.ids[position] for position in tree.post_order(section['id'])], expected)
+        self.assertListEqual([tree.ids[position] for position in tree.post_order(block_type='chapter')],
+                             [section['id']])
+
+    def test_pickle(self):
+        tree = pickle.loads(pickle.dumps(self.tree))
+        for block_id, block in self.structure['blocks'].items():
+            self.assertDictEqual(tree.block(block_id), block)
+
+    def test_load(self):
+        self.assertIs(CourseTree.load(self.tree), self.tree)
+        self.assertListEqual(CourseTree.load(self.structure).ids, self.tree.ids)
+
+
+class CourseStructureIndexTests(TestCase):
+    def setUp(self):
+        self.factory = CourseStructureFactory()
+        self.structure = self.factory.structure
+        self.index = CourseStructureIndex(self.structure)
+
+    def _filter(self, key, **kwargs):
+        return [self.index.tree.ids[position] for position in self.index.filter(key, **kwargs)]
+
+    def test_filter(self):
+        root = self.structure['root']
+        expected = [problem for assignment in self.factory.assignments[:-2] for problem in assignment['children']]
+        expected += self.factory.subsections[0]['children']
+        self.assertListEqual(self._filter(root, block_type='problem'), expected)
+        self.assertListEqual(self._filter(root, block_type='problem', graded=False),
+                             self.factory.subsections[0]['children'])
+
+    def test_descendants(self):
+        root = self.structure['root']
+        for assignment in self.factory.assignments[:-2]:
+            problems = [self.index.tree.ids[position] for position in
+                        self.index.descendants(assignment['id'], 'problem', graded=True)]
+            self.assertListEqual(problems, assignment['children'])
+            self.assertListEqual(self.index.descendants(assignment['id'], 'problem', graded=False), [])
+
+        self.assertEqual(len(self.index.descendants(root, 'sequential')), len(self.factory.assignments) - 1)
+        self.assertListEqual(self.index.descendants(root, 'sequential', graded=None), [])
+        self.assertListEqual(self.index.descendants(root, 'html'), [])
+
+    def test_filter_stops_at_match(self):
+        root = self.structure['root']
+        # The root matches, so nothing beneath it is returned
+        self.assertListEqual(self._filter(root), [root])
+
+    def test_deep_structure(self):
+        """ Structures deeper than the recursion limit can be indexed. """
+        depth = 5000
+        blocks = {}
+        for i in range(depth):
+            blocks[str(i)] = {
+                'id': str(i),
+                'type': 'problem' if i == depth - 1 else 'vertical',
+                'display_name': str(i),
+                'children': [str(i + 1)] if i < depth - 1 else [],
+            }
+
+        self.index = CourseStructureIndex({'root': '0', 'blocks': blocks})
+        self.assertListEqual(self._filter('0', block_type='problem'), [str(depth - 1)])
+
+
+class CourseStructureRegistryTests(TestCase):
+    def setUp(self):
+        self.registry = CourseStructureRegistry(2)
+        self.index = CourseStructureIndex(CourseStructureFactory().structure)
+
+    def test_get(self):
+        version = self.index.tree.version
+        self.assertIsNone(self.registry.get('course', version))
+
+        self.registry.add('course', self.index)
+        self.assertIs(self.registry.get('course', version), self.index)
+        self.assertIsNone(self.registry.get('course', None))
+        self.assertIsNone(self.registry.get('course', 'other-version'))
+        self.assertIsNone(self.registry.get('other-course', version))
+
+        self.registry.clear()
+        self.assertIsNone(self.registry.get('course', version))
+
+    def test_size(self):
+        self.registry.add('a', self.index)
+        self.registry.add('b', self.index)
+        self.registry.get('a', self.index.tree.version)
+        self.registry.add('c', self.index)
+
+        # The least recently used course is discarded
+        self.assertIsNone(self.registry.get('b', self.index.tree.version))
+        self.assertIs(self.registry.get('a', self.index.tree.version), self.index)
+        self.assertIs(self.registry.get('c', self.index.tree.version), self.index)
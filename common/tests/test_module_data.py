@@ -0,0 +1,94 @@
+import pickle
+from collections import OrderedDict
+from unittest import TestCase
+
+from common.module_data import ModuleDataTable
+
+
+class ModuleDataTableTests(TestCase):
+    def setUp(self):
+        self.rows = OrderedDict()
+        for index in range(4):
+            module_id = f'block-v1:edX+DemoX+Demo+type@problem+block@{index}'
+            self.rows[module_id] = {
+                'id': module_id,
+                'course_id': 'course-v1:edX+DemoX+Demo',
+                'total_submissions': index * 10,
+                'correct_percent': index / 10,
+                'part_ids': [f'{module_id}_2_1'],
+                'graded': index == 1,
+            }
+        # Not every row has every field
+        self.rows[module_id]['tags'] = {'difficulty': ['hard']}
+        self.table = ModuleDataTable(self.rows)
+
+    def test_mapping(self):
+        self.assertEqual(list(self.table), list(self.rows))
+        self.assertEqual(len(self.table), 4)
+        module_id = list(self.rows)[0]
+        self.assertIn(module_id, self.table)
+        self.assertEqual(self.table[module_id], self.rows[module_id])
+        self.assertEqual(self.table, self.rows)
+        self.assertNotIn('tags', self.table[module_id])
+        self.assertIsNone(self.table.get('unknown'))
+        self.assertEqual(ModuleDataTable(), {})
+
+    def test_columns(self):
+        kinds = {field: kind for field, (kind, _data, _extra) in zip(self.table.fields, self.table.columns)}
+        self.assertDictEqual(kinds, {
+            'id': ModuleDataTable.KEYS,
+            'course_id': ModuleDataTable.CODES,
+            'total_submissions': ModuleDataTable.INTEGERS,
+            'correct_percent': ModuleDataTable.FLOATS,
+            'part_ids': ModuleDataTable.OBJECTS,
+            'graded': ModuleDataTable.CODES,
+            'tags': ModuleDataTable.OBJECTS,
+        })
+        self.assertEqual(self.table.id_prefix, 'block-v1:edX+DemoX+Demo+type@problem+block@')
+
+    def test_values_keep_their_types(self):
+        """ Booleans and integers are not confused when coded. """
+        table = ModuleDataTable({'a': {'value': True}, 'b': {'value': 1}, 'c': {'value': True}, 'd': {'value': 1}})
+        self.assertIs(table['a']['value'], True)
+        self.assertIs(type(table['b']['value']), int)
+
+    def test_rows_are_copies(self):
+        module_id = list(self.rows)[0]
+        self.table[module_id]['total_submissions'] = 100
+        self.assertEqual(self.table[module_id]['total_submissions'], 0)
+
+        module_id = list(self.rows)[-1]
+        self.table[module_id]['part_ids'].append('added')
+        self.table[module_id]['tags']['difficulty'].append('easy')
+        self.assertEqual(self.table[module_id], self.rows[module_id])
+
+    def test_ids_not_strings(self):
+        rows = {1: {'value': 'a'}, 2: {'value': 'b'}, 'c': {'value': 'c'}}
+        table = ModuleDataTable(rows)
+        self.assertEqual(table, rows)
+        self.assertEqual(list(table), [1, 2, 'c'])
+        self.assertEqual(pickle.loads(pickle.dumps(table)), rows)
+
+    def test_id_field_not_strings(self):
+        """ The ID field, stored as the keys of the table, keeps IDs which are not strings. """
+        rows = {1: {'id': 1, 'value': 2}, 'b': {'id': 'b', 'value': 3}}
+        table = ModuleDataTable(rows)
+        self.assertEqual(table[1], {'id': 1, 'value': 2})
+        self.assertEqual(table, rows)
+        self.assertEqual(ModuleDataTable({1: {'id': 1, 'v': 2}})[1], {'id': 1, 'v': 2})
+
+    def test_pickle(self):
+        table = pickle.loads(pickle.dumps(self.table))
+        self.assertEqual(table, self.rows)
+        self.assertEqual(list(table), list(self.rows))
+
+    def test_compact(self):
+        rows = {
+            f'block-v1:edX+DemoX+Demo+type@problem+block@{index}': {
+                'id': f'block-v1:edX+DemoX+Demo+type@problem+block@{index}',
+                'course_id': 'course-v1:edX+DemoX+Demo',
+                'total_submissions': index,
+                'correct_submissions': index // 2,
+            } for index in range(1000)
+        }
+        self.assertLess(len(pickle.dumps(ModuleDataTable(rows))) * 2, len(pickle.dumps(rows)))